@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CalendarConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = '_calendar'
+
+    def ready(self):
+        from . import occurrence_index  # noqa: F401  (registers signal receivers)
@@ -0,0 +1,50 @@
+"""
+Management command to build or extend the materialized calendar occurrence index.
+
+Run it periodically (e.g. daily from cron) so the indexed window keeps
+``CALENDAR_OCCURRENCE_HORIZON_MONTHS`` months ahead of today.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from _calendar import occurrence_index
+from _calendar.recurrence import add_months
+
+
+class Command(BaseCommand):
+    help = "Build or extend the EventOccurrence index over a rolling horizon"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months",
+            type=int,
+            default=getattr(settings, "CALENDAR_OCCURRENCE_HORIZON_MONTHS", 18),
+            help="Months ahead of today to materialize (default: CALENDAR_OCCURRENCE_HORIZON_MONTHS or 18)",
+        )
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Drop all indexed occurrences and rebuild from scratch",
+        )
+
+    def handle(self, *args, **options):
+        month_start = timezone.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        end = add_months(month_start, options["months"] + 1)
+        if not occurrence_index.is_enabled():
+            self.stdout.write(
+                self.style.WARNING("CALENDAR_OCCURRENCE_INDEX is off; views will not read the index.")
+            )
+
+        if options["rebuild"] or occurrence_index.get_horizon() is None:
+            lookback = getattr(settings, "CALENDAR_OCCURRENCE_LOOKBACK_MONTHS", 1)
+            horizon, created = occurrence_index.rebuild(add_months(month_start, -lookback), end)
+            action = "Built"
+        else:
+            horizon, created = occurrence_index.extend(end)
+            action = "Extended"
+
+        self.stdout.write(
+            self.style.SUCCESS(f"{action} occurrence index {horizon} ({created} new occurrences)")
+        )
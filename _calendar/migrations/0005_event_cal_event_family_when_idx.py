@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('_calendar', '0004_eventoccurrence_occurrencehorizon'),
+        ('project', '0005_alter_customuser_profile_pic'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['family', 'when'], name='cal_event_family_when_idx'),
+        ),
+    ]
@@ -1,6 +1,9 @@
+from itertools import islice
+
 from django.db import models
 from django.contrib.auth import get_user_model
-from datetime import timedelta
+
+from . import recurrence
 
 class Event(models.Model):
     REPEAT_CHOICES = [
@@ -22,64 +25,93 @@ class Event(models.Model):
     duration = models.DurationField()
     repeat = models.CharField(max_length=20, choices=REPEAT_CHOICES, default='false')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['family', 'when'], name='cal_event_family_when_idx'),
+        ]
+
     def __str__(self):
         return self.title
 
     def upcoming(self, count=4, family=None):
         from django.utils.timezone import now
-        from datetime import timedelta
 
         if family and self.family_id != family.id:
             return []
 
-        upcoming_occurrences = []
-        if self.repeat == 'false':
-            if self.when >= now():
-                upcoming_occurrences.append(self.when)
-        else:
-            current_time = self.when
-            while len(upcoming_occurrences) < count and current_time >= now():
-                upcoming_occurrences.append(current_time)
-                if self.repeat == 'daily':
-                    current_time += timedelta(days=1)
-                elif self.repeat == 'weekly':
-                    current_time += timedelta(weeks=1)
-                elif self.repeat == 'monthly':
-                    current_time += timedelta(days=30)  # Approximation
-                elif self.repeat == 'bi-monthly':
-                    current_time += timedelta(days=60)  # Approximation
-                elif self.repeat == 'semi-annually':
-                    current_time += timedelta(days=182)  # Approximation
-                elif self.repeat == 'annually':
-                    current_time += timedelta(days=365)
-        return sorted(upcoming_occurrences)[:count]
+        return list(islice(recurrence.iter_occurrences(self.when, self.repeat, start=now()), count))
 
     @classmethod
     def get_occurrences_in_range(cls, start_date, end_date, family=None):
-        qs = cls.objects.all()
+        """
+        Return ``(event, occurrence)`` tuples for occurrences in ``[start_date, end_date]``.
+
+        When the occurrence index is enabled and covers the window, this is a
+        single query against ``EventOccurrence``; otherwise occurrences are
+        expanded from the events themselves.
+        """
+        from . import occurrence_index
+
+        if family and occurrence_index.covers(start_date, end_date):
+            return occurrence_index.occurrences_in_range(start_date, end_date, family)
+        return cls.expand_occurrences_in_range(start_date, end_date, family=family)
+
+    @classmethod
+    def expand_occurrences_in_range(cls, start_date, end_date, family=None):
+        """
+        Expand recurring events into ``(event, occurrence)`` tuples for the window.
+
+        Events that start after the window, and one-off events that fall before
+        it, are excluded in SQL. Each remaining event jumps straight to its
+        first occurrence in the window.
+        """
+        qs = cls.objects.filter(when__lte=end_date).filter(
+            models.Q(when__gte=start_date) | ~models.Q(repeat='false')
+        ).select_related('host')
         if family:
             qs = qs.filter(family=family)
         occurrences = []
         for event in qs:
-            current_time = event.when
-            while current_time <= end_date:
-                if current_time >= start_date:
-                    occurrences.append((event, current_time))  # Return a tuple of event and occurrence date
-                if event.repeat == 'false':
-                    break
-                elif event.repeat == 'daily':
-                    current_time += timedelta(days=1)
-                elif event.repeat == 'weekly':
-                    current_time += timedelta(weeks=1)
-                elif event.repeat == 'monthly':
-                    current_time += timedelta(days=30)  # Approximation
-                elif event.repeat == 'bi-monthly':
-                    current_time += timedelta(days=60)  # Approximation
-                elif event.repeat == 'semi-annually':
-                    current_time += timedelta(days=182)  # Approximation
-                elif event.repeat == 'annually':
-                    current_time += timedelta(days=365)
+            for current_time in recurrence.iter_occurrences(event.when, event.repeat, start_date, end_date):
+                occurrences.append((event, current_time))  # Return a tuple of event and occurrence date
+        occurrences.sort(key=lambda pair: pair[1])
         return occurrences
     
     def is_recurring(self):
-        return self.repeat != 'false'
+        return recurrence.is_recurring(self.repeat)
+
+
+class EventOccurrence(models.Model):
+    """
+    A single materialized occurrence of an event.
+
+    Rows are only kept for the window described by ``OccurrenceHorizon`` and are
+    maintained by ``_calendar.occurrence_index``.
+    """
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='occurrences')
+    family = models.ForeignKey('project.Family', on_delete=models.CASCADE, related_name='event_occurrences')
+    starts_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['starts_at']
+        indexes = [
+            models.Index(fields=['family', 'starts_at'], name='cal_occ_family_starts_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.event.title} at {self.starts_at:%Y-%m-%d %H:%M}"
+
+
+class OccurrenceHorizon(models.Model):
+    """
+    The time window currently materialized into ``EventOccurrence``.
+
+    There is at most one row; it is created and extended by the
+    ``extend_event_occurrences`` management command.
+    """
+    starts = models.DateTimeField()
+    ends = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.starts:%Y-%m-%d} to {self.ends:%Y-%m-%d}"
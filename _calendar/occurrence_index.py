@@ -0,0 +1,114 @@
+"""
+Materialized occurrence index for calendar events.
+
+When ``CALENDAR_OCCURRENCE_INDEX`` is enabled, every event is expanded into
+``EventOccurrence`` rows for the window stored in ``OccurrenceHorizon``. Range
+queries that fall inside that window become a single indexed query. Rows are
+kept current by Event signals and the horizon is moved forward by the
+``extend_event_occurrences`` management command.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from . import recurrence
+from .models import Event, EventOccurrence, OccurrenceHorizon
+
+log = logging.getLogger(__name__)
+
+
+def is_enabled():
+    return getattr(settings, 'CALENDAR_OCCURRENCE_INDEX', False)
+
+
+def get_horizon():
+    """Return the materialized window, or None when the index is not built."""
+    return OccurrenceHorizon.objects.order_by('id').first()
+
+
+def covers(start_date, end_date):
+    """Return True when the index is enabled and covers the whole range."""
+    if not is_enabled():
+        return False
+    horizon = get_horizon()
+    return bool(horizon and horizon.starts <= start_date and end_date <= horizon.ends)
+
+
+def occurrences_in_range(start_date, end_date, family):
+    """Return ``(event, occurrence)`` tuples from the index."""
+    rows = (
+        EventOccurrence.objects.filter(family=family, starts_at__range=(start_date, end_date))
+        .select_related('event__host')
+        .order_by('starts_at')
+    )
+    return [(row.event, row.starts_at) for row in rows]
+
+
+def _build_rows(event, start, end):
+    return [
+        EventOccurrence(event=event, family_id=event.family_id, starts_at=starts_at)
+        for starts_at in recurrence.iter_occurrences(event.when, event.repeat, start, end)
+    ]
+
+
+def materialize_event(event, horizon=None):
+    """Replace the indexed occurrences of one event."""
+    horizon = horizon or get_horizon()
+    if horizon is None:
+        return 0
+    rows = _build_rows(event, horizon.starts, horizon.ends)
+    with transaction.atomic():
+        EventOccurrence.objects.filter(event=event).delete()
+        EventOccurrence.objects.bulk_create(rows)
+    return len(rows)
+
+
+def _candidate_events(start, end):
+    return Event.objects.filter(when__lte=end).exclude(repeat='false', when__lt=start)
+
+
+def rebuild(start, end):
+    """Drop the index and materialize every event for ``[start, end]``."""
+    created = 0
+    with transaction.atomic():
+        EventOccurrence.objects.all().delete()
+        OccurrenceHorizon.objects.all().delete()
+        horizon = OccurrenceHorizon.objects.create(starts=start, ends=end)
+        for event in _candidate_events(start, end).iterator():
+            rows = _build_rows(event, start, end)
+            EventOccurrence.objects.bulk_create(rows)
+            created += len(rows)
+    log.info("Occurrence index rebuilt start=%s end=%s rows=%s", start, end, created)
+    return horizon, created
+
+
+def extend(end):
+    """Materialize occurrences between the current horizon end and ``end``."""
+    horizon = get_horizon()
+    if horizon is None or end <= horizon.ends:
+        return horizon, 0
+    # Occurrences exactly at the old end are already indexed.
+    start = horizon.ends + timedelta(microseconds=1)
+    created = 0
+    with transaction.atomic():
+        for event in _candidate_events(start, end).iterator():
+            rows = _build_rows(event, start, end)
+            EventOccurrence.objects.bulk_create(rows)
+            created += len(rows)
+        horizon.ends = end
+        horizon.save(update_fields=['ends', 'updated_at'])
+    log.info("Occurrence index extended end=%s rows=%s", end, created)
+    return horizon, created
+
+
+@receiver(post_save, sender=Event)
+def _event_saved(sender, instance, raw=False, **kwargs):
+    # Deleted events lose their rows through the foreign key cascade.
+    if raw or not is_enabled():
+        return
+    materialize_event(instance)
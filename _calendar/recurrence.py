@@ -0,0 +1,80 @@
+"""
+Recurrence helpers for calendar events.
+
+Occurrences are computed directly from the event's anchor time and an index,
+so finding the first occurrence inside a window is constant time instead of
+stepping forward one interval at a time. Month-based repeats use real calendar
+months; when the anchor day does not exist in a month (e.g. the 31st), the
+occurrence falls on that month's last day.
+"""
+
+import calendar
+from datetime import timedelta
+
+DAY_STEPS = {
+    'daily': timedelta(days=1),
+    'weekly': timedelta(weeks=1),
+}
+
+MONTH_STEPS = {
+    'monthly': 1,
+    'bi-monthly': 2,
+    'semi-annually': 6,
+    'annually': 12,
+}
+
+
+def add_months(value, months):
+    """Shift a date/datetime by whole calendar months, clamping the day."""
+    total = value.month - 1 + months
+    year = value.year + total // 12
+    month = total % 12 + 1
+    day = min(value.day, calendar.monthrange(year, month)[1])
+    return value.replace(year=year, month=month, day=day)
+
+
+def is_recurring(repeat):
+    return repeat in DAY_STEPS or repeat in MONTH_STEPS
+
+
+def occurrence(anchor, repeat, index):
+    """Return the ``index``-th occurrence (0 is the anchor itself)."""
+    if repeat in DAY_STEPS:
+        return anchor + DAY_STEPS[repeat] * index
+    return add_months(anchor, MONTH_STEPS[repeat] * index)
+
+
+def first_index_on_or_after(anchor, repeat, start):
+    """Return the index of the first occurrence at or after ``start``."""
+    if start <= anchor:
+        return 0
+    if repeat in DAY_STEPS:
+        # Ceiling division of timedeltas.
+        return -((anchor - start) // DAY_STEPS[repeat])
+    step = MONTH_STEPS[repeat]
+    months = (start.year - anchor.year) * 12 + start.month - anchor.month
+    index = months // step
+    # The estimate lands in or before start's month; at most a couple of
+    # steps are needed to pass ``start`` itself.
+    while occurrence(anchor, repeat, index) < start:
+        index += 1
+    return index
+
+
+def iter_occurrences(anchor, repeat, start=None, end=None):
+    """
+    Yield occurrence datetimes in ``[start, end]`` in ascending order.
+
+    Either bound may be None. Non-recurring events yield at most the anchor.
+    """
+    if not is_recurring(repeat):
+        if (start is None or anchor >= start) and (end is None or anchor <= end):
+            yield anchor
+        return
+    index = first_index_on_or_after(anchor, repeat, start) if start is not None else 0
+    while True:
+        current = occurrence(anchor, repeat, index)
+        if end is not None and current > end:
+            return
+        yield current
+        index += 1
@@ -53,6 +53,44 @@ class EventModelTests(TestCase):
         # Expect at least two occurrences in a 3-day window.
         self.assertGreaterEqual(len(occurrences), 2)
 
+    def test_upcoming_recurring_skips_past_occurrences(self):
+        """Upcoming occurrences of an old recurring event start from now."""
+        event = Event.objects.create(
+            family=self.family,
+            title="Standup",
+            text="Daily",
+            when=timezone.now() - timedelta(days=400, hours=1),
+            host=self.user,
+            duration=timedelta(minutes=15),
+            repeat="daily",
+        )
+        upcoming = event.upcoming(count=3)
+        self.assertEqual(len(upcoming), 3)
+        self.assertGreaterEqual(upcoming[0], timezone.now() - timedelta(seconds=1))
+        self.assertEqual(upcoming[1] - upcoming[0], timedelta(days=1))
+
+    def test_get_occurrences_in_range_filters_in_sql(self):
+        """Past one-off and future events are not loaded for the window."""
+        start = timezone.now()
+        end = start + timedelta(days=7)
+        for title, when, repeat in [
+            ("Past", start - timedelta(days=3), "false"),
+            ("Future", end + timedelta(days=3), "weekly"),
+            ("Monthly", start - timedelta(days=365), "monthly"),
+        ]:
+            Event.objects.create(
+                family=self.family,
+                title=title,
+                text="",
+                when=when,
+                host=self.user,
+                duration=timedelta(minutes=15),
+                repeat=repeat,
+            )
+        with self.assertNumQueries(1):
+            occurrences = Event.get_occurrences_in_range(start, end, family=self.family)
+        self.assertTrue(all(event.title == "Monthly" for event, _ in occurrences))
+
     def test_is_recurring(self):
         """is_recurring reflects the repeat flag."""
         event = Event.objects.create(
@@ -0,0 +1,79 @@
+"""Tests for the materialized calendar occurrence index."""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from _calendar import occurrence_index
+from _calendar.models import Event, EventOccurrence
+from project.models import Family
+
+
+@override_settings(CALENDAR_OCCURRENCE_INDEX=True)
+class OccurrenceIndexTests(TestCase):
+    """Tests for building, maintaining, and querying the index."""
+
+    def setUp(self):
+        """Create a family with a weekly event and build the index."""
+        self.user = get_user_model().objects.create_user("indexer", password="Password123!")
+        self.family = Family.objects.create(name="IndexFamily")
+        self.event = self._create_event("Practice", timezone.now() - timedelta(days=60), "weekly")
+        call_command("extend_event_occurrences", months=2, stdout=StringIO())
+
+    def _create_event(self, title, when, repeat):
+        return Event.objects.create(
+            family=self.family,
+            title=title,
+            text="",
+            when=when,
+            host=self.user,
+            duration=timedelta(minutes=30),
+            repeat=repeat,
+        )
+
+    def test_index_matches_expanded_occurrences(self):
+        """Indexed occurrences equal the ones computed from the event."""
+        start = timezone.now()
+        end = start + timedelta(days=21)
+        with self.assertNumQueries(2):
+            indexed = Event.get_occurrences_in_range(start, end, family=self.family)
+            self.assertTrue(all(event.host.username == "indexer" for event, _ in indexed))
+        expanded = Event.expand_occurrences_in_range(start, end, family=self.family)
+        self.assertEqual([when for _, when in indexed], [when for _, when in expanded])
+        self.assertEqual(len(indexed), 3)
+
+    def test_event_save_and_delete_maintain_rows(self):
+        """Saving an event re-materializes it and deleting removes its rows."""
+        one_off = self._create_event("Dentist", timezone.now() + timedelta(days=3), "false")
+        self.assertEqual(EventOccurrence.objects.filter(event=one_off).count(), 1)
+
+        self.event.repeat = "daily"
+        self.event.save()
+        start = timezone.now()
+        occurrences = Event.get_occurrences_in_range(start, start + timedelta(days=7), family=self.family)
+        self.assertEqual(sum(1 for event, _ in occurrences if event.id == self.event.id), 7)
+
+        one_off.delete()
+        self.assertFalse(EventOccurrence.objects.filter(event_id=one_off.id).exists())
+
+    def test_extend_adds_only_new_window(self):
+        """Extending the horizon materializes only occurrences past the old end."""
+        before = EventOccurrence.objects.count()
+        old_end = occurrence_index.get_horizon().ends
+        call_command("extend_event_occurrences", months=6, stdout=StringIO())
+        horizon = occurrence_index.get_horizon()
+        self.assertGreater(horizon.ends, old_end)
+        self.assertGreater(EventOccurrence.objects.count(), before)
+        starts = list(EventOccurrence.objects.values_list("starts_at", flat=True))
+        self.assertEqual(len(starts), len(set(starts)))
+
+    def test_falls_back_outside_horizon(self):
+        """Ranges outside the horizon are expanded from events."""
+        start = timezone.now() + timedelta(days=3650)
+        self.assertFalse(occurrence_index.covers(start, start + timedelta(days=7)))
+        occurrences = Event.get_occurrences_in_range(start, start + timedelta(days=7), family=self.family)
+        self.assertEqual(len(occurrences), 1)
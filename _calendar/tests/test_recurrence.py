@@ -0,0 +1,60 @@
+"""Tests for the calendar recurrence helpers."""
+
+from datetime import datetime, timedelta, timezone
+
+from django.test import SimpleTestCase
+
+from _calendar import recurrence
+
+
+def _utc(*args):
+    return datetime(*args, tzinfo=timezone.utc)
+
+
+class RecurrenceTests(SimpleTestCase):
+    """Tests for occurrence arithmetic."""
+
+    def test_add_months_clamps_to_month_end(self):
+        """Month stepping keeps the anchor day where it exists."""
+        anchor = _utc(2024, 1, 31, 9)
+        self.assertEqual(recurrence.occurrence(anchor, "monthly", 1), _utc(2024, 2, 29, 9))
+        self.assertEqual(recurrence.occurrence(anchor, "monthly", 2), _utc(2024, 3, 31, 9))
+        self.assertEqual(recurrence.occurrence(anchor, "annually", 1), _utc(2025, 1, 31, 9))
+
+    def test_jumps_to_first_occurrence_in_window(self):
+        """Old daily events start at the window, not at the anchor."""
+        anchor = _utc(2021, 3, 1, 8)
+        start = _utc(2024, 6, 10)
+        end = _utc(2024, 6, 12, 23, 59, 59)
+        occurrences = list(recurrence.iter_occurrences(anchor, "daily", start, end))
+        self.assertEqual(
+            occurrences,
+            [_utc(2024, 6, 10, 8), _utc(2024, 6, 11, 8), _utc(2024, 6, 12, 8)],
+        )
+        self.assertEqual(
+            recurrence.first_index_on_or_after(anchor, "daily", start),
+            (start - anchor).days + 1,
+        )
+
+    def test_month_based_repeats_use_calendar_months(self):
+        """Bi-monthly and semi-annual events land on the same day of month."""
+        anchor = _utc(2023, 5, 15, 18)
+        start = _utc(2024, 11, 1)
+        end = _utc(2025, 12, 31)
+        self.assertEqual(
+            list(recurrence.iter_occurrences(anchor, "semi-annually", start, end)),
+            [_utc(2024, 11, 15, 18), _utc(2025, 5, 15, 18), _utc(2025, 11, 15, 18)],
+        )
+        self.assertEqual(
+            list(recurrence.iter_occurrences(anchor, "bi-monthly", _utc(2023, 7, 15, 18), _utc(2023, 9, 30))),
+            [_utc(2023, 7, 15, 18), _utc(2023, 9, 15, 18)],
+        )
+
+    def test_non_recurring_only_yields_anchor_in_window(self):
+        """One-off events appear only when the anchor is inside the window."""
+        anchor = _utc(2024, 1, 1)
+        self.assertEqual(list(recurrence.iter_occurrences(anchor, "false", anchor, anchor)), [anchor])
+        self.assertEqual(
+            list(recurrence.iter_occurrences(anchor, "false", anchor + timedelta(seconds=1))),
+            [],
+        )
@@ -70,6 +70,54 @@ class CalendarViewTests(TestCase):
         events = response.context["events"]
         self.assertTrue(any(evt.id == event.id for evt, _ in events))
 
+    def test_month_view_buckets_occurrences_by_day(self):
+        """Month cells receive only their own occurrences, hosts preloaded."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        first = timezone.localdate().replace(day=1)
+        url = reverse("month_view", args=[first.year, first.month])
+
+        def create_daily(host):
+            Event.objects.create(
+                family=self.family,
+                title=f"Daily {host.username}",
+                text="",
+                when=timezone.make_aware(timezone.datetime(first.year, first.month, 1, 7)),
+                host=host,
+                duration=timedelta(minutes=15),
+                repeat="daily",
+            )
+
+        create_daily(self.user)
+        self.client.get(url)  # Warm the membership cache.
+        with CaptureQueriesContext(connection) as one_host:
+            response = self.client.get(url)
+        cells = [cell for week in response.context["month_dates"] for cell in week if cell[0]]
+        self.assertTrue(all(len(events) == 1 for _, events in cells))
+        self.assertTrue(all(when.date() == day.date() for day, events in cells for _, when in events))
+
+        for name in ("helper1", "helper2"):
+            helper = get_user_model().objects.create_user(name, password="Password123!")
+            Membership.objects.create(user=helper, family=self.family, role="parent")
+            create_daily(helper)
+        with CaptureQueriesContext(connection) as three_hosts:
+            self.client.get(url)
+        self.assertEqual(len(one_host), len(three_hosts))
+
+    def test_calendar_views_render_one_quick_create_form(self):
+        """Month, week, and day views share a single event form."""
+        today = timezone.localdate()
+        urls = [
+            reverse("month_view", args=[today.year, today.month]),
+            reverse("week_view", args=[today.year, today.month, today.day]),
+            reverse("day_view", args=[today.year, today.month, today.day]),
+        ]
+        for url in urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.content.decode().count('name="title"'), 1, url)
+
     def test_event_create_rejects_attendee_outside_family(self):
         """Event create blocks attendees that are not in current family."""
         when = (timezone.now() + timedelta(days=1)).strftime("%Y-%m-%dT%H:%M")
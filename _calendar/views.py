@@ -1,4 +1,5 @@
 import logging
+from collections import defaultdict
 
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
@@ -9,7 +10,7 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated
 from .serializers import EventSerializer
 from datetime import datetime, timedelta
-from django.utils.timezone import make_aware
+from django.utils.timezone import localtime, make_aware
 
 """
 Handle creating, updating, deleting, and viewing events in the calendar.
@@ -23,6 +24,14 @@ Views:
 - `month_view`: View events for a specific month.
 """
 
+def _bucket_occurrences(occurrences, key):
+    """Group ``(event, occurrence)`` pairs by ``key(local occurrence time)``."""
+    buckets = defaultdict(list)
+    for event, occurrence in occurrences:
+        buckets[key(localtime(occurrence))].append((event, occurrence))
+    return buckets
+
+
 @login_required
 def event_create(request):
     """
@@ -172,6 +181,8 @@ def day_view(request, year, month, day):
             log.warning("Day view blocked: no family user_id=%s date=%s", request.user.id, date.date())
             return redirect('switch_family')
         occurrences = Event.get_occurrences_in_range(start_date, end_date, family=family)
+        by_hour = _bucket_occurrences(occurrences, lambda when: when.hour)
+        hours = [(hour, by_hour.get(hour, [])) for hour in range(24)]
         previous_date = date - timedelta(days=1)
         next_date = date + timedelta(days=1)
         form = EventForm(family=family)  # Add a single form instance
@@ -185,6 +196,7 @@ def day_view(request, year, month, day):
         return render(request, '_calendar/day_view.html', {
             'date': date,
             'events': occurrences,
+            'hours': hours,
             'previous_date': previous_date,
             'next_date': next_date,
             'form': form,  # Pass the form to the template
@@ -211,7 +223,11 @@ def week_view(request, year, month, day):
             log.warning("Week view blocked: no family user_id=%s start_date=%s", request.user.id, start_date.date())
             return redirect('switch_family')
         occurrences = Event.get_occurrences_in_range(start_date, end_date, family=family)
-        week_dates = [start_date + timedelta(days=i) for i in range(7)]
+        by_day = _bucket_occurrences(occurrences, lambda when: when.date())
+        week_dates = []
+        for offset in range(7):
+            day = start_date + timedelta(days=offset)
+            week_dates.append((day, by_day.get(day.date(), [])))
         previous_date = start_date - timedelta(days=7)
         next_date = start_date + timedelta(days=7)
         form = EventForm(family=family)  # Add a single form instance
@@ -261,16 +277,18 @@ def month_view(request, year, month):
         # Adjust start_date to the previous Sunday
         start_date -= timedelta(days=start_date.weekday() + 1) if start_date.weekday() != 6 else timedelta(days=0)
 
-        # Generate a list of weeks, each containing a list of days
+        by_day = _bucket_occurrences(occurrences, lambda when: when.date())
+
+        # Generate a list of weeks, each containing (day, occurrences) pairs
         month_dates = []
         current_date = start_date
         while current_date <= end_date or current_date.weekday() != 6:
             week = []
             for _ in range(7):
                 if current_date.month == month and current_date <= end_date:
-                    week.append(current_date)
+                    week.append((current_date, by_day.get(current_date.date(), [])))
                 else:
-                    week.append(None)  # Fill empty days with None
+                    week.append((None, []))  # Fill empty days with None
                 current_date += timedelta(days=1)
             month_dates.append(week)
 
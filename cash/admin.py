@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Category, Fund, Expense, Receipt, WalletTransaction
+from .models import CashDailyRollup, Category, Fund, Expense, FamilyCashBalance, Receipt, WalletTransaction
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
@@ -22,8 +22,9 @@ class ExpenseAdmin(admin.ModelAdmin):
 
 @admin.register(Receipt)
 class ReceiptAdmin(admin.ModelAdmin):
-    list_display = ('expense', 'family', 'uploaded_at')
+    list_display = ('expense', 'family', 'uploaded_at', 'processed_at')
     list_filter = ('family', 'uploaded_at')
+    readonly_fields = ('thumbnail', 'processed_at')
     search_fields = ('expense__note',)
 
 @admin.register(WalletTransaction)
@@ -31,3 +32,14 @@ class WalletTransactionAdmin(admin.ModelAdmin):
     list_display = ('user', 'family', 'direction', 'amount', 'date', 'note')
     list_filter = ('family', 'direction', 'date')
     search_fields = ('note', 'user__username')
+
+@admin.register(FamilyCashBalance)
+class FamilyCashBalanceAdmin(admin.ModelAdmin):
+    list_display = ('family', 'total_funds', 'total_expenses', 'updated_at')
+    readonly_fields = ('family', 'total_funds', 'total_expenses', 'updated_at')
+
+@admin.register(CashDailyRollup)
+class CashDailyRollupAdmin(admin.ModelAdmin):
+    list_display = ('family', 'day', 'income', 'expense', 'entry_count')
+    list_filter = ('family',)
+    date_hierarchy = 'day'
@@ -0,0 +1,154 @@
+"""
+Cash analytics over daily series.
+
+Amounts are handled as integer cents so long ranges never drift the way
+float sums do. Series are stored as NumPy ``int64`` arrays when NumPy is
+installed and as ``array('q')`` columns otherwise; both paths return plain
+lists of ints so callers (and JSON encoding) do not care which one ran.
+"""
+
+from array import array
+from decimal import ROUND_HALF_UP, Decimal
+
+try:
+	import numpy as np
+except ImportError:  # pragma: no cover - exercised when NumPy is absent
+	np = None
+
+HAS_NUMPY = np is not None
+
+BACKENDS = ('numpy', 'python')
+
+_CENT = Decimal('0.01')
+
+
+def to_cents(value):
+	"""Convert a Decimal/number amount to integer cents (half-up)."""
+	if value is None:
+		return 0
+	return int((Decimal(value) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents):
+	"""Convert integer cents back to a two-place Decimal."""
+	return (Decimal(int(cents)) / 100).quantize(_CENT)
+
+
+def _backend(backend):
+	if backend is None:
+		return 'numpy' if HAS_NUMPY else 'python'
+	if backend not in BACKENDS:
+		raise ValueError(f"Unknown analytics backend: {backend}")
+	if backend == 'numpy' and not HAS_NUMPY:
+		raise ValueError("The numpy analytics backend requires NumPy to be installed.")
+	return backend
+
+
+def column(cents, backend=None):
+	"""Return ``cents`` as the backend's integer column type."""
+	if _backend(backend) == 'numpy':
+		return np.asarray(cents, dtype=np.int64)
+	return array('q', cents)
+
+
+def _rounded_div(numerators, denominators):
+	# Integer division rounding halves up; exact for negative sums too.
+	return [(2 * num + den) // (2 * den) for num, den in zip(numerators, denominators)]
+
+
+def rolling_sum(cents, window, backend=None):
+	"""Sum of the trailing ``window`` values (fewer at the start of the series)."""
+	if window < 1:
+		raise ValueError("window must be at least 1")
+	if _backend(backend) == 'numpy':
+		totals = np.cumsum(column(cents, 'numpy'))
+		totals[window:] = totals[window:] - totals[:-window].copy()
+		return totals.tolist()
+	values = column(cents, 'python')
+	result = array('q')
+	running = 0
+	for index, value in enumerate(values):
+		running += value
+		if index >= window:
+			running -= values[index - window]
+		result.append(running)
+	return result.tolist()
+
+
+def rolling_mean(cents, window, backend=None):
+	"""Mean of the trailing ``window`` values in cents, rounded half-up."""
+	sums = rolling_sum(cents, window, backend)
+	if _backend(backend) == 'numpy':
+		sums = np.asarray(sums, dtype=np.int64)
+		counts = np.minimum(np.arange(1, len(sums) + 1, dtype=np.int64), window)
+		return ((2 * sums + counts) // (2 * counts)).tolist()
+	counts = [min(index + 1, window) for index in range(len(sums))]
+	return _rounded_div(sums, counts)
+
+
+def difference(left, right, backend=None):
+	"""Element-wise ``left - right``."""
+	if _backend(backend) == 'numpy':
+		return (column(left, 'numpy') - column(right, 'numpy')).tolist()
+	return [a - b for a, b in zip(left, right)]
+
+
+def cumulative_net(income, expenses, opening=0, backend=None):
+	"""Running balance of ``income - expenses`` starting from ``opening`` cents."""
+	if _backend(backend) == 'numpy':
+		net = column(income, 'numpy') - column(expenses, 'numpy')
+		return (np.cumsum(net) + opening).tolist()
+	result = []
+	running = opening
+	for inc, exp in zip(income, expenses):
+		running += inc - exp
+		result.append(running)
+	return result
+
+
+def month_over_month(days, cents):
+	"""
+	Group a daily series by calendar month.
+
+	Returns ``{'month', 'total', 'delta', 'change_pct'}`` dicts in date order;
+	``delta`` and ``change_pct`` are None for the first month (and
+	``change_pct`` when the previous month was zero).
+	"""
+	totals = {}
+	for day, value in zip(days, cents):
+		key = day.replace(day=1)
+		totals[key] = totals.get(key, 0) + value
+	months = []
+	previous = None
+	for month in sorted(totals):
+		total = totals[month]
+		delta = None if previous is None else total - previous
+		change_pct = None
+		if previous:
+			change_pct = round(delta * 100 / abs(previous), 1)
+		months.append({'month': month, 'total': total, 'delta': delta, 'change_pct': change_pct})
+		previous = total
+	return months
+
+
+def category_breakdown(rows):
+	"""
+	Summarise ``(category, cents)`` pairs, largest first.
+
+	Each entry has the category label, its total in cents and its share of
+	the overall total as a percentage rounded to one place.
+	"""
+	totals = {}
+	for category, value in rows:
+		totals[category] = totals.get(category, 0) + value
+	grand_total = sum(totals.values())
+	breakdown = []
+	for category, total in sorted(totals.items(), key=lambda item: (-item[1], str(item[0]))):
+		share = round(total * 100 / grand_total, 1) if grand_total else 0.0
+		breakdown.append({'category': category, 'total': total, 'share': share})
+	return breakdown
+
+
+def cents_to_float(cents):
+	"""Convert exact cent totals to floats for charting (no further arithmetic)."""
+	return [value / 100 for value in cents]
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CashConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'cash'
+
+    def ready(self):
+        from . import ledger  # noqa: F401  (registers signal receivers)
@@ -0,0 +1,212 @@
+"""
+Incrementally maintained family cash summaries.
+
+Fund and Expense signals apply the change in amount to the family's
+``FamilyCashBalance`` row and to the ``CashDailyRollup`` row for the entry's
+local day, each with a single ``UPDATE ... SET total = total + delta``.
+Fund.save and Expense.save wrap the write in a transaction, so the ledger row
+and the summary changes commit together. ``reconcile`` compares the stored
+balances with a full aggregate and can repair drift; ``rebuild_rollups``
+recomputes the daily rollups.
+"""
+
+import logging
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from project.models import Family
+from project.running_totals import create_or_apply, local_day
+
+from .models import CashDailyRollup, Expense, FamilyCashBalance, Fund
+
+log = logging.getLogger(__name__)
+
+_TOTAL_FIELDS = {Fund: 'total_funds', Expense: 'total_expenses'}
+_ROLLUP_FIELDS = {Fund: 'income', Expense: 'expense'}
+
+
+def _ledger_totals(family_id):
+	funds = Fund.objects.filter(family_id=family_id).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+	expenses = Expense.objects.filter(family_id=family_id).aggregate(total=Sum('amount'))['total'] or Decimal('0')
+	return funds, expenses
+
+
+def _create_balance(family_id, delta=None):
+	"""Create the balance row from a full aggregate; on a concurrent create, apply ``delta`` to that row."""
+	funds, expenses = _ledger_totals(family_id)
+	return create_or_apply(
+		FamilyCashBalance,
+		{'family_id': family_id},
+		{'total_funds': funds, 'total_expenses': expenses},
+		delta,
+	)
+
+
+def get_balance(family):
+	"""Return the family's balance row, creating it from the ledger if missing."""
+	balance = FamilyCashBalance.objects.filter(family=family).first()
+	return balance or _create_balance(family.id)
+
+
+def get_family_cash(family):
+	"""Return funds minus expenses for the family."""
+	return get_balance(family).available
+
+
+def apply_delta(model, family_id, delta, create=True):
+	"""
+	Add ``delta`` to the running total that tracks ``model`` rows.
+
+	A missing balance row is created from the ledger when ``create`` is set;
+	otherwise it is left for ``get_balance`` to build on the next read.
+	"""
+	if not delta:
+		return
+	field = _TOTAL_FIELDS[model]
+	updated = FamilyCashBalance.objects.filter(family_id=family_id).update(**{field: F(field) + delta})
+	if not updated and create and Family.objects.filter(id=family_id).exists():
+		# The aggregate already includes the row that triggered this change.
+		_create_balance(family_id, {field: delta})
+
+
+def reconcile(families=None, repair=False):
+	"""
+	Compare stored balances with ledger aggregates.
+
+	Returns a list of ``(family, stored, actual)`` tuples for mismatches, where
+	``stored`` and ``actual`` are ``(funds, expenses)`` pairs. With ``repair``,
+	mismatched or missing rows are rewritten from the aggregates.
+	"""
+	families = families if families is not None else Family.objects.all()
+	mismatches = []
+	for family in families:
+		actual = _ledger_totals(family.id)
+		balance = FamilyCashBalance.objects.filter(family=family).first()
+		stored = (balance.total_funds, balance.total_expenses) if balance else None
+		if stored == actual:
+			continue
+		mismatches.append((family, stored, actual))
+		if repair:
+			FamilyCashBalance.objects.update_or_create(
+				family=family,
+				defaults={'total_funds': actual[0], 'total_expenses': actual[1]},
+			)
+			log.warning("Cash balance repaired family_id=%s stored=%s actual=%s", family.id, stored, actual)
+	return mismatches
+
+
+def day_bounds(day):
+	"""Return the aware ``[start, end)`` datetimes covering a local day."""
+	start = timezone.make_aware(datetime.combine(day, time.min))
+	end = timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+	return start, end
+
+
+def _create_rollup(family_id, day, delta=None):
+	"""Create a day's rollup from the ledger; on a concurrent create, apply ``delta`` to that row."""
+	start, end = day_bounds(day)
+	values = {'entry_count': 0}
+	for model, field in _ROLLUP_FIELDS.items():
+		row = model.objects.filter(family_id=family_id, date__gte=start, date__lt=end).aggregate(
+			total=Sum('amount'),
+			entries=Count('id'),
+		)
+		values[field] = row['total'] or Decimal('0')
+		values['entry_count'] += row['entries']
+	create_or_apply(CashDailyRollup, {'family_id': family_id, 'day': day}, values, delta)
+
+
+def apply_rollup_delta(model, family_id, day, delta, entries, create=True):
+	"""Add ``delta`` and ``entries`` to the family's rollup for ``day``."""
+	if not delta and not entries:
+		return
+	field = _ROLLUP_FIELDS[model]
+	change = {field: delta, 'entry_count': entries}
+	updated = CashDailyRollup.objects.filter(family_id=family_id, day=day).update(
+		**{name: F(name) + value for name, value in change.items()}
+	)
+	if not updated and create and Family.objects.filter(id=family_id).exists():
+		_create_rollup(family_id, day, change)
+
+
+def rebuild_rollups(families=None):
+	"""Recompute daily rollups from the ledger; returns the number of rows written."""
+	rollups = CashDailyRollup.objects.all()
+	family_filter = {}
+	if families is not None:
+		family_ids = [family.id for family in families]
+		rollups = rollups.filter(family_id__in=family_ids)
+		family_filter = {'family_id__in': family_ids}
+
+	rows = {}
+	for model, field in _ROLLUP_FIELDS.items():
+		totals = (
+			model.objects.filter(**family_filter)
+			.annotate(day=TruncDate('date'))
+			.values('family_id', 'day')
+			.annotate(total=Sum('amount'), entries=Count('id'))
+		)
+		for row in totals:
+			key = (row['family_id'], row['day'])
+			rollup = rows.setdefault(key, CashDailyRollup(family_id=key[0], day=key[1]))
+			setattr(rollup, field, row['total'])
+			rollup.entry_count += row['entries']
+
+	with transaction.atomic():
+		rollups.delete()
+		CashDailyRollup.objects.bulk_create(rows.values(), batch_size=500)
+	return len(rows)
+
+
+@receiver(pre_save, sender=Fund)
+@receiver(pre_save, sender=Expense)
+def _remember_previous(sender, instance, **kwargs):
+	instance._ledger_previous = None
+	if instance.pk:
+		instance._ledger_previous = (
+			sender.objects.filter(pk=instance.pk).values_list('family_id', 'amount', 'date').first()
+		)
+
+
+@receiver(post_save, sender=Fund)
+@receiver(post_save, sender=Expense)
+def _entry_saved(sender, instance, raw=False, **kwargs):
+	if raw:
+		return
+	family_id = instance.family_id
+	amount = Decimal(instance.amount)
+	day = local_day(instance.date)
+	previous = getattr(instance, '_ledger_previous', None)
+	if not previous:
+		apply_delta(sender, family_id, amount)
+		apply_rollup_delta(sender, family_id, day, amount, 1)
+		return
+
+	previous_family_id, previous_amount, previous_date = previous
+	previous_day = local_day(previous_date)
+	if previous_family_id == family_id:
+		apply_delta(sender, family_id, amount - previous_amount)
+	else:
+		apply_delta(sender, previous_family_id, -previous_amount)
+		apply_delta(sender, family_id, amount)
+	if (previous_family_id, previous_day) == (family_id, day):
+		apply_rollup_delta(sender, family_id, day, amount - previous_amount, 0)
+	else:
+		apply_rollup_delta(sender, previous_family_id, previous_day, -previous_amount, -1)
+		apply_rollup_delta(sender, family_id, day, amount, 1)
+
+
+@receiver(post_delete, sender=Fund)
+@receiver(post_delete, sender=Expense)
+def _entry_deleted(sender, instance, **kwargs):
+	# Never create rows here (see project.running_totals).
+	amount = Decimal(instance.amount)
+	apply_delta(sender, instance.family_id, -amount, create=False)
+	apply_rollup_delta(sender, instance.family_id, local_day(instance.date), -amount, -1, create=False)
@@ -0,0 +1,21 @@
+"""
+Management command to rebuild CashDailyRollup rows from the Fund/Expense ledgers.
+
+Rollups are normally maintained by signals; run this after bulk imports or
+raw SQL changes that bypass them.
+"""
+
+from cash import ledger
+from project.commands import FamilyCommand
+
+
+class Command(FamilyCommand):
+    help = "Rebuild daily cash rollups from the Fund/Expense ledgers"
+
+    family_help = "Only rebuild this family id (may be repeated)"
+
+    def handle(self, *args, **options):
+        families = self.selected_families(options)
+
+        written = ledger.rebuild_rollups(families)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} daily rollup(s)."))
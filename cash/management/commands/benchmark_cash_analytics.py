@@ -0,0 +1,63 @@
+"""
+Management command to benchmark the cash analytics backends.
+
+Builds synthetic multi-year daily income/expense series in cents and times
+the rolling, cumulative and month-over-month helpers on each available
+backend. Nothing is read from or written to the database.
+"""
+
+import random
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from cash import analytics
+
+
+class Command(BaseCommand):
+    help = "Benchmark cash analytics on the NumPy and pure-Python backends"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--years", type=int, default=10, help="Length of the synthetic ledger in years")
+        parser.add_argument("--window", type=int, default=30, help="Rolling window in days")
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per backend (best is reported)")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for the synthetic ledger")
+
+    def handle(self, *args, **options):
+        if options["years"] < 1 or options["repeat"] < 1 or options["window"] < 1:
+            raise CommandError("--years, --window and --repeat must be positive.")
+
+        rng = random.Random(options["seed"])
+        length = options["years"] * 365
+        start = date(2000, 1, 1)
+        days = [start + timedelta(days=offset) for offset in range(length)]
+        income = [rng.choice((0, 0, 0, 250000)) + rng.randrange(0, 5000) for _ in days]
+        expenses = [rng.randrange(0, 20000) for _ in days]
+
+        backends = ["python"] + (["numpy"] if analytics.HAS_NUMPY else [])
+        if not analytics.HAS_NUMPY:
+            self.stdout.write(self.style.WARNING("NumPy is not installed; timing the pure-Python backend only."))
+
+        results = {}
+        for backend in backends:
+            best = None
+            for _ in range(options["repeat"]):
+                began = time.perf_counter()
+                rolling_income = analytics.rolling_sum(income, options["window"], backend)
+                rolling_expenses = analytics.rolling_sum(expenses, options["window"], backend)
+                analytics.difference(rolling_income, rolling_expenses, backend)
+                analytics.rolling_mean(expenses, options["window"], backend)
+                net = analytics.cumulative_net(income, expenses, backend=backend)
+                analytics.month_over_month(days, expenses)
+                elapsed = time.perf_counter() - began
+                best = elapsed if best is None else min(best, elapsed)
+            results[backend] = (best, net[-1])
+            self.stdout.write(f"{backend:>6}: {best * 1000:.2f} ms for {length} days")
+
+        closing = {balance for _, balance in results.values()}
+        if len(closing) != 1:
+            raise CommandError(f"Backends disagree on the closing balance: {results}")
+        self.stdout.write(
+            self.style.SUCCESS(f"Closing balance {analytics.from_cents(closing.pop())} matches across backends.")
+        )
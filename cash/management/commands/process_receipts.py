@@ -0,0 +1,28 @@
+"""
+Management command to process receipt images that are still unprocessed.
+
+Uploads are normally processed in the background right after upload; this
+catches up on receipts left behind (e.g. by a restart) and on receipts
+uploaded before processing existed.
+"""
+
+from cash import receipts
+from cash.models import Receipt
+from project.commands import FamilyCommand
+
+
+class Command(FamilyCommand):
+    help = "Auto-orient, strip, re-encode and thumbnail unprocessed receipt images"
+
+    def handle(self, *args, **options):
+        pending = Receipt.objects.filter(processed_at__isnull=True).order_by("id")
+        families = self.selected_families(options)
+        if families is not None:
+            pending = pending.filter(family__in=families)
+
+        receipt_ids = list(pending.values_list("id", flat=True))
+        processed = sum(receipts.process(receipt_id) for receipt_id in receipt_ids)
+        skipped = len(receipt_ids) - processed
+        if skipped:
+            self.stdout.write(self.style.WARNING(f"{skipped} receipt(s) could not be processed; see the log."))
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} of {len(receipt_ids)} pending receipt(s)."))
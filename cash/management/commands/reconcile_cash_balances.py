@@ -0,0 +1,43 @@
+"""
+Management command to verify (and optionally repair) FamilyCashBalance rows.
+
+Compares each family's stored fund/expense totals with a full aggregate over
+the Fund and Expense ledgers.
+"""
+
+from cash import ledger
+from project.commands import FamilyCommand
+from project.models import Family
+
+
+class Command(FamilyCommand):
+    help = "Verify FamilyCashBalance rows against the Fund/Expense ledgers"
+
+    family_help = "Only check this family id (may be repeated)"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Rewrite mismatched or missing balances from the ledger",
+        )
+
+    def handle(self, *args, **options):
+        families = self.selected_families(options)
+        if families is None:
+            families = list(Family.objects.order_by("id"))
+
+        mismatches = ledger.reconcile(families, repair=options["repair"])
+        for family, stored, actual in mismatches:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{family.name} (id={family.id}): stored={stored} actual={actual}"
+                    + (" [repaired]" if options["repair"] else "")
+                )
+            )
+
+        if mismatches and not options["repair"]:
+            self.stdout.write(self.style.ERROR(f"{len(mismatches)} balance(s) out of sync; rerun with --repair."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Checked {len(families)} families; {len(mismatches)} mismatch(es)."))
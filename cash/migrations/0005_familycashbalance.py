@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def backfill_cash_balances(apps, schema_editor):
+    Family = apps.get_model('project', 'Family')
+    Fund = apps.get_model('cash', 'Fund')
+    Expense = apps.get_model('cash', 'Expense')
+    FamilyCashBalance = apps.get_model('cash', 'FamilyCashBalance')
+    funds = dict(Fund.objects.values_list('family_id').annotate(total=Sum('amount')))
+    expenses = dict(Expense.objects.values_list('family_id').annotate(total=Sum('amount')))
+    FamilyCashBalance.objects.bulk_create([
+        FamilyCashBalance(
+            family_id=family_id,
+            total_funds=funds.get(family_id) or 0,
+            total_expenses=expenses.get(family_id) or 0,
+        )
+        for family_id in Family.objects.values_list('id', flat=True)
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cash', '0004_wallettransaction'),
+        ('project', '0005_alter_customuser_profile_pic'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FamilyCashBalance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_funds', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_expenses', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('family', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='cash_balance', to='project.family')),
+            ],
+        ),
+        migrations.RunPython(backfill_cash_balances, migrations.RunPython.noop),
+    ]
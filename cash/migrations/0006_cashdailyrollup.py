@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_cash_rollups(apps, schema_editor):
+    Fund = apps.get_model('cash', 'Fund')
+    Expense = apps.get_model('cash', 'Expense')
+    CashDailyRollup = apps.get_model('cash', 'CashDailyRollup')
+    rollups = {}
+    for model, field in ((Fund, 'income'), (Expense, 'expense')):
+        rows = (
+            model.objects.annotate(day=TruncDate('date'))
+            .values('family_id', 'day')
+            .annotate(total=Sum('amount'), entries=Count('id'))
+        )
+        for row in rows:
+            key = (row['family_id'], row['day'])
+            rollup = rollups.setdefault(key, CashDailyRollup(family_id=key[0], day=key[1]))
+            setattr(rollup, field, row['total'])
+            rollup.entry_count += row['entries']
+    CashDailyRollup.objects.bulk_create(rollups.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cash', '0005_familycashbalance'),
+        ('project', '0005_alter_customuser_profile_pic'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CashDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('income', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('expense', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('entry_count', models.IntegerField(default=0)),
+                ('family', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='cash_rollups', to='project.family')),
+            ],
+            options={
+                'ordering': ['day'],
+                'constraints': [models.UniqueConstraint(fields=('family', 'day'), name='uniq_cash_rollup_per_family_day')],
+            },
+        ),
+        migrations.RunPython(backfill_cash_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cash', '0006_cashdailyrollup'),
+        ('project', '0005_alter_customuser_profile_pic'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['family', 'date'], name='cash_expense_family_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='fund',
+            index=models.Index(fields=['family', 'date'], name='cash_fund_family_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='wallettransaction',
+            index=models.Index(fields=['user', 'family', 'date'], name='cash_wallet_user_fam_date_idx'),
+        ),
+    ]
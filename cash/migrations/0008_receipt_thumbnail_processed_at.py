@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cash', '0007_expense_cash_expense_family_date_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='receipt',
+            name='processed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='receipt',
+            name='thumbnail',
+            field=models.ImageField(blank=True, editable=False, upload_to='receipts/'),
+        ),
+    ]
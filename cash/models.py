@@ -1,5 +1,5 @@
 
-from django.db import models
+from django.db import models, transaction
 from django.conf import settings
 from django.utils import timezone
 
@@ -25,6 +25,16 @@ class Fund(models.Model):
 	date = models.DateTimeField(default=timezone.now, editable=True)
 	note = models.CharField(max_length=255, blank=True)
 
+	class Meta:
+		indexes = [
+			models.Index(fields=['family', 'date'], name='cash_fund_family_date_idx'),
+		]
+
+	def save(self, *args, **kwargs):
+		# Keep the row and its FamilyCashBalance update in one transaction.
+		with transaction.atomic():
+			super().save(*args, **kwargs)
+
 	def __str__(self):
 		return f"{self.user.username} - {self.amount} for {self.family.name} on {self.date:%Y-%m-%d}"
 
@@ -37,14 +47,73 @@ class Expense(models.Model):
 	date = models.DateTimeField(default=timezone.now, editable=True)
 	note = models.CharField(max_length=255, blank=True)
 
+	class Meta:
+		indexes = [
+			models.Index(fields=['family', 'date'], name='cash_expense_family_date_idx'),
+		]
+
+	def save(self, *args, **kwargs):
+		# Keep the row and its FamilyCashBalance update in one transaction.
+		with transaction.atomic():
+			super().save(*args, **kwargs)
+
 	def __str__(self):
 		return f"{self.user.username} - {self.amount} for {self.category} in {self.family.name} on {self.date:%Y-%m-%d}"
 
 
+class FamilyCashBalance(models.Model):
+	"""
+	Running fund and expense totals for a family.
+
+	Maintained by ``cash.ledger`` whenever a Fund or Expense is saved or
+	deleted, so the available cash figure is a single-row read.
+	"""
+	family = models.OneToOneField(Family, on_delete=models.CASCADE, related_name='cash_balance')
+	total_funds = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+	total_expenses = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	@property
+	def available(self):
+		return self.total_funds - self.total_expenses
+
+	def __str__(self):
+		return f"{self.family.name} cash balance {self.available}"
+
+
+class CashDailyRollup(models.Model):
+	"""
+	Per-family, per-day income and expense totals.
+
+	Days are local dates (``TIME_ZONE``). Maintained by ``cash.ledger`` on
+	Fund/Expense writes and rebuilt by the ``backfill_cash_rollups`` command.
+	"""
+	family = models.ForeignKey(Family, on_delete=models.CASCADE, related_name='cash_rollups')
+	day = models.DateField()
+	income = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+	expense = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+	entry_count = models.IntegerField(default=0)
+
+	class Meta:
+		ordering = ['day']
+		constraints = [
+			models.UniqueConstraint(
+				fields=['family', 'day'],
+				name='uniq_cash_rollup_per_family_day',
+			),
+		]
+
+	def __str__(self):
+		return f"{self.family.name} {self.day}: +{self.income} -{self.expense}"
+
+
 class Receipt(models.Model):
 	expense = models.ForeignKey(Expense, on_delete=models.CASCADE, related_name='receipts')
 	family = models.ForeignKey(Family, on_delete=models.CASCADE, related_name='receipts')
 	image = models.ImageField(upload_to='receipts/')
+	# Filled in by cash.receipts once the upload has been re-encoded.
+	thumbnail = models.ImageField(upload_to='receipts/', blank=True, editable=False)
+	processed_at = models.DateTimeField(null=True, blank=True, editable=False)
 	uploaded_at = models.DateTimeField(default=timezone.now, editable=True)
 
 	def __str__(self):
@@ -70,5 +139,10 @@ class WalletTransaction(models.Model):
 		related_name='wallet_transactions'
 	)
 
+	class Meta:
+		indexes = [
+			models.Index(fields=['user', 'family', 'date'], name='cash_wallet_user_fam_date_idx'),
+		]
+
 	def __str__(self):
 		return f"{self.user.username} {self.get_direction_display()} ${self.amount} on {self.date:%Y-%m-%d}"
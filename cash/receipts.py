@@ -0,0 +1,133 @@
+"""
+Receipt image processing.
+
+``upload_receipt`` stores the phone-camera upload as-is and calls
+``schedule``; once the upload has committed, ``process`` runs on a small
+background thread pool (``RECEIPT_WORKERS``, 0 to process inline). It
+auto-orients the image from its EXIF orientation, drops EXIF/XMP metadata
+(GPS included), caps the longest side at ``RECEIPT_MAX_DIMENSION`` and
+re-encodes it as WebP (JPEG where Pillow lacks WebP), then writes a
+``RECEIPT_THUMBNAIL_SIZE`` thumbnail beside it. Both files get random names,
+so media serving can cache them as immutable. The original upload is deleted
+once the receipt row points at the processed files.
+
+Receipts left unprocessed (e.g. by a restart) are picked up by
+``manage.py process_receipts``.
+"""
+
+import logging
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image
+
+from project import images
+
+from .models import Receipt
+
+log = logging.getLogger(__name__)
+
+
+def render(file):
+	"""
+	Return ``(image_bytes, thumbnail_bytes, extension)`` for an uploaded image.
+
+	Only the colour profile survives; EXIF and XMP are never written.
+	"""
+	limit = getattr(settings, 'RECEIPT_MAX_DIMENSION', 2048)
+	thumbnail_size = getattr(settings, 'RECEIPT_THUMBNAIL_SIZE', 256)
+	quality = getattr(settings, 'RECEIPT_IMAGE_QUALITY', 80)
+	image_format = images.output_format(getattr(settings, 'RECEIPT_IMAGE_FORMAT', 'auto'))
+	image, icc_profile = images.load(file, limit, image_format)
+	image.thumbnail((limit, limit), Image.Resampling.LANCZOS)
+	thumbnail = image.copy()
+	thumbnail.thumbnail((thumbnail_size, thumbnail_size), Image.Resampling.LANCZOS)
+	return (
+		images.encode(image, image_format, quality, icc_profile),
+		images.encode(thumbnail, image_format, quality, icc_profile),
+		images.EXTENSIONS[image_format],
+	)
+
+
+def process(receipt_id):
+	"""Re-encode a stored receipt and write its thumbnail; returns True when the row was updated."""
+	receipt = Receipt.objects.filter(pk=receipt_id, processed_at__isnull=True).first()
+	if receipt is None or not receipt.image:
+		return False
+	original = receipt.image.name
+	try:
+		with receipt.image.open('rb') as file:
+			image_bytes, thumbnail_bytes, extension = render(file)
+	except (OSError, ValueError, Image.DecompressionBombError):
+		# Unreadable or oversized: keep the original and don't retry it.
+		log.warning("Receipt image could not be processed receipt_id=%s name=%s", receipt_id, original, exc_info=True)
+		Receipt.objects.filter(pk=receipt_id, image=original).update(processed_at=timezone.now())
+		return False
+
+	storage = receipt.image.storage
+	stem = os.path.join(os.path.dirname(original), uuid.uuid4().hex)
+	image_name = storage.save(f"{stem}.{extension}", ContentFile(image_bytes))
+	thumbnail_name = storage.save(f"{stem}_thumb.{extension}", ContentFile(thumbnail_bytes))
+	updated = Receipt.objects.filter(pk=receipt_id, image=original, processed_at__isnull=True).update(
+		image=image_name,
+		thumbnail=thumbnail_name,
+		processed_at=timezone.now(),
+	)
+	if updated:
+		storage.delete(original)
+	else:
+		# Deleted or replaced while we worked: drop our output instead.
+		storage.delete(image_name)
+		storage.delete(thumbnail_name)
+	log.info(
+		"Receipt processed receipt_id=%s updated=%s image_bytes=%s thumbnail_bytes=%s",
+		receipt_id,
+		bool(updated),
+		len(image_bytes),
+		len(thumbnail_bytes),
+	)
+	return bool(updated)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+	global _executor
+	with _executor_lock:
+		if _executor is None:
+			_executor = ThreadPoolExecutor(
+				max_workers=getattr(settings, 'RECEIPT_WORKERS', 2),
+				thread_name_prefix='receipts',
+			)
+		return _executor
+
+
+def _pooled_process(receipt_id):
+	# Pool threads hold their own connections; treat each job like a request
+	# so connections past CONN_MAX_AGE (or broken) are closed.
+	close_old_connections()
+	try:
+		return process(receipt_id)
+	except Exception:
+		log.exception("Receipt processing failed receipt_id=%s", receipt_id)
+		return False
+	finally:
+		close_old_connections()
+
+
+def schedule(receipt_id):
+	"""Process the receipt once the current transaction commits, on the pool unless RECEIPT_WORKERS is 0."""
+	def submit():
+		if getattr(settings, 'RECEIPT_WORKERS', 2) > 0:
+			_get_executor().submit(_pooled_process, receipt_id)
+		else:
+			process(receipt_id)
+	transaction.on_commit(submit)
@@ -0,0 +1,82 @@
+"""Tests for the cash analytics helpers."""
+
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from cash import analytics
+
+
+class CashAnalyticsTests(SimpleTestCase):
+    """Tests for the integer-cent analytics on the pure-Python backend."""
+
+    backend = "python"
+
+    def test_cents_round_trip(self):
+        """Amounts convert to integer cents and back without drift."""
+        self.assertEqual(analytics.to_cents(Decimal("19.99")), 1999)
+        self.assertEqual(analytics.to_cents(None), 0)
+        self.assertEqual(analytics.from_cents(1999), Decimal("19.99"))
+
+    def test_rolling_sum_is_exact(self):
+        """Rolling sums of cents stay exact where float sums drift."""
+        cents = [10] * 1000
+        self.assertEqual(analytics.rolling_sum(cents, 3, self.backend)[:4], [10, 20, 30, 30])
+        totals = analytics.rolling_sum(cents, 1000, self.backend)
+        self.assertEqual(analytics.from_cents(totals[-1]), Decimal("100.00"))
+        self.assertNotEqual(sum([0.1] * 1000), 100.0)
+
+    def test_rolling_mean_rounds_half_up(self):
+        """Means use the available values at the start of the series."""
+        self.assertEqual(analytics.rolling_mean([1, 2, 4, -7], 2, self.backend), [1, 2, 3, -1])
+
+    def test_cumulative_net(self):
+        """Cumulative net starts from the opening balance."""
+        self.assertEqual(
+            analytics.cumulative_net([100, 0, 50], [30, 40, 0], opening=5, backend=self.backend),
+            [75, 35, 85],
+        )
+
+    def test_month_over_month(self):
+        """Daily values group into months with deltas and percentage change."""
+        start = date(2024, 1, 30)
+        days = [start + timedelta(days=offset) for offset in range(4)]
+        months = analytics.month_over_month(days, [100, 100, 150, 150])
+        self.assertEqual([row["month"] for row in months], [date(2024, 1, 1), date(2024, 2, 1)])
+        self.assertEqual(months[0]["delta"], None)
+        self.assertEqual(months[1]["delta"], 100)
+        self.assertEqual(months[1]["change_pct"], 50.0)
+
+    def test_category_breakdown(self):
+        """Categories are merged, sorted by total and given shares."""
+        breakdown = analytics.category_breakdown([("Food", 300), ("Fuel", 100), ("Food", 100)])
+        self.assertEqual(
+            breakdown,
+            [{"category": "Food", "total": 400, "share": 80.0}, {"category": "Fuel", "total": 100, "share": 20.0}],
+        )
+
+    def test_unknown_backend_rejected(self):
+        """Backends are validated."""
+        with self.assertRaises(ValueError):
+            analytics.rolling_sum([1], 1, backend="fortran")
+
+
+@unittest.skipUnless(analytics.HAS_NUMPY, "NumPy is not installed")
+class NumpyCashAnalyticsTests(CashAnalyticsTests):
+    """The same checks on the NumPy backend."""
+
+    backend = "numpy"
+
+
+class BenchmarkCommandTests(SimpleTestCase):
+    """Tests for the benchmark_cash_analytics command."""
+
+    def test_backends_agree(self):
+        """The benchmark runs and reports a matching closing balance."""
+        out = StringIO()
+        call_command("benchmark_cash_analytics", years=1, repeat=1, stdout=out)
+        self.assertIn("matches across backends", out.getvalue())
@@ -0,0 +1,82 @@
+"""Tests for incrementally maintained family cash balances."""
+
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from cash import ledger
+from cash.models import Expense, FamilyCashBalance, Fund
+from project.models import Family
+
+
+class FamilyCashBalanceTests(TestCase):
+    """Tests for FamilyCashBalance maintenance and reconciliation."""
+
+    def setUp(self):
+        """Create a user and family."""
+        self.user = get_user_model().objects.create_user("ledger", password="Password123!")
+        self.family = Family.objects.create(name="Ledger")
+
+    def _balance(self):
+        return FamilyCashBalance.objects.get(family=self.family)
+
+    def test_create_update_delete_track_totals(self):
+        """Fund and expense writes keep the balance in step."""
+        fund = Fund.objects.create(user=self.user, family=self.family, amount=Decimal("100.10"))
+        expense = Expense.objects.create(user=self.user, family=self.family, amount=Decimal("30.05"))
+        self.assertEqual(self._balance().available, Decimal("70.05"))
+
+        fund.amount = Decimal("120.10")
+        fund.save()
+        expense.delete()
+        balance = self._balance()
+        self.assertEqual(balance.total_funds, Decimal("120.10"))
+        self.assertEqual(balance.total_expenses, Decimal("0"))
+
+    def test_moving_entry_between_families(self):
+        """Changing an entry's family moves its amount between balances."""
+        other = Family.objects.create(name="Other Ledger")
+        fund = Fund.objects.create(user=self.user, family=self.family, amount=Decimal("50"))
+        ledger.get_balance(other)
+        fund.family = other
+        fund.save()
+        self.assertEqual(ledger.get_family_cash(self.family), Decimal("0"))
+        self.assertEqual(ledger.get_family_cash(other), Decimal("50"))
+
+    def test_losing_a_concurrent_create_still_applies_the_change(self):
+        """If another transaction created the balance first, this save's amount is added to it."""
+        # The winner's aggregate could not see this transaction's new fund.
+        FamilyCashBalance.objects.create(family=self.family, total_funds=Decimal("10"), total_expenses=Decimal("0"))
+        balance = ledger._create_balance(self.family.id, {"total_funds": Decimal("5")})
+        self.assertEqual(balance.total_funds, Decimal("15"))
+
+    def test_get_family_cash_is_single_query(self):
+        """Reading available cash does not aggregate the ledger."""
+        for _ in range(3):
+            Fund.objects.create(user=self.user, family=self.family, amount=Decimal("10"))
+        with self.assertNumQueries(1):
+            self.assertEqual(ledger.get_family_cash(self.family), Decimal("30"))
+
+    def test_family_delete_cascades(self):
+        """Deleting a family with ledger rows does not recreate its balance."""
+        Fund.objects.create(user=self.user, family=self.family, amount=Decimal("10"))
+        family_id = self.family.id
+        self.family.delete()
+        self.assertFalse(FamilyCashBalance.objects.filter(family_id=family_id).exists())
+
+    def test_reconcile_command_repairs_drift(self):
+        """The reconcile command reports and fixes a drifted balance."""
+        Fund.objects.create(user=self.user, family=self.family, amount=Decimal("10"))
+        FamilyCashBalance.objects.filter(family=self.family).update(total_funds=Decimal("99"))
+
+        out = StringIO()
+        call_command("reconcile_cash_balances", stdout=out)
+        self.assertIn("out of sync", out.getvalue())
+        self.assertEqual(self._balance().total_funds, Decimal("99"))
+
+        call_command("reconcile_cash_balances", repair=True, stdout=StringIO())
+        self.assertEqual(self._balance().total_funds, Decimal("10"))
+        self.assertEqual(ledger.reconcile([self.family]), [])
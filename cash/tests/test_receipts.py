@@ -0,0 +1,124 @@
+"""Tests for the receipt image pipeline."""
+
+import io
+import shutil
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from cash import receipts
+from cash.models import Expense, Receipt
+from project.models import Family, Membership
+
+
+def _photo(size=(400, 200), orientation=6, image_format="JPEG", mode="RGB"):
+    """Return the bytes of a camera-style photo tagged with an EXIF orientation."""
+    exif = Image.Exif()
+    exif[0x0112] = orientation
+    exif[0x010F] = "PhoneMaker"
+    buffer = io.BytesIO()
+    Image.new(mode, size, color=(200, 30, 30, 128)[: len(mode)]).save(buffer, format=image_format, exif=exif.tobytes())
+    return buffer.getvalue()
+
+
+@override_settings(RECEIPT_WORKERS=0, RECEIPT_MAX_DIMENSION=100, RECEIPT_THUMBNAIL_SIZE=32, RECEIPT_IMAGE_FORMAT="auto")
+class ReceiptPipelineTests(TestCase):
+    """Uploads are oriented, stripped, capped, re-encoded and thumbnailed."""
+
+    def setUp(self):
+        """Create a parent with an expense and a temporary MEDIA_ROOT."""
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = get_user_model().objects.create_user("receiptparent", password="Password123!")
+        self.family = Family.objects.create(name="ReceiptFamily")
+        Membership.objects.create(user=self.user, family=self.family, role="parent")
+        self.expense = Expense.objects.create(user=self.user, family=self.family, amount="9.99", note="Hardware")
+
+    def _receipt(self, data, name="photo.jpg"):
+        """Store an unprocessed receipt the way the upload form does."""
+        receipt = Receipt(expense=self.expense, family=self.family)
+        receipt.image.save(name, ContentFile(data), save=True)
+        return receipt
+
+    def test_render_orients_caps_and_strips_metadata(self):
+        """EXIF rotation is applied, sizes are capped and no EXIF is written."""
+        image_bytes, thumbnail_bytes, extension = receipts.render(io.BytesIO(_photo()))
+        self.assertEqual(extension, "webp")
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            self.assertEqual(image.format, "WEBP")
+            self.assertEqual(image.size, (50, 100))
+            self.assertEqual(len(image.getexif()), 0)
+        with Image.open(io.BytesIO(thumbnail_bytes)) as thumbnail:
+            self.assertEqual(thumbnail.size, (16, 32))
+
+    @override_settings(RECEIPT_IMAGE_FORMAT="jpeg")
+    def test_jpeg_output_flattens_transparency(self):
+        """Transparent uploads are composited onto white for JPEG."""
+        image_bytes, _, extension = receipts.render(io.BytesIO(_photo(image_format="PNG", mode="RGBA")))
+        self.assertEqual(extension, "jpg")
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            self.assertEqual((image.format, image.mode), ("JPEG", "RGB"))
+
+    def test_upload_is_processed_after_commit(self):
+        """Uploading replaces the original with processed files and shows the thumbnail."""
+        self.client.force_login(self.user)
+        session = self.client.session
+        session["current_family_id"] = self.family.id
+        session.save()
+        upload = SimpleUploadedFile("IMG_0001.jpg", _photo(), content_type="image/jpeg")
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("upload_receipt", args=[self.expense.id]), {"image": upload})
+        self.assertEqual(response.status_code, 302)
+        receipt = Receipt.objects.get(expense=self.expense)
+        self.assertIsNotNone(receipt.processed_at)
+        self.assertRegex(receipt.image.name, r"^receipts/[0-9a-f]{32}\.webp$")
+        self.assertEqual(receipt.thumbnail.name, receipt.image.name.replace(".webp", "_thumb.webp"))
+        storage = receipt.image.storage
+        self.assertTrue(storage.exists(receipt.thumbnail.name))
+        self.assertFalse(storage.exists("receipts/IMG_0001.jpg"))
+        page = self.client.get(reverse("cash_transaction_list"))
+        self.assertContains(page, f'src="{receipt.thumbnail.url}"')
+
+    def test_schedule_uses_the_pool(self):
+        """With workers configured, processing is submitted to the pool after commit."""
+        receipt = self._receipt(_photo())
+        executor = mock.Mock()
+        with override_settings(RECEIPT_WORKERS=2), mock.patch.object(receipts, "_get_executor", return_value=executor):
+            with self.captureOnCommitCallbacks(execute=True):
+                receipts.schedule(receipt.id)
+        executor.submit.assert_called_once_with(receipts._pooled_process, receipt.id)
+        receipt.refresh_from_db()
+        self.assertIsNone(receipt.processed_at)
+
+    def test_unreadable_upload_is_kept_and_not_retried(self):
+        """A file Pillow cannot read stays as uploaded and is marked processed."""
+        receipt = self._receipt(b"not an image", name="broken.jpg")
+        self.assertFalse(receipts.process(receipt.id))
+        receipt.refresh_from_db()
+        self.assertIsNotNone(receipt.processed_at)
+        self.assertEqual(receipt.thumbnail.name, "")
+        self.assertTrue(receipt.image.storage.exists(receipt.image.name))
+        self.assertFalse(receipts.process(receipt.id))
+
+    def test_command_processes_pending_receipts(self):
+        """process_receipts catches up on receipts never processed."""
+        pending = self._receipt(_photo())
+        out = StringIO()
+        call_command("process_receipts", stdout=out)
+        self.assertIn("Processed 1 of 1", out.getvalue())
+        pending.refresh_from_db()
+        self.assertTrue(pending.thumbnail)
+        out = StringIO()
+        call_command("process_receipts", stdout=out)
+        self.assertIn("Processed 0 of 0", out.getvalue())
@@ -0,0 +1,104 @@
+"""Tests for incrementally maintained daily cash rollups."""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from cash import ledger
+from cash.models import CashDailyRollup, Expense, Fund
+from project.models import Family, Membership
+
+
+class CashDailyRollupTests(TestCase):
+    """Tests for CashDailyRollup maintenance and rebuilds."""
+
+    def setUp(self):
+        """Create a parent in a family and two local days to post entries on."""
+        self.user = get_user_model().objects.create_user("rollup", password="Password123!")
+        self.family = Family.objects.create(name="Rollup")
+        Membership.objects.create(user=self.user, family=self.family, role="parent")
+        self.today = timezone.localdate()
+        self.yesterday = self.today - timedelta(days=1)
+
+    def _at(self, day, hour=12):
+        return timezone.make_aware(datetime(day.year, day.month, day.day, hour))
+
+    def _rollup(self, day):
+        return CashDailyRollup.objects.get(family=self.family, day=day)
+
+    def test_entries_accumulate_per_day(self):
+        """Funds and expenses add to their local day's rollup."""
+        Fund.objects.create(user=self.user, family=self.family, amount=Decimal("40"), date=self._at(self.today, 1))
+        Fund.objects.create(user=self.user, family=self.family, amount=Decimal("2.50"), date=self._at(self.today, 23))
+        Expense.objects.create(user=self.user, family=self.family, amount=Decimal("12.25"), date=self._at(self.today))
+        rollup = self._rollup(self.today)
+        self.assertEqual(rollup.income, Decimal("42.50"))
+        self.assertEqual(rollup.expense, Decimal("12.25"))
+        self.assertEqual(rollup.entry_count, 3)
+
+    def test_update_moves_between_days_and_delete_subtracts(self):
+        """Editing an entry's date or amount moves it; deleting removes it."""
+        fund = Fund.objects.create(user=self.user, family=self.family, amount=Decimal("10"), date=self._at(self.yesterday))
+        fund.date = self._at(self.today)
+        fund.amount = Decimal("15")
+        fund.save()
+        self.assertEqual(self._rollup(self.yesterday).income, Decimal("0"))
+        self.assertEqual(self._rollup(self.yesterday).entry_count, 0)
+        self.assertEqual(self._rollup(self.today).income, Decimal("15"))
+
+        fund.delete()
+        rollup = self._rollup(self.today)
+        self.assertEqual(rollup.income, Decimal("0"))
+        self.assertEqual(rollup.entry_count, 0)
+
+    def test_rebuild_matches_signal_maintained_rows(self):
+        """Rebuilding from the ledger reproduces the incremental rollups."""
+        Fund.objects.create(user=self.user, family=self.family, amount=Decimal("5"), date=self._at(self.yesterday))
+        Expense.objects.create(user=self.user, family=self.family, amount=Decimal("3"), date=self._at(self.today))
+        expected = list(CashDailyRollup.objects.values_list("day", "income", "expense", "entry_count"))
+
+        CashDailyRollup.objects.update(income=0, expense=0, entry_count=0)
+        out = StringIO()
+        call_command("backfill_cash_rollups", family_ids=[self.family.id], stdout=out)
+        self.assertIn("Wrote 2", out.getvalue())
+        self.assertEqual(
+            list(CashDailyRollup.objects.values_list("day", "income", "expense", "entry_count")),
+            expected,
+        )
+
+    def test_missing_row_is_recreated_from_ledger(self):
+        """A missing rollup is rebuilt from the day's entries on the next write."""
+        Fund.objects.create(user=self.user, family=self.family, amount=Decimal("7"), date=self._at(self.today))
+        CashDailyRollup.objects.all().delete()
+        Fund.objects.create(user=self.user, family=self.family, amount=Decimal("1"), date=self._at(self.today))
+        rollup = self._rollup(self.today)
+        self.assertEqual(rollup.income, Decimal("8"))
+        self.assertEqual(rollup.entry_count, 2)
+
+    def test_losing_a_concurrent_create_still_applies_the_change(self):
+        """If another transaction created the day's rollup first, this entry is added to it."""
+        # The winner's aggregate could not see this transaction's new expense.
+        CashDailyRollup.objects.create(family=self.family, day=self.today, income=Decimal("40"), entry_count=1)
+        ledger._create_rollup(self.family.id, self.today, {"expense": Decimal("7"), "entry_count": 1})
+        rollup = self._rollup(self.today)
+        self.assertEqual((rollup.income, rollup.expense, rollup.entry_count), (Decimal("40"), Decimal("7"), 2))
+
+    def test_day_bounds_cover_local_day(self):
+        """day_bounds returns consecutive local midnights."""
+        start, end = ledger.day_bounds(self.today)
+        self.assertEqual(timezone.localtime(start).date(), self.today)
+        self.assertEqual(timezone.localtime(end).date(), self.today + timedelta(days=1))
+
+    def test_dashboard_reads_rollups(self):
+        """The transaction dashboard charts the rollup totals."""
+        Fund.objects.create(user=self.user, family=self.family, amount=Decimal("20"), date=self._at(self.today))
+        self.client.login(username="rollup", password="Password123!")
+        response = self.client.get(reverse("cash_transaction_dashboard"), {"days": 30})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("20.0", response.context["chart_data"])
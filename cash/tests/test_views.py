@@ -111,6 +111,15 @@ class CashViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn("family_cash", response.context)
 
+    def test_cash_transaction_list_search_matches_note_substrings(self):
+        """The ledger search is an exact substring match, not the fuzzy site search."""
+        Fund.objects.create(user=self.user, family=self.family, amount="100.00", note="Paycheck")
+        Fund.objects.create(user=self.user, family=self.family, amount="20.00", note="Pay back")
+        response = self.client.get(reverse("cash_transaction_list"), {"search": "check"})
+        self.assertEqual([fund.note for fund in response.context["funds"]], ["Paycheck"])
+        response = self.client.get(reverse("cash_transaction_list"), {"search": "Paychek"})
+        self.assertEqual(list(response.context["funds"]), [])
+
     def test_cash_transaction_list_family_cash_is_not_filter_scoped(self):
         """Available cash uses all-time totals, not only filtered table rows."""
         Fund.objects.create(user=self.user, family=self.family, amount="100.00", note="Paycheck")
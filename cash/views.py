@@ -1,21 +1,19 @@
 import logging
 import json
-from collections import deque
 
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.db.models import Q, Sum
-from django.db.models.functions import TruncDate
 from django.http import HttpResponseForbidden
-from .models import Fund, Expense, Category, Receipt, WalletTransaction
+from .models import CashDailyRollup, Fund, Expense, Category, Receipt, WalletTransaction
 from .forms import FundForm, ExpenseForm, ReceiptForm, CategoryForm, WalletTransactionForm
+from . import analytics, ledger, receipts
 from django.utils import timezone
 from datetime import timedelta
-from project.models import Membership
 
 
-def _has_cash_access(user, family):
-	membership = Membership.objects.filter(user=user, family=family).first()
+def _has_cash_access(request):
+	membership = getattr(request, 'current_membership', None)
 	return bool(membership and membership.role == 'parent')
 
 @login_required
@@ -26,7 +24,7 @@ def edit_expense(request, expense_id):
 		if not current_family:
 			log.warning("Edit expense blocked: no current family user_id=%s", request.user.id)
 			return redirect('switch_family')
-		if not _has_cash_access(request.user, current_family):
+		if not _has_cash_access(request):
 			log.warning("Edit expense blocked: unauthorized role user_id=%s family_id=%s", request.user.id, current_family.id)
 			return HttpResponseForbidden("You do not have access to cash features.")
 		expense = get_object_or_404(Expense, id=expense_id, family=current_family)
@@ -63,7 +61,7 @@ def delete_expense(request, expense_id):
 		if not current_family:
 			log.warning("Delete expense blocked: no current family user_id=%s", request.user.id)
 			return redirect('switch_family')
-		if not _has_cash_access(request.user, current_family):
+		if not _has_cash_access(request):
 			log.warning("Delete expense blocked: unauthorized role user_id=%s family_id=%s", request.user.id, current_family.id)
 			return HttpResponseForbidden("You do not have access to cash features.")
 		expense = get_object_or_404(Expense, id=expense_id, family=current_family)
@@ -90,7 +88,7 @@ def edit_fund(request, fund_id):
 		if not current_family:
 			log.warning("Edit fund blocked: no current family user_id=%s", request.user.id)
 			return redirect('switch_family')
-		if not _has_cash_access(request.user, current_family):
+		if not _has_cash_access(request):
 			log.warning("Edit fund blocked: unauthorized role user_id=%s family_id=%s", request.user.id, current_family.id)
 			return HttpResponseForbidden("You do not have access to cash features.")
 		fund = get_object_or_404(Fund, id=fund_id, family=current_family)
@@ -127,7 +125,7 @@ def delete_fund(request, fund_id):
 		if not current_family:
 			log.warning("Delete fund blocked: no current family user_id=%s", request.user.id)
 			return redirect('switch_family')
-		if not _has_cash_access(request.user, current_family):
+		if not _has_cash_access(request):
 			log.warning("Delete fund blocked: unauthorized role user_id=%s family_id=%s", request.user.id, current_family.id)
 			return HttpResponseForbidden("You do not have access to cash features.")
 		fund = get_object_or_404(Fund, id=fund_id, family=current_family)
@@ -154,7 +152,7 @@ def add_fund(request):
 		if not current_family:
 			log.warning("Add fund blocked: no current family user_id=%s", request.user.id)
 			return redirect('switch_family')
-		if not _has_cash_access(request.user, current_family):
+		if not _has_cash_access(request):
 			log.warning("Add fund blocked: unauthorized role user_id=%s family_id=%s", request.user.id, current_family.id)
 			return HttpResponseForbidden("You do not have access to cash features.")
 		if request.method == 'POST':
@@ -188,7 +186,7 @@ def add_expense(request):
 		if not current_family:
 			log.warning("Add expense blocked: no current family user_id=%s", request.user.id)
 			return redirect('switch_family')
-		if not _has_cash_access(request.user, current_family):
+		if not _has_cash_access(request):
 			log.warning("Add expense blocked: unauthorized role user_id=%s family_id=%s", request.user.id, current_family.id)
 			return HttpResponseForbidden("You do not have access to cash features.")
 		category_form = CategoryForm()
@@ -241,7 +239,7 @@ def upload_receipt(request, expense_id):
 		if not current_family:
 			log.warning("Upload receipt blocked: no current family user_id=%s", request.user.id)
 			return redirect('switch_family')
-		if not _has_cash_access(request.user, current_family):
+		if not _has_cash_access(request):
 			log.warning("Upload receipt blocked: unauthorized role user_id=%s family_id=%s", request.user.id, current_family.id)
 			return HttpResponseForbidden("You do not have access to cash features.")
 		expense = get_object_or_404(Expense, id=expense_id, user=request.user, family=current_family)
@@ -252,6 +250,7 @@ def upload_receipt(request, expense_id):
 				receipt.expense = expense
 				receipt.family = current_family
 				receipt.save()
+				receipts.schedule(receipt.id)
 				log.info(
 					"Receipt uploaded user_id=%s family_id=%s expense_id=%s receipt_id=%s",
 					request.user.id,
@@ -277,7 +276,7 @@ def cash_transaction_list(request):
 		if not current_family:
 			log.warning("Transaction list blocked: no current family user_id=%s", request.user.id)
 			return redirect('switch_family')
-		if not _has_cash_access(request.user, current_family):
+		if not _has_cash_access(request):
 			log.warning("Transaction list blocked: unauthorized role user_id=%s family_id=%s", request.user.id, current_family.id)
 			return HttpResponseForbidden("You do not have access to cash features.")
 		period = request.GET.get('period', 'week')
@@ -295,9 +294,7 @@ def cash_transaction_list(request):
 
 		funds = Fund.objects.filter(family=current_family)
 		expenses = Expense.objects.filter(family=current_family)
-		cash_total = funds.aggregate(total=Sum('amount'))['total'] or 0
-		expense_total = expenses.aggregate(total=Sum('amount'))['total'] or 0
-		family_cash = cash_total - expense_total
+		family_cash = ledger.get_family_cash(current_family)
 		if start:
 			funds = funds.filter(date__gte=start)
 			expenses = expenses.filter(date__gte=start)
@@ -339,7 +336,7 @@ def cash_transaction_dashboard(request):
 		if not current_family:
 			log.warning("Transaction dashboard blocked: no current family user_id=%s", request.user.id)
 			return redirect('switch_family')
-		if not _has_cash_access(request.user, current_family):
+		if not _has_cash_access(request):
 			log.warning("Transaction dashboard blocked: unauthorized role user_id=%s family_id=%s", request.user.id, current_family.id)
 			return HttpResponseForbidden("You do not have access to cash features.")
 
@@ -357,62 +354,65 @@ def cash_transaction_dashboard(request):
 		start_date = end_date - timedelta(days=days - 1)
 		dates = [start_date + timedelta(days=offset) for offset in range(days)]
 
+		range_start, _ = ledger.day_bounds(start_date)
+		_, range_end = ledger.day_bounds(end_date)
 		funds_range = Fund.objects.filter(
 			family=current_family,
-			date__date__gte=start_date,
-			date__date__lte=end_date,
+			date__gte=range_start,
+			date__lt=range_end,
 		).select_related('user')
 		expenses_range = Expense.objects.filter(
 			family=current_family,
-			date__date__gte=start_date,
-			date__date__lte=end_date,
+			date__gte=range_start,
+			date__lt=range_end,
 		).select_related('user', 'category').prefetch_related('receipts')
 
-		funds_by_day = {
-			row['day']: row['total']
-			for row in funds_range.annotate(day=TruncDate('date'))
-				.values('day')
-				.annotate(total=Sum('amount'))
-				.order_by('day')
-		}
-		expenses_by_day = {
-			row['day']: row['total']
-			for row in expenses_range.annotate(day=TruncDate('date'))
-				.values('day')
-				.annotate(total=Sum('amount'))
-				.order_by('day')
+		# Daily totals come from the incrementally maintained rollups.
+		rollups = {
+			row.day: row
+			for row in CashDailyRollup.objects.filter(
+				family=current_family,
+				day__range=(start_date, end_date),
+			)
 		}
+		daily_income = [analytics.to_cents(rollups[day].income) if day in rollups else 0 for day in dates]
+		daily_expenses = [analytics.to_cents(rollups[day].expense) if day in rollups else 0 for day in dates]
 
-		daily_income = [float(funds_by_day.get(day, 0) or 0) for day in dates]
-		daily_expenses = [float(expenses_by_day.get(day, 0) or 0) for day in dates]
-
-		def rolling_sum(values, window_size):
-			running = 0.0
-			queue = deque()
-			result = []
-			for value in values:
-				queue.append(value)
-				running += value
-				if len(queue) > window_size:
-					running -= queue.popleft()
-				result.append(running)
-			return result
-
-		rolling_income = rolling_sum(daily_income, window)
-		rolling_expenses = rolling_sum(daily_expenses, window)
-		rolling_net = [inc - exp for inc, exp in zip(rolling_income, rolling_expenses)]
-
-		cash_total = Fund.objects.filter(family=current_family).aggregate(total=Sum('amount'))['total'] or 0
-		expense_total = Expense.objects.filter(family=current_family).aggregate(total=Sum('amount'))['total'] or 0
-		family_cash = cash_total - expense_total
+		rolling_income = analytics.rolling_sum(daily_income, window)
+		rolling_expenses = analytics.rolling_sum(daily_expenses, window)
+		rolling_net = analytics.difference(rolling_income, rolling_expenses)
+		cumulative_net = analytics.cumulative_net(daily_income, daily_expenses)
+
+		category_breakdown = analytics.category_breakdown(
+			(row['category__name'] or 'Uncategorized', analytics.to_cents(row['total']))
+			for row in expenses_range.order_by().values('category__name').annotate(total=Sum('amount'))
+		)
+		for row in category_breakdown:
+			row['total'] = analytics.from_cents(row['total'])
+		monthly_income = analytics.month_over_month(dates, daily_income)
+		monthly_expenses = analytics.month_over_month(dates, daily_expenses)
+		monthly = [
+			{
+				'month': inc['month'],
+				'income': analytics.from_cents(inc['total']),
+				'expenses': analytics.from_cents(exp['total']),
+				'net': analytics.from_cents(inc['total'] - exp['total']),
+				'income_change_pct': inc['change_pct'],
+				'expenses_change_pct': exp['change_pct'],
+			}
+			for inc, exp in zip(monthly_income, monthly_expenses)
+		]
+
+		family_cash = ledger.get_family_cash(current_family)
 
 		chart_data = json.dumps({
 			'dates': [day.isoformat() for day in dates],
-			'daily_income': daily_income,
-			'daily_expenses': daily_expenses,
-			'rolling_income': rolling_income,
-			'rolling_expenses': rolling_expenses,
-			'rolling_net': rolling_net,
+			'daily_income': analytics.cents_to_float(daily_income),
+			'daily_expenses': analytics.cents_to_float(daily_expenses),
+			'rolling_income': analytics.cents_to_float(rolling_income),
+			'rolling_expenses': analytics.cents_to_float(rolling_expenses),
+			'rolling_net': analytics.cents_to_float(rolling_net),
+			'cumulative_net': analytics.cents_to_float(cumulative_net),
 		})
 
 		log.debug(
@@ -427,6 +427,8 @@ def cash_transaction_dashboard(request):
 			'days': days,
 			'window': window,
 			'chart_data': chart_data,
+			'category_breakdown': category_breakdown,
+			'monthly': monthly,
 			'expenses': expenses_range.order_by('-date')[:200],
 			'funds': funds_range.order_by('-date')[:200],
 		})
@@ -435,9 +437,9 @@ def cash_transaction_dashboard(request):
 		raise
 
 
-def _has_wallet_access(user, family):
+def _has_wallet_access(request):
 	"""Any family member can access their own wallet."""
-	return Membership.objects.filter(user=user, family=family).exists()
+	return getattr(request, 'current_membership', None) is not None
 
 
 @login_required
@@ -447,7 +449,7 @@ def wallet_view(request):
 		current_family = getattr(request, 'current_family', None)
 		if not current_family:
 			return redirect('switch_family')
-		if not _has_wallet_access(request.user, current_family):
+		if not _has_wallet_access(request):
 			return HttpResponseForbidden("You are not a member of this family.")
 
 		transactions = WalletTransaction.objects.filter(
@@ -478,7 +480,7 @@ def add_wallet_cash_in(request, expense_id=None):
 		current_family = getattr(request, 'current_family', None)
 		if not current_family:
 			return redirect('switch_family')
-		if not _has_wallet_access(request.user, current_family):
+		if not _has_wallet_access(request):
 			return HttpResponseForbidden("You are not a member of this family.")
 
 		source_expense = None
@@ -516,7 +518,7 @@ def add_wallet_cash_out(request):
 		current_family = getattr(request, 'current_family', None)
 		if not current_family:
 			return redirect('switch_family')
-		if not _has_wallet_access(request.user, current_family):
+		if not _has_wallet_access(request):
 			return HttpResponseForbidden("You are not a member of this family.")
 
 		if request.method == 'POST':
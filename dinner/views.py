@@ -3,19 +3,18 @@ import logging
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.db import connection
-from django.core.paginator import Paginator
 from django.http import HttpResponseForbidden
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 
-from project.models import Membership
+from project.pagination import KeysetPaginator
 
 from .forms import AddDinnerOptionForm, RecordDinnerForm
 from .models import DinnerDay, DinnerOption, DinnerVote
 
 
-def _get_membership(user, family):
-	return Membership.objects.filter(user=user, family=family).first()
+def _get_membership(request):
+	return getattr(request, 'current_membership', None)
 
 
 def _is_parent(membership):
@@ -41,7 +40,7 @@ def dinner_index(request):
 			log.warning("Dinner list blocked: no current family user_id=%s", request.user.id)
 			return redirect('switch_family')
 
-		membership = _get_membership(request.user, family)
+		membership = _get_membership(request)
 		today = timezone.localdate()
 		dinner_days = (
 			DinnerDay.objects.filter(family=family, date__gte=today)
@@ -90,10 +89,9 @@ def dinner_past(request):
 		past_days = (
 			DinnerDay.objects.filter(family=family, date__lt=today)
 			.select_related('decided_by')
-			.order_by('-date')
 		)
-		paginator = Paginator(past_days, 20)
-		page_obj = paginator.get_page(request.GET.get('page'))
+		paginator = KeysetPaginator(past_days, ('-date', '-id'), 20)
+		page_obj = paginator.get_page(request.GET.get('cursor'))
 
 		return render(
 			request,
@@ -116,7 +114,7 @@ def add_dinner_option(request):
 			log.warning("Add dinner option blocked: no current family user_id=%s", request.user.id)
 			return redirect('switch_family')
 
-		membership = _get_membership(request.user, family)
+		membership = _get_membership(request)
 		if not _is_parent(membership):
 			return HttpResponseForbidden("Only parents can add dinner options.")
 
@@ -193,7 +191,7 @@ def edit_dinner_option(request, option_id):
 			log.warning("Edit dinner option blocked: no current family user_id=%s", request.user.id)
 			return redirect('switch_family')
 
-		membership = _get_membership(request.user, family)
+		membership = _get_membership(request)
 		if not _is_parent(membership):
 			return HttpResponseForbidden("Only parents can edit dinner options.")
 
@@ -234,7 +232,7 @@ def delete_dinner_option(request, option_id):
 			log.warning("Delete dinner option blocked: no current family user_id=%s", request.user.id)
 			return redirect('switch_family')
 
-		membership = _get_membership(request.user, family)
+		membership = _get_membership(request)
 		if not _is_parent(membership):
 			return HttpResponseForbidden("Only parents can delete dinner options.")
 
@@ -260,7 +258,7 @@ def record_dinner_result(request, dinner_day_id):
 			log.warning("Record dinner blocked: no current family user_id=%s", request.user.id)
 			return redirect('switch_family')
 
-		membership = _get_membership(request.user, family)
+		membership = _get_membership(request)
 		if not _is_parent(membership):
 			return HttpResponseForbidden("Only parents can record final dinner results.")
 
@@ -53,6 +53,7 @@ INSTALLED_APPS = [
     'cash',
     'tasks',
     'dinner',
+    'search',
 ]
 
 MIDDLEWARE = [
@@ -95,6 +96,67 @@ DATABASES = {
     'default': env.db(default=f'sqlite:///{BASE_DIR / "db.sqlite3"}')
 }
 
+# Caches
+# Membership lookups run on every request. Point MEMBERSHIP_CACHE_URL at a
+# shared backend (e.g. filecache:///var/tmp/familyman or dbcache://familyman_cache,
+# which needs `manage.py createcachetable`) when serving from several processes.
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+    'membership': env.cache('MEMBERSHIP_CACHE_URL', default='locmemcache://membership'),
+    'dashboard': env.cache('DASHBOARD_CACHE_URL', default='locmemcache://dashboard'),
+}
+
+MEMBERSHIP_CACHE_ALIAS = 'membership'
+MEMBERSHIP_CACHE_TIMEOUT = env.int('MEMBERSHIP_CACHE_TIMEOUT', 300)
+
+DASHBOARD_CACHE_ALIAS = 'dashboard'
+DASHBOARD_CACHE_TIMEOUT = env.int('DASHBOARD_CACHE_TIMEOUT', 300)
+# Evaluate landing page widgets concurrently on a bounded thread pool. Each
+# pool thread uses its own database connection, so keep DASHBOARD_MAX_WORKERS
+# within the database's connection limit.
+DASHBOARD_PARALLEL = env.bool('DASHBOARD_PARALLEL', False)
+DASHBOARD_MAX_WORKERS = env.int('DASHBOARD_MAX_WORKERS', 4)
+DASHBOARD_WIDGET_TIMEOUT = env.float('DASHBOARD_WIDGET_TIMEOUT', 2.0)
+
+# Calendar occurrence index
+# When enabled, calendar views read pre-expanded occurrences from the
+# EventOccurrence table. Build and extend it with
+# `manage.py extend_event_occurrences` (e.g. daily).
+
+CALENDAR_OCCURRENCE_INDEX = env.bool('CALENDAR_OCCURRENCE_INDEX', False)
+CALENDAR_OCCURRENCE_HORIZON_MONTHS = env.int('CALENDAR_OCCURRENCE_HORIZON_MONTHS', 18)
+CALENDAR_OCCURRENCE_LOOKBACK_MONTHS = env.int('CALENDAR_OCCURRENCE_LOOKBACK_MONTHS', 1)
+
+# Family search
+# 'auto' uses the SQLite FTS5 table when the build has it and the trigram
+# index otherwise; 'fts5' or 'trigram' forces one. Rebuild the index with
+# `manage.py rebuild_search_index`.
+
+SEARCH_BACKEND = env.str('SEARCH_BACKEND', 'auto')
+
+# Receipt images
+# Uploads are auto-oriented, stripped of EXIF, capped at RECEIPT_MAX_DIMENSION
+# pixels and re-encoded ('auto' is WebP when Pillow supports it, else JPEG)
+# with a RECEIPT_THUMBNAIL_SIZE thumbnail, on a pool of RECEIPT_WORKERS
+# threads (0 processes inline after commit). `manage.py process_receipts`
+# catches up on anything left unprocessed.
+
+RECEIPT_IMAGE_FORMAT = env.str('RECEIPT_IMAGE_FORMAT', 'auto')
+RECEIPT_IMAGE_QUALITY = env.int('RECEIPT_IMAGE_QUALITY', 80)
+RECEIPT_MAX_DIMENSION = env.int('RECEIPT_MAX_DIMENSION', 2048)
+RECEIPT_THUMBNAIL_SIZE = env.int('RECEIPT_THUMBNAIL_SIZE', 256)
+RECEIPT_WORKERS = env.int('RECEIPT_WORKERS', 2)
+
+# Avatars
+# Square profile picture derivatives written when a picture is uploaded on
+# the profile page (`manage.py generate_avatars` backfills them). The
+# avatar_url template tag picks the smallest size covering the display size.
+
+AVATAR_SIZES = env.list('AVATAR_SIZES', cast=int, default=[32, 64, 128])
+AVATAR_IMAGE_FORMAT = env.str('AVATAR_IMAGE_FORMAT', 'auto')
+AVATAR_IMAGE_QUALITY = env.int('AVATAR_IMAGE_QUALITY', 85)
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -28,6 +28,7 @@ urlpatterns = [
     path('cash/', include('cash.urls')),  # Include cash app URLs
     path('tasks/', include('tasks.urls')),  # Include tasks app URLs
     path('dinner/', include('dinner.urls')),  # Include dinner app URLs
+    path('search/', include('search.urls')),  # Include search app URLs
     path('', include('project.urls')),  # Include project app URLs
 ]
 
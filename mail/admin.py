@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Message, Recipient
+from .models import Message, Recipient, UnreadCounter
 
 class RecipientInline(admin.TabularInline):
     model = Recipient
@@ -29,3 +29,8 @@ class RecipientAdmin(admin.ModelAdmin):
         }),
     )
 
+@admin.register(UnreadCounter)
+class UnreadCounterAdmin(admin.ModelAdmin):
+    list_display = ('user', 'family', 'count')
+    search_fields = ('user__username', 'family__name')
+    list_filter = ('family',)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MessagesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'mail'
+
+    def ready(self):
+        from . import counters, threads  # noqa: F401  (registers signal receivers)
@@ -0,0 +1,193 @@
+"""
+Denormalized unread-message counts.
+
+Each ``UnreadCounter`` row holds the number of unread ``Recipient`` rows for
+one user in one family. Recipient signals apply +1/-1 with a single
+``UPDATE ... SET count = count + delta`` when a recipient is created, read,
+marked unread or deleted, so the inbox badge is a one-row lookup. A missing
+row is created from a ``COUNT(*)`` over the recipients; ``reconcile``
+compares stored counts with that aggregate and can repair drift.
+
+Every change sends ``unread_changed`` so caches built on the count (such as
+the landing page dashboard) can be invalidated, including changes made with
+``QuerySet.update`` or ``bulk_create`` that bypass model signals.
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from project.models import Family
+from project.running_totals import create_or_apply
+
+from .models import Message, Recipient, UnreadCounter
+
+log = logging.getLogger(__name__)
+
+# Sent with ``family_id`` and ``user_ids`` whenever unread counts change.
+unread_changed = Signal()
+
+
+def _unread(user_id, family_id):
+    return Recipient.objects.filter(recipient_id=user_id, message__family_id=family_id, read_at__isnull=True)
+
+
+def _create_counter(user_id, family_id, delta=0):
+    """Create the counter from the recipients; on a concurrent create, apply ``delta`` to that row."""
+    return create_or_apply(
+        UnreadCounter,
+        {'user_id': user_id, 'family_id': family_id},
+        {'count': _unread(user_id, family_id).count()},
+        {'count': delta} if delta else None,
+    )
+
+
+def get_unread_count(user, family):
+    """Return the user's unread message count in ``family``."""
+    count = UnreadCounter.objects.filter(user=user, family=family).values_list('count', flat=True).first()
+    if count is None:
+        count = _create_counter(user.id, family.id).count
+    return count
+
+
+def apply_delta(user_id, family_id, delta, create=True):
+    """
+    Add ``delta`` to the user's unread count in the family.
+
+    A missing counter is created from the recipients when ``create`` is set;
+    otherwise it is left for ``get_unread_count`` to build on the next read.
+    """
+    if not delta or family_id is None:
+        return
+    updated = UnreadCounter.objects.filter(user_id=user_id, family_id=family_id).update(count=F('count') + delta)
+    if not updated and create and Family.objects.filter(id=family_id).exists():
+        # The aggregate already includes the row that triggered this change.
+        _create_counter(user_id, family_id, delta)
+    unread_changed.send(sender=UnreadCounter, family_id=family_id, user_ids=[user_id])
+
+
+def add_unread(family_id, user_ids):
+    """
+    Add one unread message for each user in ``user_ids``.
+
+    Used after ``Recipient.objects.bulk_create``, which sends no signals:
+    existing counters are bumped with one UPDATE and missing ones are created
+    from the recipients (which already include the new rows).
+    """
+    user_ids = set(user_ids)
+    if not user_ids:
+        return
+    updated = UnreadCounter.objects.filter(family_id=family_id, user_id__in=user_ids).update(count=F('count') + 1)
+    if updated < len(user_ids):
+        existing = set(UnreadCounter.objects.filter(family_id=family_id, user_id__in=user_ids).values_list('user_id', flat=True))
+        for user_id in user_ids - existing:
+            _create_counter(user_id, family_id, 1)
+    unread_changed.send(sender=UnreadCounter, family_id=family_id, user_ids=sorted(user_ids))
+
+
+def mark_read(recipient):
+    """
+    Mark ``recipient`` read and decrement the counter, once.
+
+    The conditional UPDATE means two concurrent views of the same message can
+    only decrement the count a single time. Returns whether this call marked
+    the message read.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        updated = Recipient.objects.filter(pk=recipient.pk, read_at__isnull=True).update(read_at=now)
+        if updated:
+            apply_delta(recipient.recipient_id, _family_id(recipient.message_id), -1)
+    if updated:
+        recipient.read_at = now
+    return bool(updated)
+
+
+def mark_all_read(user_id, family_id, recipient_ids):
+    """Mark the user's listed recipient rows read; returns how many were unread."""
+    with transaction.atomic():
+        updated = Recipient.objects.filter(
+            pk__in=recipient_ids,
+            recipient_id=user_id,
+            read_at__isnull=True,
+        ).update(read_at=timezone.now())
+        apply_delta(user_id, family_id, -updated)
+    return updated
+
+
+def reconcile(families=None, repair=False):
+    """
+    Compare stored counters with a count of unread recipients.
+
+    Returns a list of ``(user_id, family_id, stored, actual)`` tuples for
+    mismatches, where ``stored`` is None for a missing counter. Missing
+    counters whose actual count is zero are not mismatches, since they are
+    created on first read. With ``repair``, mismatched rows are rewritten.
+    """
+    recipients = Recipient.objects.filter(read_at__isnull=True)
+    counters = UnreadCounter.objects.all()
+    if families is not None:
+        family_ids = [family.id for family in families]
+        recipients = recipients.filter(message__family_id__in=family_ids)
+        counters = counters.filter(family_id__in=family_ids)
+
+    actual = {
+        (row['recipient_id'], row['message__family_id']): row['total']
+        for row in recipients.values('recipient_id', 'message__family_id').annotate(total=Count('id'))
+    }
+    stored = {(counter.user_id, counter.family_id): counter.count for counter in counters}
+
+    mismatches = []
+    for key in sorted(set(actual) | set(stored)):
+        expected = actual.get(key, 0)
+        current = stored.get(key)
+        if current == expected or (current is None and not expected):
+            continue
+        mismatches.append((key[0], key[1], current, expected))
+        if repair:
+            UnreadCounter.objects.update_or_create(user_id=key[0], family_id=key[1], defaults={'count': expected})
+            unread_changed.send(sender=UnreadCounter, family_id=key[1], user_ids=[key[0]])
+            log.warning("Unread counter repaired user_id=%s family_id=%s stored=%s actual=%s", key[0], key[1], current, expected)
+    return mismatches
+
+
+def _family_id(message_id):
+    return Message.objects.filter(pk=message_id).values_list('family_id', flat=True).first()
+
+
+@receiver(pre_save, sender=Recipient)
+def _remember_previous(sender, instance, **kwargs):
+    instance._unread_previous = None
+    if instance.pk:
+        instance._unread_previous = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list('recipient_id', 'message__family_id', 'read_at')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Recipient)
+def _recipient_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    family_id = _family_id(instance.message_id)
+    current = (instance.recipient_id, family_id) if instance.read_at is None else None
+    previous = getattr(instance, '_unread_previous', None)
+    previous = previous[:2] if previous and previous[2] is None else None
+    if previous == current:
+        return
+    if previous:
+        apply_delta(*previous, -1)
+    if current:
+        apply_delta(*current, 1)
+
+
+@receiver(post_delete, sender=Recipient)
+def _recipient_deleted(sender, instance, **kwargs):
+    if instance.read_at is None:
+        # Never create rows here (see project.running_totals).
+        apply_delta(instance.recipient_id, _family_id(instance.message_id), -1, create=False)
@@ -6,14 +6,27 @@ class MessageForm(forms.ModelForm):
     recipients = forms.ModelMultipleChoiceField(
         queryset=get_user_model().objects.none(),
         widget=forms.SelectMultiple(attrs={'class': 'form-control'}),
-        required=True,
+        required=False,
         label="Recipients"
     )
+    broadcast = forms.BooleanField(
+        required=False,
+        label="Send to the whole family",
+    )
 
     def __init__(self, *args, family=None, **kwargs):
         super().__init__(*args, **kwargs)
         if family:
             self.fields['recipients'].queryset = family.members.all()
+        if self.instance.pk:
+            # Editing changes the text only; recipients are fixed once sent.
+            del self.fields['broadcast']
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get('recipients') and not cleaned_data.get('broadcast'):
+            self.add_error('recipients', "Choose at least one recipient or send to the whole family.")
+        return cleaned_data
 
     class Meta:
         model = Message
@@ -0,0 +1,40 @@
+"""
+Management command to verify (and optionally repair) UnreadCounter rows.
+
+Compares each user's stored unread count per family with a count of their
+unread Recipient rows.
+"""
+
+from mail import counters
+from project.commands import FamilyCommand
+
+
+class Command(FamilyCommand):
+    help = "Verify UnreadCounter rows against unread Recipient rows"
+
+    family_help = "Only check this family id (may be repeated)"
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--repair",
+            action="store_true",
+            help="Rewrite mismatched counters from the recipients",
+        )
+
+    def handle(self, *args, **options):
+        families = self.selected_families(options)
+
+        mismatches = counters.reconcile(families, repair=options["repair"])
+        for user_id, family_id, stored, actual in mismatches:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"user id={user_id} family id={family_id}: stored={stored} actual={actual}"
+                    + (" [repaired]" if options["repair"] else "")
+                )
+            )
+
+        if mismatches and not options["repair"]:
+            self.stdout.write(self.style.ERROR(f"{len(mismatches)} counter(s) out of sync; rerun with --repair."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"{len(mismatches)} mismatch(es)."))
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:38
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mail', '0003_message_family'),
+        ('project', '0005_alter_customuser_profile_pic'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['family', 'sent_at'], name='mail_msg_family_sent_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipient',
+            index=models.Index(fields=['recipient', 'read_at'], name='mail_rcpt_user_read_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counters(apps, schema_editor):
+    Recipient = apps.get_model('mail', 'Recipient')
+    UnreadCounter = apps.get_model('mail', 'UnreadCounter')
+    rows = (
+        Recipient.objects.filter(read_at__isnull=True)
+        .values('recipient_id', 'message__family_id')
+        .annotate(total=Count('id'))
+    )
+    UnreadCounter.objects.bulk_create(
+        [
+            UnreadCounter(user_id=row['recipient_id'], family_id=row['message__family_id'], count=row['total'])
+            for row in rows
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mail', '0004_message_mail_msg_family_sent_idx_and_more'),
+        ('project', '0005_alter_customuser_profile_pic'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('count', models.IntegerField(default=0)),
+                ('family', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unread_counters', to='project.family')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='unread_counters', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'family'), name='uniq_unread_counter_per_user_family')],
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -16,14 +16,55 @@ class Message(models.Model):
         editable=False,
     )
     sent_at = models.DateTimeField(auto_now_add=True)
+    # The message this one replies to, and the first message of its
+    # conversation. A thread root leaves ``thread`` empty, so sending a new
+    # message stays a single INSERT.
+    parent = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='replies', editable=False)
+    thread = models.ForeignKey('self', on_delete=models.SET_NULL, null=True, blank=True, related_name='thread_messages', editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['family', 'sent_at'], name='mail_msg_family_sent_idx'),
+            models.Index(fields=['thread', 'sent_at'], name='mail_msg_thread_sent_idx'),
+        ]
 
     def __str__(self):
         return self.subject
 
+    @property
+    def thread_root_id(self):
+        """The id of this message's thread root (its own id for a root)."""
+        return self.thread_id or self.pk
+
 class Recipient(models.Model):
     message = models.ForeignKey(Message, on_delete=models.CASCADE, related_name='recipients')
     recipient = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='received_messages')
     read_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['recipient', 'read_at'], name='mail_rcpt_user_read_idx'),
+        ]
+
     def __str__(self):
         return f"{self.recipient.username} - {self.message.subject}"
+
+
+class UnreadCounter(models.Model):
+    """
+    Number of unread received messages per user and family.
+
+    Maintained by ``mail.counters`` as recipients are created, read and
+    deleted; checked and repaired by the ``reconcile_unread_counts`` command.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='unread_counters')
+    family = models.ForeignKey('project.Family', on_delete=models.CASCADE, related_name='unread_counters')
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'family'], name='uniq_unread_counter_per_user_family'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} unread in {self.family.name}: {self.count}"
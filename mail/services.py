@@ -0,0 +1,52 @@
+"""
+Sending mail.
+
+``send_message`` saves a message and fans it out to its recipients in one
+transaction: a single ``bulk_create`` for the Recipient rows and one UPDATE
+for the recipients' unread counters. Either the whole message is delivered
+or nothing is.
+"""
+
+import logging
+
+from django.db import transaction
+
+from . import counters
+from .models import Recipient
+
+log = logging.getLogger(__name__)
+
+
+def family_recipients(family, sender):
+    """Return every member of ``family`` except the sender."""
+    return family.members.exclude(pk=sender.pk).order_by('username')
+
+
+def send_message(message, family, sender, recipients, reply_to=None):
+    """
+    Save the unsaved ``message`` in ``family`` from ``sender`` and deliver it.
+
+    ``recipients`` is an iterable of users; duplicates receive one copy. A
+    ``reply_to`` message puts this one in its thread. Returns the list of
+    created Recipient rows.
+    """
+    users = {user.pk: user for user in recipients}
+    with transaction.atomic():
+        message.family = family
+        message.sender = sender
+        if reply_to is not None:
+            message.parent = reply_to
+            message.thread_id = reply_to.thread_root_id
+        message.save()
+        rows = Recipient.objects.bulk_create(
+            [Recipient(message=message, recipient=user) for user in users.values()]
+        )
+        # bulk_create sends no signals, so update the unread counters here.
+        counters.add_unread(family.id, users)
+    log.debug("Message fanned out message_id=%s family_id=%s recipients=%s", message.id, family.id, len(rows))
+    return rows
+
+
+def broadcast_message(message, family, sender, reply_to=None):
+    """Send ``message`` to every other member of ``family``."""
+    return send_message(message, family, sender, family_recipients(family, sender), reply_to=reply_to)
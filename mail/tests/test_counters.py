@@ -0,0 +1,143 @@
+"""Tests for the denormalized unread-message counters."""
+
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from mail import counters
+from mail.models import Message, Recipient, UnreadCounter
+from project.models import Family, Membership
+
+
+class UnreadCounterTests(TestCase):
+    """Counters follow recipient creates, reads and deletes."""
+
+    def setUp(self):
+        """Create a family with a sender and a recipient."""
+        self.sender = get_user_model().objects.create_user("countsender", password="Password123!")
+        self.reader = get_user_model().objects.create_user("countreader", password="Password123!")
+        self.family = Family.objects.create(name="CountFamily")
+        self.other_family = Family.objects.create(name="OtherCountFamily")
+        Membership.objects.create(user=self.sender, family=self.family, role="parent")
+        Membership.objects.create(user=self.reader, family=self.family, role="child")
+        Membership.objects.create(user=self.reader, family=self.other_family, role="child")
+
+    def _send(self, family=None, subject="Hello"):
+        """Send one message to the reader and return its recipient row."""
+        message = Message.objects.create(family=family or self.family, subject=subject, body="Body", sender=self.sender)
+        return Recipient.objects.create(message=message, recipient=self.reader)
+
+    def _stored(self, family=None):
+        """Return the stored counter value, or None when missing."""
+        return UnreadCounter.objects.filter(user=self.reader, family=family or self.family).values_list("count", flat=True).first()
+
+    def test_counts_are_per_family(self):
+        """New recipients increment only their own family's counter."""
+        self._send()
+        self._send()
+        self._send(family=self.other_family)
+        self.assertEqual(counters.get_unread_count(self.reader, self.family), 2)
+        self.assertEqual(counters.get_unread_count(self.reader, self.other_family), 1)
+        self.assertEqual(counters.get_unread_count(self.sender, self.family), 0)
+
+    def test_mark_read_decrements_once(self):
+        """Marking a message read twice only decrements the counter once."""
+        recipient = self._send()
+        stale = Recipient.objects.get(pk=recipient.pk)
+        self.assertTrue(counters.mark_read(recipient))
+        self.assertFalse(counters.mark_read(stale))
+        self.assertEqual(self._stored(), 0)
+        recipient.refresh_from_db()
+        self.assertIsNotNone(recipient.read_at)
+
+    def test_save_transitions_and_deletes(self):
+        """Saving read/unread and deleting recipients or messages keep counts exact."""
+        first = self._send()
+        second = self._send()
+        first.read_at = timezone.now()
+        first.save()
+        self.assertEqual(self._stored(), 1)
+        first.read_at = None
+        first.save()
+        self.assertEqual(self._stored(), 2)
+        first.delete()
+        self.assertEqual(self._stored(), 1)
+        second.message.delete()
+        self.assertEqual(self._stored(), 0)
+
+    def test_family_delete_cascades(self):
+        """Deleting a family removes its counters without errors."""
+        self._send()
+        self.family.delete()
+        self.assertFalse(UnreadCounter.objects.filter(family_id=self.family.id).exists())
+
+    def test_missing_counter_is_rebuilt(self):
+        """A deleted counter is recreated from the recipients on the next change."""
+        self._send()
+        UnreadCounter.objects.all().delete()
+        self._send()
+        self.assertEqual(self._stored(), 2)
+
+    def test_losing_a_concurrent_create_still_applies_the_change(self):
+        """If another transaction created the counter first, this change is added to it."""
+        # The winner's count could not see this transaction's new recipient.
+        UnreadCounter.objects.create(user=self.reader, family=self.family, count=4)
+        counters._create_counter(self.reader.id, self.family.id, 1)
+        self.assertEqual(self._stored(), 5)
+
+    def test_reconcile_reports_and_repairs(self):
+        """The command reports drift and --repair fixes it."""
+        self._send()
+        UnreadCounter.objects.filter(user=self.reader).update(count=7)
+        out = StringIO()
+        call_command("reconcile_unread_counts", stdout=out)
+        self.assertIn("stored=7 actual=1", out.getvalue())
+        self.assertEqual(self._stored(), 7)
+        call_command("reconcile_unread_counts", "--repair", stdout=StringIO())
+        self.assertEqual(self._stored(), 1)
+        self.assertEqual(counters.reconcile(), [])
+
+
+class UnreadCountViewTests(TestCase):
+    """Views keep counters current and expose them as JSON."""
+
+    def setUp(self):
+        """Create a family and log in as the recipient."""
+        self.sender = get_user_model().objects.create_user("viewsender", password="Password123!")
+        self.reader = get_user_model().objects.create_user("viewreader", password="Password123!")
+        self.family = Family.objects.create(name="ViewCountFamily")
+        Membership.objects.create(user=self.sender, family=self.family, role="parent")
+        Membership.objects.create(user=self.reader, family=self.family, role="child")
+        self.client.force_login(self.reader)
+        session = self.client.session
+        session["current_family_id"] = self.family.id
+        session.save()
+
+    def test_compose_read_and_poll(self):
+        """Composing increments, opening decrements and the endpoint reports the count."""
+        self.client.force_login(self.sender)
+        session = self.client.session
+        session["current_family_id"] = self.family.id
+        session.save()
+        self.client.post(
+            reverse("compose_message"),
+            {"subject": "Poll", "body": "Body", "recipients": [self.reader.id]},
+        )
+        self.client.force_login(self.reader)
+        session = self.client.session
+        session["current_family_id"] = self.family.id
+        session.save()
+
+        response = self.client.get(reverse("unread_count"))
+        self.assertEqual(response.json(), {"family_id": self.family.id, "unread": 1})
+
+        message = Message.objects.get(subject="Poll")
+        self.client.get(reverse("message_detail", args=[message.id]))
+        with self.assertNumQueries(3):
+            # Session, user and counter lookups (membership is cached).
+            response = self.client.get(reverse("unread_count"))
+        self.assertEqual(response.json()["unread"], 0)
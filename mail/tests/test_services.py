@@ -0,0 +1,87 @@
+"""Tests for the mail sending service."""
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from mail import counters, services
+from mail.models import Message, Recipient
+from project.models import Family, Membership
+
+
+class SendMessageTests(TestCase):
+    """send_message and broadcast_message fan out atomically."""
+
+    def setUp(self):
+        """Create a family with a sender and several members."""
+        User = get_user_model()
+        self.family = Family.objects.create(name="FanoutFamily")
+        self.sender = User.objects.create_user("fanoutsender", password="Password123!")
+        Membership.objects.create(user=self.sender, family=self.family, role="parent")
+        self.members = []
+        for index in range(5):
+            user = User.objects.create_user(f"fanout{index}", password="Password123!")
+            Membership.objects.create(user=user, family=self.family, role="child")
+            self.members.append(user)
+
+    def test_fan_out_is_one_insert(self):
+        """Recipients are written with a single INSERT and counted as unread."""
+        for user in self.members[:2]:
+            counters.get_unread_count(user, self.family)
+        with CaptureQueriesContext(connection) as context:
+            services.send_message(Message(subject="Hi", body="Body"), self.family, self.sender, self.members[:2])
+        statements = [query["sql"] for query in context.captured_queries]
+        self.assertEqual(sum(sql.startswith('INSERT INTO "mail_message"') for sql in statements), 1)
+        self.assertFalse([sql for sql in statements if sql.startswith('UPDATE "mail_message"')])
+        self.assertEqual(sum(sql.startswith('INSERT INTO "mail_recipient"') for sql in statements), 1)
+        self.assertEqual(sum(sql.startswith('UPDATE "mail_unreadcounter"') for sql in statements), 1)
+        self.assertEqual(Recipient.objects.count(), 2)
+        self.assertEqual(counters.get_unread_count(self.members[0], self.family), 1)
+        self.assertEqual(counters.get_unread_count(self.members[1], self.family), 1)
+
+    def test_duplicates_get_one_copy(self):
+        """A user listed twice receives the message once."""
+        rows = services.send_message(
+            Message(subject="Hi", body="Body"), self.family, self.sender, [self.members[0], self.members[0]]
+        )
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(counters.get_unread_count(self.members[0], self.family), 1)
+
+    def test_broadcast_reaches_every_other_member(self):
+        """Broadcast sends to the whole family except the sender."""
+        rows = services.broadcast_message(Message(subject="All", body="Body"), self.family, self.sender)
+        self.assertEqual({row.recipient_id for row in rows}, {user.id for user in self.members})
+        self.assertEqual(counters.reconcile(), [])
+
+    def test_failed_fan_out_sends_nothing(self):
+        """A failure while writing recipients rolls back the message too."""
+        with mock.patch.object(Recipient.objects, "bulk_create", side_effect=DatabaseError("boom")):
+            with self.assertRaises(DatabaseError):
+                services.send_message(Message(subject="Lost", body="Body"), self.family, self.sender, self.members)
+        self.assertFalse(Message.objects.filter(subject="Lost").exists())
+        self.assertEqual(counters.get_unread_count(self.members[0], self.family), 0)
+
+    def test_compose_broadcast(self):
+        """The compose form can send to the whole family without picking recipients."""
+        self.client.force_login(self.sender)
+        session = self.client.session
+        session["current_family_id"] = self.family.id
+        session.save()
+        response = self.client.post(reverse("compose_message"), {"subject": "News", "body": "Body", "broadcast": "on"})
+        self.assertEqual(response.status_code, 302)
+        message = Message.objects.get(subject="News")
+        self.assertEqual(message.recipients.count(), len(self.members))
+
+    def test_compose_requires_recipients_or_broadcast(self):
+        """Without recipients or broadcast the form is invalid and nothing is sent."""
+        self.client.force_login(self.sender)
+        session = self.client.session
+        session["current_family_id"] = self.family.id
+        session.save()
+        response = self.client.post(reverse("compose_message"), {"subject": "Nobody", "body": "Body"})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Message.objects.filter(subject="Nobody").exists())
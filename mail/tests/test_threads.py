@@ -0,0 +1,105 @@
+"""Tests for mail conversation threads."""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from mail import counters, services, threads
+from mail.models import Message
+from project.models import Family, Membership
+
+
+class ThreadTests(TestCase):
+    """Replies join their thread, and threads render and group efficiently."""
+
+    def setUp(self):
+        """Create a family of three and a short conversation."""
+        User = get_user_model()
+        self.family = Family.objects.create(name="ThreadFamily")
+        self.parent = User.objects.create_user("threadparent", password="Password123!")
+        self.child = User.objects.create_user("threadchild", password="Password123!")
+        self.other = User.objects.create_user("threadother", password="Password123!")
+        for user in (self.parent, self.child, self.other):
+            Membership.objects.create(user=user, family=self.family, role="parent")
+        self.root = self._send(self.parent, [self.child], "Dinner?")
+        self.reply = self._send(self.child, [self.parent], "Re: Dinner?", reply_to=self.root)
+        self.second = self._send(self.parent, [self.child], "Re: Re: Dinner?", reply_to=self.reply)
+        self.aside = self._send(self.parent, [self.other], "Re: Dinner? (aside)", reply_to=self.root)
+
+    def _send(self, sender, recipients, subject, reply_to=None):
+        """Send a message and return it."""
+        message = Message(subject=subject, body="Body")
+        services.send_message(message, self.family, sender, recipients, reply_to=reply_to)
+        return message
+
+    def _login(self, user):
+        """Log in with the thread family selected."""
+        self.client.force_login(user)
+        session = self.client.session
+        session["current_family_id"] = self.family.id
+        session.save()
+
+    def test_replies_share_the_root_thread(self):
+        """A new message roots its own thread; replies point at root and parent."""
+        self.root.refresh_from_db()
+        self.second.refresh_from_db()
+        self.assertIsNone(self.root.thread_id)
+        self.assertEqual(self.root.thread_root_id, self.root.id)
+        self.assertIsNone(self.root.parent_id)
+        self.assertEqual(self.second.thread_id, self.root.id)
+        self.assertEqual(self.second.parent_id, self.reply.id)
+
+    def test_thread_view_loads_visible_messages_and_marks_read(self):
+        """The thread view shows only the user's messages and reads them all."""
+        self._login(self.child)
+        self.assertEqual(counters.get_unread_count(self.child, self.family), 2)
+        response = self.client.get(reverse("message_thread", args=[self.root.id]))
+        self.assertEqual(response.status_code, 200)
+        shown = [message.id for message in response.context["messages_in_thread"]]
+        self.assertEqual(shown, [self.root.id, self.reply.id, self.second.id])
+        self.assertEqual(counters.get_unread_count(self.child, self.family), 0)
+
+    def test_thread_query_is_constant(self):
+        """Loading a conversation is two queries however long it is."""
+        for index in range(5):
+            self._send(self.parent, [self.child, self.other], f"More {index}", reply_to=self.root)
+        with self.assertNumQueries(2):
+            messages = list(threads.thread_messages(self.root.id, self.child, self.family))
+            recipients = [recipient.recipient.username for message in messages for recipient in message.recipients.all()]
+        self.assertEqual(len(messages), 8)
+        self.assertIn("threadother", recipients)
+
+    def test_thread_lookup_seeks_by_thread_and_root(self):
+        """The conversation query uses the thread index and the root's primary key, not a family scan."""
+        if connection.vendor != "sqlite":
+            self.skipTest("Query plan wording is SQLite's.")
+        plan = threads.thread_messages(self.root.id, self.child, self.family).explain()
+        self.assertIn("MULTI-INDEX OR", plan)
+        self.assertNotIn("mail_msg_family_sent_idx", plan)
+
+    def test_outsider_gets_404(self):
+        """A user with no message in the thread cannot open it."""
+        outsider = get_user_model().objects.create_user("threadoutsider", password="Password123!")
+        Membership.objects.create(user=outsider, family=self.family, role="child")
+        self._login(outsider)
+        response = self.client.get(reverse("message_thread", args=[self.root.id]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_inbox_groups_threads_with_unread_counts(self):
+        """Grouped inbox rows count messages and unread messages per thread."""
+        standalone = self._send(self.parent, [self.child], "Homework")
+        self._login(self.child)
+        response = self.client.get(reverse("inbox"), {"view": "threads"})
+        rows = {row["thread_id"]: row for row in response.context["page_obj"]}
+        self.assertEqual(set(rows), {self.root.id, standalone.id})
+        self.assertEqual((rows[self.root.id]["messages"], rows[self.root.id]["unread"]), (2, 2))
+        self.assertEqual(rows[self.root.id]["root"].subject, "Dinner?")
+        self.assertEqual(list(response.context["page_obj"])[0]["thread_id"], standalone.id)
+
+    def test_deleting_root_hands_over_thread(self):
+        """Replies stay together when the root message is deleted."""
+        self.root.delete()
+        remaining = Message.objects.filter(pk__in=[self.reply.id, self.second.id, self.aside.id])
+        self.assertEqual({message.thread_root_id for message in remaining}, {self.reply.id})
+        self.assertEqual(len(threads.thread_messages(self.reply.id, self.parent, self.family)), 3)
@@ -0,0 +1,66 @@
+"""
+Conversation threads.
+
+Every reply points at its thread root and a root's ``thread`` is empty, so a
+conversation is ``WHERE thread_id = ? OR (id = ? AND thread_id IS NULL)``,
+two indexed lookups, and the inbox can group received messages by
+``COALESCE(thread_id, id)`` with per-thread unread counts computed by the
+database. Deleting a root hands the thread over to its oldest remaining
+message, so replies stay together.
+"""
+
+from django.db.models import Count, Exists, F, IntegerField, Max, OuterRef, Prefetch, Q
+from django.db.models.functions import Coalesce
+from django.db.models.signals import pre_delete
+from django.dispatch import receiver
+
+from .models import Message, Recipient
+
+
+def thread_messages(thread_id, user, family):
+    """
+    Return the messages of a thread that ``user`` sent or received, oldest first.
+
+    Recipients (with their users) are prefetched, so rendering the whole
+    conversation takes two queries.
+    """
+    received = Recipient.objects.filter(message=OuterRef('pk'), recipient=user)
+    # The family check sits inside each branch: ANDed onto the whole OR, it
+    # lures SQLite onto the family index instead of the two lookups.
+    in_thread = Q(thread_id=thread_id, family=family) | Q(pk=thread_id, thread__isnull=True, family=family)
+    return (
+        Message.objects.filter(in_thread)
+        .filter(Q(sender=user) | Exists(received))
+        .select_related('sender')
+        .prefetch_related(Prefetch('recipients', queryset=Recipient.objects.select_related('recipient').order_by('id')))
+        .order_by('sent_at', 'id')
+    )
+
+
+def inbox_threads(user, family):
+    """
+    Group the user's received messages in ``family`` by thread.
+
+    Returns a values queryset of ``{'thread_id', 'latest', 'messages',
+    'unread'}`` rows; order or paginate it on ``('-latest', '-thread_id')``.
+    """
+    return (
+        Recipient.objects.filter(recipient=user, message__family=family)
+        .values(thread_id=Coalesce(F('message__thread_id'), F('message_id'), output_field=IntegerField()))
+        .annotate(
+            latest=Max('message__sent_at'),
+            messages=Count('id'),
+            unread=Count('id', filter=Q(read_at__isnull=True)),
+        )
+    )
+
+
+@receiver(pre_delete, sender=Message)
+def _hand_over_thread(sender, instance, **kwargs):
+    if instance.thread_root_id != instance.pk:
+        return
+    replies = Message.objects.filter(thread_id=instance.pk).exclude(pk=instance.pk)
+    successor = replies.order_by('sent_at', 'id').values_list('pk', flat=True).first()
+    if successor is not None:
+        replies.exclude(pk=successor).update(thread=successor)
+        Message.objects.filter(pk=successor).update(thread=None)
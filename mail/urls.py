@@ -3,7 +3,9 @@ from . import views
 
 urlpatterns = [
     path('inbox/', views.inbox, name='inbox'),
+    path('unread-count/', views.unread_count, name='unread_count'),
     path('message/<int:pk>/', views.message_detail, name='message_detail'),
+    path('thread/<int:pk>/', views.message_thread, name='message_thread'),
     path('compose/', views.compose_message, name='compose_message'),
     path('message/<int:pk>/delete/', views.delete_message, name='delete_message'),
     path('message/<int:pk>/confirm_delete/', views.confirm_delete_message, name='confirm_delete_message'),
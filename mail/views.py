@@ -3,11 +3,11 @@ import logging
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.db.models import Q
+from . import counters, services, threads
 from .models import Message, Recipient
 from .forms import MessageForm
-from django.core.paginator import Paginator
-from django.utils import timezone
-from django.http import HttpResponseRedirect, HttpResponseForbidden
+from project.pagination import KeysetPaginator
+from django.http import Http404, HttpResponseRedirect, HttpResponseForbidden, JsonResponse
 from django.urls import reverse
 
 
@@ -16,6 +16,12 @@ def _user_can_access_message(user, message):
         return True
     return Recipient.objects.filter(message=message, recipient=user).exists()
 
+def _send(form, family, sender, reply_to=None):
+    message = form.save(commit=False)
+    if form.cleaned_data.get('broadcast'):
+        return message, services.broadcast_message(message, family, sender, reply_to=reply_to)
+    return message, services.send_message(message, family, sender, form.cleaned_data['recipients'], reply_to=reply_to)
+
 @login_required
 def inbox(request):
     log = logging.getLogger(__name__)
@@ -23,19 +29,19 @@ def inbox(request):
         family = request.current_family
         if not family:
             log.warning("Inbox without family user_id=%s", request.user.id)
+        if family and request.GET.get('view') == 'threads':
+            return _inbox_threads(request, family, log)
         received_messages = Recipient.objects.filter(
             recipient=request.user,
             message__family=family
-        ).select_related('message').order_by('-message__sent_at') if family else Recipient.objects.none()
-        paginator = Paginator(received_messages, 10)  # Show 10 messages per page
-        page_number = request.GET.get('page')
-        page_obj = paginator.get_page(page_number)
+        ).select_related('message', 'message__sender') if family else Recipient.objects.none()
+        paginator = KeysetPaginator(received_messages, ('-message__sent_at', '-id'), 10)  # Show 10 messages per page
+        page_obj = paginator.get_page(request.GET.get('cursor'))
         log.debug(
-            "Inbox data user_id=%s family_id=%s page=%s messages=%s",
+            "Inbox data user_id=%s family_id=%s messages=%s",
             request.user.id,
             family.id if family else None,
-            page_number,
-            received_messages.count() if hasattr(received_messages, 'count') else len(received_messages),
+            len(page_obj),
         )
         context = {
             'page_obj': page_obj,
@@ -45,6 +51,68 @@ def inbox(request):
         log.exception("Unhandled error in inbox user_id=%s", request.user.id)
         raise
 
+def _inbox_threads(request, family, log):
+    paginator = KeysetPaginator(threads.inbox_threads(request.user, family), ('-latest', '-thread_id'), 10)
+    page_obj = paginator.get_page(request.GET.get('cursor'))
+    roots = Message.objects.select_related('sender').in_bulk([row['thread_id'] for row in page_obj])
+    for row in page_obj:
+        row['root'] = roots.get(row['thread_id'])
+    log.debug(
+        "Inbox threads user_id=%s family_id=%s threads=%s",
+        request.user.id,
+        family.id,
+        len(page_obj),
+    )
+    return render(request, 'mail/inbox_threads.html', {'page_obj': page_obj})
+
+@login_required
+def message_thread(request, pk):
+    log = logging.getLogger(__name__)
+    try:
+        family = request.current_family
+        if not family:
+            log.warning("Thread blocked: no family user_id=%s thread_id=%s", request.user.id, pk)
+            return redirect('switch_family')
+        messages = list(threads.thread_messages(pk, request.user, family))
+        if not messages:
+            log.warning("Thread blocked: nothing visible user_id=%s thread_id=%s", request.user.id, pk)
+            raise Http404("No conversation found.")
+        unread_ids = [
+            recipient.id
+            for message in messages
+            for recipient in message.recipients.all()
+            if recipient.recipient_id == request.user.id and recipient.read_at is None
+        ]
+        if unread_ids:
+            marked = counters.mark_all_read(request.user.id, family.id, unread_ids)
+            log.info("Thread marked read user_id=%s thread_id=%s messages=%s", request.user.id, pk, marked)
+        context = {
+            'messages_in_thread': messages,
+            'first_message': messages[0],
+            'unread_ids': set(unread_ids),
+        }
+        return render(request, 'mail/thread.html', context)
+    except Exception:
+        log.exception("Unhandled error in message_thread user_id=%s thread_id=%s", request.user.id, pk)
+        raise
+
+@login_required
+def unread_count(request):
+    """
+    Return the user's unread message count in the current family as JSON.
+
+    Reads a single counter row, so the inbox badge can poll it cheaply.
+    """
+    log = logging.getLogger(__name__)
+    try:
+        family = request.current_family
+        if not family:
+            return JsonResponse({'family_id': None, 'unread': 0})
+        return JsonResponse({'family_id': family.id, 'unread': counters.get_unread_count(request.user, family)})
+    except Exception:
+        log.exception("Unhandled error in unread_count user_id=%s", request.user.id)
+        raise
+
 @login_required
 def message_detail(request, pk):
     log = logging.getLogger(__name__)
@@ -58,9 +126,7 @@ def message_detail(request, pk):
             log.warning("Message detail blocked: invalid family or message user_id=%s message_id=%s", request.user.id, pk)
             return HttpResponseForbidden("Invalid message or family context.")
         recipient = Recipient.objects.filter(message=message, recipient=request.user).first()
-        if recipient and not recipient.read_at:
-            recipient.read_at = timezone.now()
-            recipient.save()
+        if recipient and not recipient.read_at and counters.mark_read(recipient):
             log.info("Message marked read user_id=%s message_id=%s", request.user.id, pk)
         context = {
             'message': message,
@@ -82,13 +148,7 @@ def compose_message(request):
         if request.method == 'POST':
             form = MessageForm(request.POST, family=family)
             if form.is_valid():
-                message = form.save(commit=False)
-                message.sender = request.user
-                message.family = family
-                message.save()
-                recipients = form.cleaned_data['recipients']
-                for recipient in recipients:
-                    Recipient.objects.create(message=message, recipient=recipient)
+                message, recipients = _send(form, family, request.user)
                 log.info(
                     "Message sent user_id=%s family_id=%s message_id=%s recipients=%s",
                     request.user.id,
@@ -204,13 +264,7 @@ def reply_message(request, pk):
         if request.method == 'POST':
             form = MessageForm(request.POST, family=family)
             if form.is_valid():
-                message = form.save(commit=False)
-                message.sender = request.user
-                message.family = family
-                message.save()
-                recipients = form.cleaned_data['recipients']
-                for recipient in recipients:
-                    Recipient.objects.create(message=message, recipient=recipient)
+                message, recipients = _send(form, family, request.user, reply_to=original_message)
                 log.info(
                     "Message reply sent user_id=%s original_message_id=%s message_id=%s recipients=%s",
                     request.user.id,
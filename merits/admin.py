@@ -1,6 +1,17 @@
 from django.contrib import admin
 
-from merits.models import Merit, Demerit
+from merits.models import Merit, Demerit, MeritScoreSnapshot
 
-admin.site.register(Merit)
-admin.site.register(Demerit)
+
+@admin.register(Merit, Demerit)
+class PointsAdmin(admin.ModelAdmin):
+    list_display = ('child', 'family', 'weight', 'description', 'creator', 'date_awarded')
+    list_filter = ('family',)
+    search_fields = ('description', 'child__username')
+
+
+@admin.register(MeritScoreSnapshot)
+class MeritScoreSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('child', 'family', 'period', 'period_start', 'merits', 'demerits')
+    list_filter = ('family', 'period')
+    date_hierarchy = 'period_start'
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class MeritsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'merits'
+
+    def ready(self):
+        from . import snapshots  # noqa: F401  (registers signal receivers)
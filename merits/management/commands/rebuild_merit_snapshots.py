@@ -0,0 +1,21 @@
+"""
+Management command to rebuild MeritScoreSnapshot rows from Merit/Demerit.
+
+Snapshots are normally maintained by signals; run this after bulk imports or
+raw SQL changes that bypass them.
+"""
+
+from merits import snapshots
+from project.commands import FamilyCommand
+
+
+class Command(FamilyCommand):
+    help = "Rebuild weekly and monthly merit score snapshots"
+
+    family_help = "Only rebuild this family id (may be repeated)"
+
+    def handle(self, *args, **options):
+        families = self.selected_families(options)
+
+        written = snapshots.rebuild(families)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} merit snapshot(s)."))
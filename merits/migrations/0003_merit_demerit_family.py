@@ -0,0 +1,83 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_family(apps, schema_editor):
+    """
+    Assign each merit/demerit to a family of its child.
+
+    Prefer a family the creator also belongs to (the parent who awarded it),
+    then the child's earliest membership, then the creator's. Entries that
+    still have no family are never deleted: the migration stops and lists
+    them so they can be reassigned (or removed deliberately) first.
+    """
+    Membership = apps.get_model('project', 'Membership')
+    families_by_user = {}
+    for user_id, family_id in Membership.objects.order_by('id').values_list('user_id', 'family_id'):
+        families_by_user.setdefault(user_id, []).append(family_id)
+
+    unassigned = {}
+    for model_name in ('Merit', 'Demerit'):
+        model = apps.get_model('merits', model_name)
+        ids_by_family = {}
+        orphans = []
+        for entry_id, child_id, creator_id in model.objects.values_list('id', 'child_id', 'creator_id').iterator():
+            child_families = families_by_user.get(child_id, [])
+            creator_families = set(families_by_user.get(creator_id, []))
+            shared = [family_id for family_id in child_families if family_id in creator_families]
+            candidates = shared or child_families or families_by_user.get(creator_id, [])
+            if candidates:
+                ids_by_family.setdefault(candidates[0], []).append(entry_id)
+            else:
+                orphans.append(entry_id)
+        for family_id, entry_ids in ids_by_family.items():
+            for start in range(0, len(entry_ids), 500):
+                model.objects.filter(id__in=entry_ids[start:start + 500]).update(family_id=family_id)
+        if orphans:
+            unassigned[model_name] = orphans
+    if unassigned:
+        listed = '; '.join(f"{name} ids {', '.join(map(str, ids))}" for name, ids in unassigned.items())
+        raise RuntimeError(
+            "Cannot assign a family to these merits/demerits because neither the child nor "
+            f"the creator belongs to a family: {listed}. Add a membership or remove them, then migrate again."
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('merits', '0002_demerit_weight_merit_weight'),
+        ('project', '0005_alter_customuser_profile_pic'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='demerit',
+            name='family',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='demerits', to='project.family'),
+        ),
+        migrations.AddField(
+            model_name='merit',
+            name='family',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='merits', to='project.family'),
+        ),
+        migrations.RunPython(backfill_family, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='demerit',
+            name='family',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='demerits', to='project.family'),
+        ),
+        migrations.AlterField(
+            model_name='merit',
+            name='family',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='merits', to='project.family'),
+        ),
+        migrations.AddIndex(
+            model_name='demerit',
+            index=models.Index(fields=['family', 'child', 'date_awarded'], name='demerit_fam_child_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='merit',
+            index=models.Index(fields=['family', 'child', 'date_awarded'], name='merit_fam_child_date_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:53
+
+from datetime import timedelta
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_merit_snapshots(apps, schema_editor):
+    Merit = apps.get_model('merits', 'Merit')
+    Demerit = apps.get_model('merits', 'Demerit')
+    MeritScoreSnapshot = apps.get_model('merits', 'MeritScoreSnapshot')
+    snapshots = {}
+    for model, field in ((Merit, 'merits'), (Demerit, 'demerits')):
+        entries = model.objects.values_list('family_id', 'child_id', 'date_awarded', 'weight')
+        for family_id, child_id, awarded, weight in entries.iterator():
+            day = timezone.localdate(awarded)
+            for period, start in (('week', day - timedelta(days=day.weekday())), ('month', day.replace(day=1))):
+                key = (family_id, child_id, period, start)
+                snapshot = snapshots.setdefault(key, MeritScoreSnapshot(
+                    family_id=family_id,
+                    child_id=child_id,
+                    period=period,
+                    period_start=start,
+                ))
+                setattr(snapshot, field, getattr(snapshot, field) + weight)
+    MeritScoreSnapshot.objects.bulk_create(snapshots.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('merits', '0003_merit_demerit_family'),
+        ('project', '0005_alter_customuser_profile_pic'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeritScoreSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('merits', models.IntegerField(default=0)),
+                ('demerits', models.IntegerField(default=0)),
+                ('child', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='merit_snapshots', to=settings.AUTH_USER_MODEL)),
+                ('family', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='merit_snapshots', to='project.family')),
+            ],
+            options={
+                'ordering': ['period_start'],
+                'indexes': [models.Index(fields=['family', 'period', 'period_start'], name='merit_snap_fam_period_idx')],
+                'constraints': [models.UniqueConstraint(fields=('family', 'child', 'period', 'period_start'), name='uniq_merit_snapshot_per_period')],
+            },
+        ),
+        migrations.RunPython(backfill_merit_snapshots, migrations.RunPython.noop),
+    ]
@@ -1,16 +1,31 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 
 class Merit(models.Model):
     """
     Model representing a merit point system for children.
     """
+    family = models.ForeignKey('project.Family', on_delete=models.CASCADE, related_name='merits')
     child = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='merits')
     date_awarded = models.DateTimeField(auto_now_add=True)
     description = models.CharField(max_length=255, blank=True, null=True)
     weight = models.IntegerField(default=1)
     creator = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='created_merits')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['family', 'child', 'date_awarded'], name='merit_fam_child_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Keep the row and its MeritScoreSnapshot updates in one transaction.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
     def __str__(self):
         return f"{self.child.username} - {self.description}"
 
@@ -18,11 +33,68 @@ class Demerit(models.Model):
     """
     Model representing a demerit point system for children.
     """
+    family = models.ForeignKey('project.Family', on_delete=models.CASCADE, related_name='demerits')
     child = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='demerits')
     date_awarded = models.DateTimeField(auto_now_add=True)
     description = models.CharField(max_length=255, blank=True, null=True)
     weight = models.IntegerField(default=1)
     creator = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='created_demerits')
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['family', 'child', 'date_awarded'], name='demerit_fam_child_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Keep the row and its MeritScoreSnapshot updates in one transaction.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            return super().delete(*args, **kwargs)
+
     def __str__(self):
         return f"{self.child.username} - {self.description}"
+
+
+class MeritScoreSnapshot(models.Model):
+    """
+    Per-child merit and demerit totals for one week or month.
+
+    Periods start on a local Monday (weeks) or the first of the month.
+    Maintained by ``merits.snapshots`` on Merit/Demerit writes and rebuilt by
+    the ``rebuild_merit_snapshots`` command.
+    """
+    PERIOD_WEEK = 'week'
+    PERIOD_MONTH = 'month'
+    PERIOD_CHOICES = [
+        (PERIOD_WEEK, 'Week'),
+        (PERIOD_MONTH, 'Month'),
+    ]
+
+    family = models.ForeignKey('project.Family', on_delete=models.CASCADE, related_name='merit_snapshots')
+    child = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='merit_snapshots')
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    merits = models.IntegerField(default=0)
+    demerits = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['period_start']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['family', 'child', 'period', 'period_start'],
+                name='uniq_merit_snapshot_per_period',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['family', 'period', 'period_start'], name='merit_snap_fam_period_idx'),
+        ]
+
+    @property
+    def net(self):
+        return self.merits - self.demerits
+
+    def __str__(self):
+        return f"{self.child.username} {self.period} of {self.period_start}: {self.net}"
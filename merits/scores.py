@@ -0,0 +1,61 @@
+"""
+Merit score queries.
+
+Merits and demerits carry their family, so every query here reads a single
+family's partition through the ``(family, child, date_awarded)`` indexes.
+``child_scores`` returns every child's merit, demerit and net totals in a
+single statement. Merits and demerits live in separate tables, so joining
+both onto the child would multiply rows; each total is a correlated
+``SUM`` subquery instead. ``child_history`` is a date-ordered union of a
+child's merits and demerits that is keyset-paginated in the database.
+"""
+
+from django.db.models import F, IntegerField, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from project.models import Membership
+
+from .models import Demerit, Merit
+
+
+def _points(model, family):
+    totals = (
+        model.objects.filter(family=family, child=OuterRef('user_id'))
+        .order_by()
+        .values('child')
+        .annotate(total=Sum('weight'))
+        .values('total')
+    )
+    return Coalesce(Subquery(totals, output_field=IntegerField()), Value(0))
+
+
+def child_scores(family):
+    """Return the family's child memberships annotated with point totals.
+
+    Each membership (with ``user`` loaded) carries ``merit_points``,
+    ``demerit_points`` and ``net_points``.
+    """
+    return (
+        Membership.objects.filter(family=family, role='child')
+        .select_related('user')
+        .annotate(merit_points=_points(Merit, family), demerit_points=_points(Demerit, family))
+        .annotate(net_points=F('merit_points') - F('demerit_points'))
+        .order_by('user__username')
+    )
+
+
+# Merit and demerit ids overlap, so ``kind`` is part of the key that orders
+# (and keyset-pages) the combined history.
+HISTORY_ORDERING = ('-date_awarded', '-kind', '-id')
+
+
+def child_history(child, family):
+    """Return the child's merits and demerits in a family, newest first, as dict rows.
+
+    Rows have ``kind`` ('merit' or 'demerit'), ``id``, ``date_awarded``,
+    ``description``, ``weight`` and ``creator__username``.
+    """
+    fields = ('kind', 'id', 'date_awarded', 'description', 'weight', 'creator__username')
+    merits = Merit.objects.filter(family=family, child=child).annotate(kind=Value('merit')).values(*fields)
+    demerits = Demerit.objects.filter(family=family, child=child).annotate(kind=Value('demerit')).values(*fields)
+    return merits.union(demerits, all=True).order_by(*HISTORY_ORDERING)
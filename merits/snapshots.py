@@ -0,0 +1,222 @@
+"""
+Weekly and monthly merit score rollups.
+
+Merit and Demerit signals add each entry's weight to the child's
+``MeritScoreSnapshot`` rows for the entry's local week and month with a
+single ``UPDATE ... SET merits = merits + delta``. A missing row is created
+from the entries in its period, so snapshots heal themselves after a
+rebuild or a manual delete. Leaderboards and trends read only the
+snapshots: O(periods), not O(merit rows).
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from project.models import Family, Membership
+from project.running_totals import create_or_apply, local_day
+
+from .models import Demerit, Merit, MeritScoreSnapshot
+
+PERIODS = (MeritScoreSnapshot.PERIOD_WEEK, MeritScoreSnapshot.PERIOD_MONTH)
+
+_FIELDS = {Merit: 'merits', Demerit: 'demerits'}
+
+
+def period_start(day, period):
+    """Return the first day of the week (Monday) or month containing ``day``."""
+    if period == MeritScoreSnapshot.PERIOD_WEEK:
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def next_period_start(start, period):
+    """Return the first day of the period after the one starting at ``start``."""
+    if period == MeritScoreSnapshot.PERIOD_WEEK:
+        return start + timedelta(weeks=1)
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def previous_period_start(start, period):
+    """Return the first day of the period before the one starting at ``start``."""
+    if period == MeritScoreSnapshot.PERIOD_WEEK:
+        return start - timedelta(weeks=1)
+    return (start - timedelta(days=1)).replace(day=1)
+
+
+def _bounds(start, period):
+    end = next_period_start(start, period)
+    return (
+        timezone.make_aware(datetime.combine(start, time.min)),
+        timezone.make_aware(datetime.combine(end, time.min)),
+    )
+
+
+def _create_snapshot(family_id, child_id, period, start, delta=None):
+    """Create a snapshot from the entries in its period; on a concurrent create, apply ``delta`` to that row."""
+    lower, upper = _bounds(start, period)
+    values = {}
+    for model, field in _FIELDS.items():
+        total = model.objects.filter(
+            family_id=family_id,
+            child_id=child_id,
+            date_awarded__gte=lower,
+            date_awarded__lt=upper,
+        ).aggregate(total=Sum('weight'))['total']
+        values[field] = total or 0
+    create_or_apply(
+        MeritScoreSnapshot,
+        {'family_id': family_id, 'child_id': child_id, 'period': period, 'period_start': start},
+        values,
+        delta,
+    )
+
+
+def apply_delta(model, family_id, child_id, day, delta, create=True):
+    """Add ``delta`` to the child's week and month snapshots containing ``day``."""
+    if not delta:
+        return
+    field = _FIELDS[model]
+    for period in PERIODS:
+        start = period_start(day, period)
+        updated = MeritScoreSnapshot.objects.filter(
+            family_id=family_id,
+            child_id=child_id,
+            period=period,
+            period_start=start,
+        ).update(**{field: F(field) + delta})
+        if not updated and create and Family.objects.filter(id=family_id).exists():
+            _create_snapshot(family_id, child_id, period, start, {field: delta})
+
+
+def rebuild(families=None):
+    """Recompute snapshots from Merit/Demerit rows; returns the number written."""
+    snapshots = MeritScoreSnapshot.objects.all()
+    family_filter = {}
+    if families is not None:
+        family_ids = [family.id for family in families]
+        snapshots = snapshots.filter(family_id__in=family_ids)
+        family_filter = {'family_id__in': family_ids}
+
+    rows = {}
+    for model, field in _FIELDS.items():
+        entries = model.objects.filter(**family_filter).values_list('family_id', 'child_id', 'date_awarded', 'weight')
+        for family_id, child_id, awarded, weight in entries.iterator():
+            day = local_day(awarded)
+            for period in PERIODS:
+                key = (family_id, child_id, period, period_start(day, period))
+                snapshot = rows.setdefault(key, MeritScoreSnapshot(
+                    family_id=family_id,
+                    child_id=child_id,
+                    period=period,
+                    period_start=key[3],
+                ))
+                setattr(snapshot, field, getattr(snapshot, field) + weight)
+
+    with transaction.atomic():
+        snapshots.delete()
+        MeritScoreSnapshot.objects.bulk_create(rows.values(), batch_size=500)
+    return len(rows)
+
+
+def _children(family):
+    return [
+        membership.user
+        for membership in Membership.objects.filter(family=family, role='child').select_related('user').order_by('user__username')
+    ]
+
+
+def leaderboard(family, period, start=None):
+    """
+    Rank the family's children by net points for one period (default: current).
+
+    Returns ``(start, rows)`` where rows are dicts with ``child``, ``merits``,
+    ``demerits`` and ``net``, highest net first.
+    """
+    start = start or period_start(timezone.localdate(), period)
+    snapshots = {
+        snapshot.child_id: snapshot
+        for snapshot in MeritScoreSnapshot.objects.filter(family=family, period=period, period_start=start)
+    }
+    rows = []
+    for child in _children(family):
+        snapshot = snapshots.get(child.id)
+        merits = snapshot.merits if snapshot else 0
+        demerits = snapshot.demerits if snapshot else 0
+        rows.append({'child': child, 'merits': merits, 'demerits': demerits, 'net': merits - demerits})
+    rows.sort(key=lambda row: -row['net'])
+    return start, rows
+
+
+def trend(family, period, count, child_ids=None):
+    """
+    Return per-child net points for the last ``count`` periods (oldest first).
+
+    Returns ``(starts, series)`` where ``series`` maps each child to a list of
+    ``{'merits', 'demerits', 'net'}`` dicts aligned with ``starts``.
+    """
+    starts = [period_start(timezone.localdate(), period)]
+    while len(starts) < count:
+        starts.append(previous_period_start(starts[-1], period))
+    starts.reverse()
+    children = [child for child in _children(family) if child_ids is None or child.id in child_ids]
+    positions = {start: index for index, start in enumerate(starts)}
+    series = {
+        child: [{'merits': 0, 'demerits': 0, 'net': 0} for _ in starts]
+        for child in children
+    }
+    by_id = {child.id: child for child in children}
+    snapshots = MeritScoreSnapshot.objects.filter(
+        family=family,
+        period=period,
+        period_start__gte=starts[0],
+        child_id__in=list(by_id),
+    )
+    for snapshot in snapshots:
+        index = positions.get(snapshot.period_start)
+        if index is not None:
+            series[by_id[snapshot.child_id]][index] = {
+                'merits': snapshot.merits,
+                'demerits': snapshot.demerits,
+                'net': snapshot.net,
+            }
+    return starts, series
+
+
+@receiver(pre_save, sender=Merit)
+@receiver(pre_save, sender=Demerit)
+def _remember_previous(sender, instance, **kwargs):
+    instance._snapshot_previous = None
+    if instance.pk:
+        instance._snapshot_previous = (
+            sender.objects.filter(pk=instance.pk)
+            .values_list('family_id', 'child_id', 'date_awarded', 'weight')
+            .first()
+        )
+
+
+@receiver(post_save, sender=Merit)
+@receiver(post_save, sender=Demerit)
+def _entry_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_snapshot_previous', None)
+    day = local_day(instance.date_awarded)
+    if previous:
+        family_id, child_id, awarded, weight = previous
+        if (family_id, child_id, local_day(awarded)) == (instance.family_id, instance.child_id, day):
+            apply_delta(sender, family_id, child_id, day, instance.weight - weight)
+            return
+        apply_delta(sender, family_id, child_id, local_day(awarded), -weight)
+    apply_delta(sender, instance.family_id, instance.child_id, day, instance.weight)
+
+
+@receiver(post_delete, sender=Merit)
+@receiver(post_delete, sender=Demerit)
+def _entry_deleted(sender, instance, **kwargs):
+    # Never create rows here (see project.running_totals).
+    apply_delta(sender, instance.family_id, instance.child_id, local_day(instance.date_awarded), -instance.weight, create=False)
@@ -5,6 +5,7 @@ from django.test import TestCase
 
 from merits.forms import DemeritForm, MeritForm
 from merits.models import Merit
+from project.models import Family
 
 
 class MeritsFormModelTests(TestCase):
@@ -20,7 +21,8 @@ class MeritsFormModelTests(TestCase):
     def test_merit_str(self):
         """Merit __str__ includes username and description."""
         user = get_user_model().objects.create_user("child", password="Password123!")
-        merit = Merit.objects.create(child=user, description="Chores", weight=2, creator=user)
+        family = Family.objects.create(name="StrFamily")
+        merit = Merit.objects.create(family=family, child=user, description="Chores", weight=2, creator=user)
         self.assertIn("child", str(merit))
         self.assertIn("Chores", str(merit))
 
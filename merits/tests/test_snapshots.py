@@ -0,0 +1,167 @@
+"""Tests for weekly/monthly merit snapshots and the endpoints built on them."""
+
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from merits import snapshots
+from merits.models import Demerit, Merit, MeritScoreSnapshot
+from project.models import Family, Membership
+
+
+class SnapshotFixtureMixin:
+    """Shared family, children and helpers for snapshot tests."""
+
+    def setUp(self):
+        """Create a family with a parent and two children."""
+        User = get_user_model()
+        self.parent = User.objects.create_user("snapparent", password="Password123!")
+        self.alice = User.objects.create_user("snapalice", password="Password123!")
+        self.bob = User.objects.create_user("snapbob", password="Password123!")
+        self.family = Family.objects.create(name="Snapshots")
+        Membership.objects.create(user=self.parent, family=self.family, role="parent")
+        Membership.objects.create(user=self.alice, family=self.family, role="child")
+        Membership.objects.create(user=self.bob, family=self.family, role="child")
+        self.today = timezone.localdate()
+
+    def _award(self, model, child, weight):
+        return model.objects.create(family=self.family, child=child, creator=self.parent, weight=weight)
+
+    def _snapshot(self, child, period, day=None):
+        start = snapshots.period_start(day or self.today, period)
+        return MeritScoreSnapshot.objects.get(family=self.family, child=child, period=period, period_start=start)
+
+
+class MeritSnapshotTests(SnapshotFixtureMixin, TestCase):
+    """Tests for MeritScoreSnapshot maintenance and rebuilds."""
+
+    def test_awards_update_week_and_month(self):
+        """Merits and demerits add to both of the child's current snapshots."""
+        self._award(Merit, self.alice, 3)
+        self._award(Merit, self.alice, 2)
+        self._award(Demerit, self.alice, 1)
+        for period in snapshots.PERIODS:
+            snapshot = self._snapshot(self.alice, period)
+            self.assertEqual((snapshot.merits, snapshot.demerits, snapshot.net), (5, 1, 4))
+
+    def test_edit_move_and_delete(self):
+        """Weight edits apply the difference; moves and deletes subtract."""
+        merit = self._award(Merit, self.alice, 3)
+        merit.weight = 5
+        merit.save()
+        self.assertEqual(self._snapshot(self.alice, "week").merits, 5)
+
+        earlier = timezone.now() - timedelta(days=40)
+        merit.date_awarded = earlier
+        merit.save()
+        self.assertEqual(self._snapshot(self.alice, "month").merits, 0)
+        self.assertEqual(self._snapshot(self.alice, "month", timezone.localdate(earlier)).merits, 5)
+
+        merit.delete()
+        self.assertEqual(self._snapshot(self.alice, "month", timezone.localdate(earlier)).merits, 0)
+
+    def test_rebuild_command_matches_signals(self):
+        """Rebuilding reproduces the signal-maintained snapshots."""
+        self._award(Merit, self.alice, 3)
+        self._award(Demerit, self.bob, 2)
+        fields = ("child_id", "period", "period_start", "merits", "demerits")
+        expected = sorted(MeritScoreSnapshot.objects.values_list(*fields))
+        MeritScoreSnapshot.objects.all().delete()
+        out = StringIO()
+        call_command("rebuild_merit_snapshots", family_ids=[self.family.id], stdout=out)
+        self.assertIn("Wrote 4", out.getvalue())
+        self.assertEqual(sorted(MeritScoreSnapshot.objects.values_list(*fields)), expected)
+
+    def test_losing_a_concurrent_create_still_applies_the_change(self):
+        """If another transaction created the snapshot first, this award's weight is added to it."""
+        start = snapshots.period_start(self.today, "week")
+        # Merit.save is atomic, so the snapshot a concurrent award committed
+        # first was aggregated without this transaction's still-uncommitted merit.
+        MeritScoreSnapshot.objects.create(family=self.family, child=self.alice, period="week", period_start=start, merits=3)
+        snapshots._create_snapshot(self.family.id, self.alice.id, "week", start, {"merits": 2})
+        self.assertEqual(self._snapshot(self.alice, "week").merits, 5)
+
+    def test_period_helpers(self):
+        """Weeks start on Monday and months roll over correctly."""
+        day = self.today.replace(month=1, day=31)
+        self.assertEqual(snapshots.period_start(day, "month"), day.replace(day=1))
+        self.assertEqual(snapshots.period_start(day, "week").weekday(), 0)
+        self.assertEqual(snapshots.next_period_start(day.replace(day=1), "month"), day.replace(month=2, day=1))
+        self.assertEqual(snapshots.previous_period_start(day.replace(day=1), "month").month, 12)
+
+
+class MeritSnapshotTransactionTests(TransactionTestCase):
+    """Award writes and their snapshot updates commit together."""
+
+    def test_snapshot_update_runs_inside_the_award_transaction(self):
+        """The snapshot receivers run before the merit row is committed, on save and delete."""
+        User = get_user_model()
+        family = Family.objects.create(name="Atomic")
+        parent = User.objects.create_user("atomicparent", password="Password123!")
+        child = User.objects.create_user("atomicchild", password="Password123!")
+        seen = []
+        original = snapshots.apply_delta
+
+        def record(*args, **kwargs):
+            seen.append(connection.in_atomic_block)
+            return original(*args, **kwargs)
+
+        with mock.patch.object(snapshots, "apply_delta", side_effect=record):
+            merit = Merit.objects.create(family=family, child=child, creator=parent, weight=2)
+            merit.delete()
+        self.assertEqual(seen, [True, True])
+
+
+class MeritSnapshotViewTests(SnapshotFixtureMixin, TestCase):
+    """Tests for the leaderboard and trend endpoints."""
+
+    def setUp(self):
+        """Log in as the parent with the family selected."""
+        super().setUp()
+        self.client.force_login(self.parent)
+        session = self.client.session
+        session["current_family_id"] = self.family.id
+        session.save()
+
+    def test_leaderboard_ranks_children(self):
+        """The leaderboard ranks by net points and includes children without points."""
+        self._award(Merit, self.bob, 4)
+        self._award(Merit, self.alice, 1)
+        response = self.client.get(reverse("merit_leaderboard"), {"period": "month"})
+        self.assertEqual(response.status_code, 200)
+        rows = response.json()["children"]
+        self.assertEqual([(row["rank"], row["username"], row["net_points"]) for row in rows], [
+            (1, "snapbob", 4),
+            (2, "snapalice", 1),
+        ])
+
+    def test_leaderboard_reads_only_snapshots(self):
+        """Leaderboards cost a fixed number of queries regardless of history size."""
+        for _ in range(20):
+            self._award(Merit, self.alice, 1)
+        with self.assertNumQueries(2):
+            _, rows = snapshots.leaderboard(self.family, "week")
+        self.assertEqual(rows[0]["net"], 20)
+
+    def test_trends_align_periods(self):
+        """Trend series have one entry per requested period, oldest first."""
+        self._award(Demerit, self.alice, 2)
+        response = self.client.get(reverse("merit_trends"), {"period": "week", "count": 4, "child": self.alice.id})
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual(len(payload["periods"]), 4)
+        self.assertEqual(payload["periods"][-1], snapshots.period_start(self.today, "week").isoformat())
+        self.assertEqual([child["username"] for child in payload["children"]], ["snapalice"])
+        self.assertEqual(payload["children"][0]["points"][-1], {"merits": 0, "demerits": 2, "net": -2})
+
+    def test_invalid_period_rejected(self):
+        """Unknown periods return 400."""
+        response = self.client.get(reverse("merit_trends"), {"period": "year"})
+        self.assertEqual(response.status_code, 400)
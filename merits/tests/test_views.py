@@ -3,8 +3,11 @@
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
+from django.utils import timezone
 
+from merits import scores
 from merits.models import Merit, Demerit
+from merits.views import HISTORY_PAGE_SIZE
 from project.models import Family, Membership
 
 
@@ -83,3 +86,100 @@ class MeritsViewTests(TestCase):
         self.assertRedirects(demerit_response, reverse("family_dashboard"), target_status_code=200)
         self.assertFalse(Merit.objects.filter(description="Self-awarded").exists())
         self.assertFalse(Demerit.objects.filter(description="Self-awarded").exists())
+
+
+class MeritScoreTests(TestCase):
+    """Tests for grouped score queries, the scores API and paginated history."""
+
+    def setUp(self):
+        """Create a family with a parent and two children with points."""
+        User = get_user_model()
+        self.parent = User.objects.create_user("scoreparent", password="Password123!")
+        self.alice = User.objects.create_user("alice", password="Password123!")
+        self.bob = User.objects.create_user("bob", password="Password123!")
+        self.family = Family.objects.create(name="ScoreFamily")
+        Membership.objects.create(user=self.parent, family=self.family, role="parent")
+        Membership.objects.create(user=self.alice, family=self.family, role="child")
+        Membership.objects.create(user=self.bob, family=self.family, role="child")
+        for weight in (2, 3):
+            Merit.objects.create(family=self.family, child=self.alice, creator=self.parent, description="Chores", weight=weight)
+        Demerit.objects.create(family=self.family, child=self.alice, creator=self.parent, description="Late", weight=1)
+        self.client.force_login(self.parent)
+        session = self.client.session
+        session["current_family_id"] = self.family.id
+        session.save()
+
+    def test_child_scores_single_query(self):
+        """All children's totals come from one query."""
+        with self.assertNumQueries(1):
+            rows = [
+                (child.user.username, child.merit_points, child.demerit_points, child.net_points)
+                for child in scores.child_scores(self.family)
+            ]
+        self.assertEqual(rows, [("alice", 5, 1, 4), ("bob", 0, 0, 0)])
+
+    def test_scores_api(self):
+        """The scores endpoint returns per-child totals as JSON."""
+        response = self.client.get(reverse("merit_scores"))
+        self.assertEqual(response.status_code, 200)
+        children = {row["username"]: row for row in response.json()["children"]}
+        self.assertEqual(children["alice"]["net_points"], 4)
+        self.assertEqual(children["bob"]["merit_points"], 0)
+
+    def test_history_is_paginated_per_child(self):
+        """History pages mix merits and demerits and are limited in size."""
+        for _ in range(HISTORY_PAGE_SIZE):
+            Merit.objects.create(family=self.family, child=self.bob, creator=self.parent, description="Extra", weight=1)
+        response = self.client.get(reverse("merit_history", args=[self.alice.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            sorted(entry["kind"] for entry in response.context["page_obj"]),
+            ["demerit", "merit", "merit"],
+        )
+        response = self.client.get(reverse("merit_history", args=[self.bob.id]))
+        self.assertEqual(len(response.context["page_obj"]), HISTORY_PAGE_SIZE)
+        self.assertFalse(response.context["page_obj"].has_next)
+
+    def test_history_cursor_walks_every_entry_once(self):
+        """Cursor pages cover every entry once, even when a merit and a demerit share a timestamp and id."""
+        for _ in range(HISTORY_PAGE_SIZE):
+            Merit.objects.create(family=self.family, child=self.bob, creator=self.parent, description="Extra", weight=1)
+            Demerit.objects.create(family=self.family, child=self.bob, creator=self.parent, description="Extra", weight=1)
+        same_time = timezone.now()
+        Merit.objects.filter(child=self.bob).update(date_awarded=same_time)
+        Demerit.objects.filter(child=self.bob).update(date_awarded=same_time)
+        seen = []
+        cursor = None
+        while True:
+            params = {"cursor": cursor} if cursor else {}
+            page_obj = self.client.get(reverse("merit_history", args=[self.bob.id]), params).context["page_obj"]
+            self.assertLessEqual(len(page_obj), HISTORY_PAGE_SIZE)
+            seen.extend((entry["kind"], entry["id"]) for entry in page_obj)
+            if not page_obj.has_next:
+                break
+            cursor = page_obj.next_cursor
+        self.assertEqual(len(seen), 2 * HISTORY_PAGE_SIZE)
+        self.assertEqual(len(set(seen)), len(seen))
+
+    def test_scores_are_family_scoped(self):
+        """Points awarded in another family do not count here."""
+        other = Family.objects.create(name="OtherFamily")
+        Membership.objects.create(user=self.alice, family=other, role="child")
+        Merit.objects.create(family=other, child=self.alice, creator=self.parent, description="Elsewhere", weight=10)
+        alice = scores.child_scores(self.family).get(user=self.alice)
+        self.assertEqual(alice.net_points, 4)
+        self.assertEqual(scores.child_scores(other).get(user=self.alice).net_points, 10)
+
+    def test_added_merit_records_current_family(self):
+        """Merits created from the dashboard belong to the current family."""
+        self.client.post(
+            reverse("add_merit"),
+            {"merit-child": self.bob.id, "merit-description": "Tidy", "merit-weight": 1},
+        )
+        self.assertEqual(Merit.objects.get(description="Tidy").family, self.family)
+
+    def test_history_rejects_non_members(self):
+        """History is only available for children in the current family."""
+        outsider = get_user_model().objects.create_user("outsider", password="Password123!")
+        response = self.client.get(reverse("merit_history", args=[outsider.id]))
+        self.assertEqual(response.status_code, 404)
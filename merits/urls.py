@@ -3,6 +3,10 @@ from . import views
 
 urlpatterns = [
     path('dashboard/', views.merit_dashboard, name='merit_dashboard'),
+    path('history/<int:child_id>/', views.merit_history, name='merit_history'),
+    path('api/scores/', views.merit_scores, name='merit_scores'),
+    path('api/leaderboard/', views.merit_leaderboard, name='merit_leaderboard'),
+    path('api/trends/', views.merit_trends, name='merit_trends'),
     path('add_merit/', views.add_merit, name='add_merit'),
     path('add_demerit/', views.add_demerit, name='add_demerit'),
 ]
\ No newline at end of file
@@ -1,15 +1,21 @@
 import logging
 
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404, render
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
 from django.shortcuts import redirect
 
-from project.models import Membership, Family
-from merits.models import Merit, Demerit
+from project.models import Membership
+from project.pagination import KeysetPaginator
+from merits import scores, snapshots
+from merits.models import MeritScoreSnapshot
 from merits.forms import MeritForm, DemeritForm
 
+HISTORY_PAGE_SIZE = 25
+MAX_TREND_PERIODS = 104
+
 
 def _format_form_errors(form):
     error_messages = []
@@ -19,8 +25,9 @@ def _format_form_errors(form):
     return " | ".join(error_messages)
 
 
-def _is_parent_in_current_family(user, family):
-    return Membership.objects.filter(user=user, family=family, role='parent').exists()
+def _is_parent_in_current_family(request):
+    membership = getattr(request, 'current_membership', None)
+    return bool(membership and membership.role == 'parent')
 
 
 @login_required
@@ -33,31 +40,17 @@ def merit_dashboard(request):
         if not request.current_family:
             log.warning("Merit dashboard blocked: no current family user_id=%s", request.user.id)
             return redirect('switch_family')  # Ensure a family is selected
-        is_parent = _is_parent_in_current_family(request.user, request.current_family)
+        is_parent = _is_parent_in_current_family(request)
         merit_form = MeritForm(prefix="merit") if is_parent else None
         demerit_form = DemeritForm(prefix="demerit") if is_parent else None
 
-        children = Membership.objects.filter(family=request.current_family, role='child').select_related('user')
-        merits = Merit.objects.filter(child__families=request.current_family).select_related('child', 'creator')
+        children = list(scores.child_scores(request.current_family))
+        score_by_child = {child: child.net_points for child in children}
         log.debug(
-            "Merit dashboard data loaded family_id=%s children=%s merits=%s",
+            "Merit dashboard data loaded family_id=%s children=%s",
             request.current_family.id,
-            children.count(),
-            merits.count(),
+            len(children),
         )
-        merits_by_child = {}
-        for child in children:
-            merits_by_child[child.user_id] = [merit for merit in merits if merit.child_id == child.user_id]
-        demerits = Demerit.objects.filter(child__families=request.current_family).select_related('child', 'creator')
-        demerits_by_child = {}
-        for child in children:
-            demerits_by_child[child.user_id] = [demerit for demerit in demerits if demerit.child_id == child.user_id]
-
-        score_by_child = {}
-        for child in children:
-            score_by_child[child] = sum(merit.weight for merit in merits_by_child[child.user_id]) - sum(
-                demerit.weight for demerit in demerits_by_child[child.user_id]
-            )
 
         log.info(
             "Merit dashboard rendered user_id=%s family_id=%s",
@@ -69,8 +62,6 @@ def merit_dashboard(request):
             'merits/merit_dashboard.html',
             {
                 'children': children,
-                'merits_by_child': merits_by_child,
-                'demerits_by_child': demerits_by_child,
                 'score_by_child': score_by_child,
                 'merit_form': merit_form,
                 'demerit_form': demerit_form,
@@ -82,6 +73,140 @@ def merit_dashboard(request):
         raise
 
 
+@login_required
+def merit_scores(request):
+    """
+    Return merit, demerit and net totals for each child in the current family as JSON.
+    """
+    log = logging.getLogger(__name__)
+    try:
+        if not request.current_family:
+            log.warning("Merit scores blocked: no current family user_id=%s", request.user.id)
+            return JsonResponse({'error': 'No family selected.'}, status=400)
+        children = [
+            {
+                'user_id': child.user_id,
+                'username': child.user.username,
+                'merit_points': child.merit_points,
+                'demerit_points': child.demerit_points,
+                'net_points': child.net_points,
+            }
+            for child in scores.child_scores(request.current_family)
+        ]
+        return JsonResponse({'family_id': request.current_family.id, 'children': children})
+    except Exception:
+        log.exception("Unhandled error in merit_scores user_id=%s", request.user.id)
+        raise
+
+
+def _snapshot_period(request):
+    period = request.GET.get('period', MeritScoreSnapshot.PERIOD_WEEK)
+    return period if period in snapshots.PERIODS else None
+
+
+@login_required
+def merit_leaderboard(request):
+    """
+    Rank the current family's children by net points for this week or month.
+    """
+    log = logging.getLogger(__name__)
+    try:
+        if not request.current_family:
+            log.warning("Merit leaderboard blocked: no current family user_id=%s", request.user.id)
+            return JsonResponse({'error': 'No family selected.'}, status=400)
+        period = _snapshot_period(request)
+        if not period:
+            return JsonResponse({'error': 'period must be "week" or "month".'}, status=400)
+        start, rows = snapshots.leaderboard(request.current_family, period)
+        return JsonResponse({
+            'family_id': request.current_family.id,
+            'period': period,
+            'period_start': start.isoformat(),
+            'children': [
+                {
+                    'rank': rank,
+                    'user_id': row['child'].id,
+                    'username': row['child'].username,
+                    'merit_points': row['merits'],
+                    'demerit_points': row['demerits'],
+                    'net_points': row['net'],
+                }
+                for rank, row in enumerate(rows, start=1)
+            ],
+        })
+    except Exception:
+        log.exception("Unhandled error in merit_leaderboard user_id=%s", request.user.id)
+        raise
+
+
+@login_required
+def merit_trends(request):
+    """
+    Return weekly or monthly point series per child for the current family.
+    """
+    log = logging.getLogger(__name__)
+    try:
+        if not request.current_family:
+            log.warning("Merit trends blocked: no current family user_id=%s", request.user.id)
+            return JsonResponse({'error': 'No family selected.'}, status=400)
+        period = _snapshot_period(request)
+        if not period:
+            return JsonResponse({'error': 'period must be "week" or "month".'}, status=400)
+        try:
+            count = max(1, min(int(request.GET.get('count', 12)), MAX_TREND_PERIODS))
+            child_ids = {int(child_id) for child_id in request.GET.getlist('child')} or None
+        except ValueError:
+            return JsonResponse({'error': 'count and child must be integers.'}, status=400)
+        starts, series = snapshots.trend(request.current_family, period, count, child_ids)
+        return JsonResponse({
+            'family_id': request.current_family.id,
+            'period': period,
+            'periods': [start.isoformat() for start in starts],
+            'children': [
+                {'user_id': child.id, 'username': child.username, 'points': points}
+                for child, points in series.items()
+            ],
+        })
+    except Exception:
+        log.exception("Unhandled error in merit_trends user_id=%s", request.user.id)
+        raise
+
+
+@login_required
+def merit_history(request, child_id):
+    """
+    Render one child's merits and demerits, newest first, a page at a time.
+    """
+    log = logging.getLogger(__name__)
+    try:
+        if not request.current_family:
+            log.warning("Merit history blocked: no current family user_id=%s", request.user.id)
+            return redirect('switch_family')
+        child = get_object_or_404(
+            Membership.objects.select_related('user'),
+            family=request.current_family,
+            role='child',
+            user_id=child_id,
+        )
+        paginator = KeysetPaginator(
+            scores.child_history(child.user, request.current_family),
+            scores.HISTORY_ORDERING,
+            HISTORY_PAGE_SIZE,
+        )
+        page_obj = paginator.get_page(request.GET.get('cursor'))
+        log.debug(
+            "Merit history page user_id=%s family_id=%s child_user_id=%s entries=%s",
+            request.user.id,
+            request.current_family.id,
+            child.user_id,
+            len(page_obj),
+        )
+        return render(request, 'merits/merit_history.html', {'child': child, 'page_obj': page_obj})
+    except Exception:
+        log.exception("Unhandled error in merit_history user_id=%s", request.user.id)
+        raise
+
+
 @login_required
 def add_merit(request):
     """
@@ -92,7 +217,7 @@ def add_merit(request):
         if not request.current_family:
             log.warning("Add merit blocked: no current family user_id=%s", request.user.id)
             return redirect('switch_family')
-        if not _is_parent_in_current_family(request.user, request.current_family):
+        if not _is_parent_in_current_family(request):
             log.warning(
                 "Add merit blocked: not a parent user_id=%s family_id=%s",
                 request.user.id,
@@ -111,6 +236,7 @@ def add_merit(request):
                 ).first()
                 if child:
                     merit.child = child.user
+                    merit.family = request.current_family
                     merit.creator = request.user
                     merit.save()
                     log.info(
@@ -155,7 +281,7 @@ def add_demerit(request):
         if not request.current_family:
             log.warning("Add demerit blocked: no current family user_id=%s", request.user.id)
             return redirect('switch_family')
-        if not _is_parent_in_current_family(request.user, request.current_family):
+        if not _is_parent_in_current_family(request):
             log.warning(
                 "Add demerit blocked: not a parent user_id=%s family_id=%s",
                 request.user.id,
@@ -174,6 +300,7 @@ def add_demerit(request):
                 ).first()
                 if child:
                     demerit.child = child.user
+                    demerit.family = request.current_family
                     demerit.creator = request.user
                     demerit.save()
                     log.info(
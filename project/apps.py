@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class ProjectConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'project'
+
+    def ready(self):
+        from . import avatars, dashboard, membership_cache  # noqa: F401  (registers signal receivers)
@@ -0,0 +1,98 @@
+"""
+Profile picture avatars.
+
+Avatars are shown at 24-60 CSS pixels, so serving the uploaded picture
+wastes megabytes on a busy calendar. ``generate`` writes square,
+centre-cropped derivatives at each of ``AVATAR_SIZES`` beside the upload
+(``profile_pics/avatars/<upload stem>_<size>.<ext>``) and sets
+``CustomUser.avatars_generated``. ``url`` then picks the smallest derivative
+covering the requested size without touching storage or the database, and
+falls back to the original picture when no derivatives exist.
+
+Uploads are uuid-named, so derivative names are unique per upload and
+served as immutable.
+"""
+
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+from PIL import Image, ImageOps
+
+from . import images
+from .models import CustomUser
+
+log = logging.getLogger(__name__)
+
+
+def sizes():
+    return sorted(getattr(settings, 'AVATAR_SIZES', (32, 64, 128)))
+
+
+def _format():
+    return images.output_format(getattr(settings, 'AVATAR_IMAGE_FORMAT', 'auto'))
+
+
+def derivative_name(name, size, image_format=None):
+    """Return the storage name of the ``size`` px avatar for the upload ``name``."""
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    extension = images.EXTENSIONS[image_format or _format()]
+    return os.path.join(directory, 'avatars', f"{stem}_{size}.{extension}")
+
+
+def generate(user):
+    """
+    Write every avatar size for ``user.profile_pic`` and record the result.
+
+    Returns True when the derivatives were written; an unreadable picture
+    leaves the user on the original.
+    """
+    generated = False
+    if user.profile_pic:
+        storage = user.profile_pic.storage
+        image_format = _format()
+        quality = getattr(settings, 'AVATAR_IMAGE_QUALITY', 85)
+        try:
+            with user.profile_pic.open('rb') as file:
+                image, icc_profile = images.load(file, max(sizes()), image_format)
+            for size in sizes():
+                avatar = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+                name = derivative_name(user.profile_pic.name, size, image_format)
+                if storage.exists(name):
+                    storage.delete(name)
+                storage.save(name, ContentFile(images.encode(avatar, image_format, quality, icc_profile)))
+            generated = True
+        except (OSError, ValueError, Image.DecompressionBombError):
+            log.warning("Avatar generation failed user_id=%s name=%s", user.pk, user.profile_pic.name, exc_info=True)
+    user.avatars_generated = generated
+    # A real save, so cached dashboard widgets pick up the new avatar URLs.
+    user.save(update_fields=['avatars_generated'])
+    log.info("Avatars generated user_id=%s generated=%s", user.pk, generated)
+    return generated
+
+
+def url(user, size):
+    """Return the URL of the smallest avatar of at least ``size`` px, or of the original picture."""
+    if not user or not user.profile_pic:
+        return ''
+    if not user.avatars_generated:
+        return user.profile_pic.url
+    available = sizes()
+    chosen = next((candidate for candidate in available if candidate >= size), available[-1])
+    return user.profile_pic.storage.url(derivative_name(user.profile_pic.name, chosen))
+
+
+@receiver(pre_save, sender=CustomUser)
+def _picture_changed(sender, instance, raw=False, update_fields=None, **kwargs):
+    # A new picture has no derivatives until generate() runs for it.
+    if raw or not instance.avatars_generated or instance.pk is None:
+        return
+    if update_fields is not None and 'profile_pic' not in update_fields:
+        return
+    stored = CustomUser.objects.filter(pk=instance.pk).values_list('profile_pic', flat=True).first()
+    if stored != instance.profile_pic.name:
+        instance.avatars_generated = False
@@ -0,0 +1,42 @@
+"""
+Shared pieces for management commands that work on a subset of rows.
+
+``FamilyCommand`` adds the repeatable ``--family`` option and resolves it
+with ``selected_families``; ``filter_selected`` narrows any queryset to
+explicitly requested ids.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from project.models import Family
+
+
+def filter_selected(queryset, ids, noun):
+    """Narrow ``queryset`` to ``ids`` when any are given, raising CommandError if none match."""
+    if not ids:
+        return queryset
+    queryset = queryset.filter(id__in=ids)
+    if not queryset.exists():
+        raise CommandError(f"No matching {noun} found.")
+    return queryset
+
+
+class FamilyCommand(BaseCommand):
+    """A command that runs for every family or only those given with ``--family``."""
+
+    family_help = "Only process this family id (may be repeated)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--family",
+            type=int,
+            action="append",
+            dest="family_ids",
+            help=self.family_help,
+        )
+
+    def selected_families(self, options):
+        """Return the ``--family`` families ordered by id, or None when the option was not given."""
+        if not options["family_ids"]:
+            return None
+        return list(filter_selected(Family.objects.order_by("id"), options["family_ids"], "families"))
@@ -0,0 +1,361 @@
+"""
+Cached widgets for the landing page dashboard.
+
+Each widget is computed independently and cached under a key built from the
+family, the widget's current version and (for per-user widgets) the user.
+Model signals bump the version of every widget that reads the changed model
+once the write commits, so stale entries are never read again and simply
+expire. On a miss the widget falls back to its live queries.
+
+With ``DASHBOARD_PARALLEL`` enabled the widgets run concurrently on a shared,
+bounded thread pool; a widget that misses ``DASHBOARD_WIDGET_TIMEOUT`` is
+shown as its placeholder instead of holding up the page. Timed-out widgets
+that have not started yet are cancelled so they do not queue ahead of later
+requests; one that is already running cannot be interrupted and keeps its
+pool thread until it returns.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import close_old_connections, models, transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from _calendar.models import Event
+from cash import ledger
+from cash.models import CashDailyRollup, Expense, Fund, WalletTransaction
+from mail import counters
+from merits import scores
+from merits.models import Demerit, Merit
+from shoppinglist.models import Item
+from tasks.models import Task
+
+from .models import CustomUser, Family, Membership
+
+log = logging.getLogger(__name__)
+
+
+def _cache():
+    return caches[getattr(settings, 'DASHBOARD_CACHE_ALIAS', 'default')]
+
+
+def _timeout():
+    return getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 300)
+
+
+def _version_key(family_id, widget):
+    return f"dashboard:version:{family_id}:{widget}"
+
+
+def get_version(family_id, widget):
+    """Return the widget's current version for a family."""
+    cache = _cache()
+    key = _version_key(family_id, widget)
+    version = cache.get(key)
+    if version is None:
+        # Seed from the clock so an evicted version never reuses old keys.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump(family_ids, widgets):
+    """Invalidate ``widgets`` for each family by moving to a new version."""
+    cache = _cache()
+    for family_id in set(family_ids):
+        if family_id is None:
+            continue
+        for widget in widgets:
+            key = _version_key(family_id, widget)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, time.time_ns(), None)
+
+
+def _unread_mail(family, user):
+    return counters.get_unread_count(user, family)
+
+
+def _upcoming_events(family, user):
+    start = timezone.now()
+    return Event.get_occurrences_in_range(start, start + timedelta(days=7), family=family)
+
+
+def _cash_summary(family, user):
+    today = timezone.localdate()
+    month_totals = CashDailyRollup.objects.filter(
+        family=family,
+        day__gte=today.replace(day=1),
+        day__lte=today,
+    ).aggregate(funds=models.Sum('income'), expenses=models.Sum('expense'))
+    return {
+        'funds': month_totals['funds'] or 0,
+        'expenses': month_totals['expenses'] or 0,
+        # Available cash total (all time)
+        'available': ledger.get_family_cash(family),
+    }
+
+
+def _shopping_needs(family, user):
+    # The landing page shows the first five needs.
+    return list(Item.objects.filter(family=family, kind='need', obtained=False)[:5])
+
+
+def _wallet_balances(family, user_ids):
+    balances = dict.fromkeys(user_ids, 0)
+    rows = (
+        WalletTransaction.objects.filter(family=family, user_id__in=user_ids)
+        .values('user_id', 'direction')
+        .annotate(total=models.Sum('amount'))
+    )
+    for row in rows:
+        sign = 1 if row['direction'] == WalletTransaction.DIRECTION_IN else -1
+        balances[row['user_id']] += sign * row['total']
+    return balances
+
+
+def _my_wallet(family, user):
+    return _wallet_balances(family, [user.id])[user.id]
+
+
+def _merits_summary(family, user):
+    children = list(scores.child_scores(family).order_by('id'))
+    wallets = _wallet_balances(family, [child.user_id for child in children])
+    return [
+        {
+            'child': child.user,
+            'merit_points': child.merit_points,
+            'demerit_points': child.demerit_points,
+            'total': child.net_points,
+            'wallet_balance': wallets[child.user_id],
+        }
+        for child in children
+    ]
+
+
+def _tasks(family, user):
+    open_tasks = list(
+        Task.objects.filter(family=family, completed=False)
+        .select_related('created_by')
+        .order_by('due_date', '-created_at')[:3]
+    )
+    recent_completed_tasks = list(
+        Task.objects.filter(
+            family=family,
+            completed=True,
+            completed_at__gte=timezone.now() - timedelta(days=7),
+        )
+        .prefetch_related('completed_by')
+        .order_by('-completed_at')[:3]
+    )
+    return {'open': open_tasks, 'recent_completed': recent_completed_tasks}
+
+
+class Widget:
+    """A dashboard widget: how to compute it, how widely it is shared and what to show instead."""
+
+    def __init__(self, name, compute, placeholder, per_user=False, timeout=None):
+        self.name = name
+        self.compute = compute
+        self.placeholder = placeholder
+        self.per_user = per_user
+        self.timeout = timeout
+
+
+WIDGETS = {
+    widget.name: widget
+    for widget in (
+        Widget('unread_mail', _unread_mail, lambda: 0, per_user=True),
+        # Occurrences are relative to "now", so they are only reused briefly.
+        Widget('upcoming_events', _upcoming_events, list, timeout=60),
+        Widget('cash_summary', _cash_summary, lambda: {'funds': 0, 'expenses': 0, 'available': 0}),
+        Widget('shopping_needs', _shopping_needs, list),
+        Widget('my_wallet', _my_wallet, lambda: 0, per_user=True),
+        Widget('merits_summary', _merits_summary, list),
+        Widget('tasks', _tasks, lambda: {'open': [], 'recent_completed': []}),
+    )
+}
+
+
+def placeholders(names=None):
+    """Return the empty value of each widget, used without a family or on timeout."""
+    return {name: WIDGETS[name].placeholder() for name in (names or WIDGETS)}
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'DASHBOARD_MAX_WORKERS', 4),
+                thread_name_prefix='dashboard',
+            )
+        return _executor
+
+
+class DashboardService:
+    """Compute (or read from cache) the landing page widgets for one user and family."""
+
+    def __init__(self, family, user):
+        self.family = family
+        self.user = user
+        # Seconds spent per widget by the last build(), and widgets that timed out.
+        self.timings = {}
+        self.timed_out = []
+
+    def _key(self, widget):
+        version = get_version(self.family.id, widget.name)
+        # Include the local day so date-scoped widgets roll over at midnight.
+        parts = ['dashboard', widget.name, str(self.family.id), str(version), timezone.localdate().isoformat()]
+        if widget.per_user:
+            parts.append(f"user{self.user.id}")
+        return ':'.join(parts)
+
+    def get(self, name):
+        """Return one widget's value, computing and caching it on a miss."""
+        widget = WIDGETS[name]
+        cache = _cache()
+        key = self._key(widget)
+        value = cache.get(key)
+        if value is None:
+            value = widget.compute(self.family, self.user)
+            timeout = widget.timeout if widget.timeout is not None else _timeout()
+            cache.set(key, value, timeout)
+            log.debug("Dashboard widget miss widget=%s family_id=%s", name, self.family.id)
+        return value
+
+    def _timed_get(self, name):
+        started = time.perf_counter()
+        try:
+            return self.get(name)
+        finally:
+            self.timings[name] = time.perf_counter() - started
+
+    def _pooled_get(self, name):
+        # Pool threads hold their own connections; treat each widget like a
+        # request so connections past CONN_MAX_AGE (or broken) are closed.
+        close_old_connections()
+        try:
+            return self._timed_get(name)
+        finally:
+            close_old_connections()
+
+    def build(self, names=None):
+        """Return ``{name: value}`` for the requested (default: all) widgets."""
+        names = list(names or WIDGETS)
+        self.timings = {}
+        self.timed_out = []
+        if getattr(settings, 'DASHBOARD_PARALLEL', False):
+            return self._build_parallel(names)
+        return {name: self._timed_get(name) for name in names}
+
+    def _build_parallel(self, names):
+        executor = _get_executor()
+        futures = {name: executor.submit(self._pooled_get, name) for name in names}
+        deadline = time.monotonic() + getattr(settings, 'DASHBOARD_WIDGET_TIMEOUT', 2.0)
+        values = {}
+        for name, future in futures.items():
+            try:
+                values[name] = future.result(timeout=max(0, deadline - time.monotonic()))
+            except FutureTimeoutError:
+                # Only a widget still waiting for a pool thread can be cancelled;
+                # a running one occupies its thread until it finishes.
+                cancelled = future.cancel()
+                self.timed_out.append(name)
+                values[name] = WIDGETS[name].placeholder()
+                log.warning(
+                    "Dashboard widget timed out widget=%s family_id=%s cancelled=%s",
+                    name,
+                    self.family.id,
+                    cancelled,
+                )
+        return values
+
+    def server_timing(self):
+        """Format the last build's timings as a ``Server-Timing`` header value."""
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in sorted(self.timings.items())]
+        entries.extend(f'{name};desc="timeout"' for name in self.timed_out if name not in self.timings)
+        return ', '.join(entries)
+
+
+# Which widgets read each model.
+_MAIL_WIDGETS = ('unread_mail',)
+_WALLET_WIDGETS = ('my_wallet', 'merits_summary')
+_MERIT_WIDGETS = ('merits_summary',)
+_TASK_WIDGETS = ('tasks',)
+_USER_WIDGETS = ('merits_summary', 'tasks')
+# The user fields those widgets render (avatars_generated picks the avatar URL).
+_USER_DISPLAY_FIELDS = frozenset({'username', 'profile_pic', 'avatars_generated'})
+
+_FAMILY_MODEL_WIDGETS = {
+    Event: ('upcoming_events',),
+    Fund: ('cash_summary',),
+    Expense: ('cash_summary',),
+    Item: ('shopping_needs',),
+    WalletTransaction: _WALLET_WIDGETS,
+    Task: _TASK_WIDGETS,
+    Membership: _MERIT_WIDGETS,
+    Merit: _MERIT_WIDGETS,
+    Demerit: _MERIT_WIDGETS,
+}
+
+
+def _user_family_ids(user_id):
+    return list(Membership.objects.filter(user_id=user_id).values_list('family_id', flat=True))
+
+
+def _bump_on_commit(family_ids, widgets):
+    # Bumping inside the writer's open transaction would let a concurrent
+    # request cache pre-commit data under the new version; wait for the commit.
+    transaction.on_commit(lambda: bump(family_ids, widgets))
+
+
+def _family_scoped_changed(sender, instance, **kwargs):
+    _bump_on_commit([instance.family_id], _FAMILY_MODEL_WIDGETS[sender])
+
+
+@receiver(counters.unread_changed)
+def _unread_changed(sender, family_id, **kwargs):
+    _bump_on_commit([family_id], _MAIL_WIDGETS)
+
+
+@receiver(m2m_changed, sender=Task.completed_by.through)
+def _completed_by_changed(sender, instance, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear') and isinstance(instance, Task):
+        _bump_on_commit([instance.family_id], _TASK_WIDGETS)
+
+
+@receiver(post_save, sender=Family)
+def _family_created(sender, instance, created, **kwargs):
+    # Primary keys can be reused after a rollback, so never trust versions
+    # that predate the family row.
+    if created:
+        _bump_on_commit([instance.id], WIDGETS)
+
+
+@receiver(post_save, sender=CustomUser)
+def _user_changed(sender, instance, created, update_fields=None, **kwargs):
+    # Cached widgets embed usernames and profile pictures; saves of other
+    # fields only (e.g. last_login on every login) leave them valid.
+    if created or (update_fields is not None and not _USER_DISPLAY_FIELDS & set(update_fields)):
+        return
+    _bump_on_commit(_user_family_ids(instance.id), _USER_WIDGETS)
+
+
+for _model in _FAMILY_MODEL_WIDGETS:
+    _label = _model._meta.label_lower
+    post_save.connect(_family_scoped_changed, sender=_model, dispatch_uid=f'dashboard-saved-{_label}')
+    post_delete.connect(_family_scoped_changed, sender=_model, dispatch_uid=f'dashboard-deleted-{_label}')
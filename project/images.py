@@ -0,0 +1,62 @@
+"""
+Shared Pillow helpers for processing uploaded images.
+
+``load`` opens an upload, lets the JPEG decoder downscale while decoding,
+applies the EXIF orientation and drops all metadata except the colour
+profile. ``encode`` writes WebP or JPEG; ``output_format`` resolves a
+configured ``'auto'`` to WebP when this Pillow build supports it.
+"""
+
+import io
+
+from PIL import Image, ImageOps, features
+
+EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+
+
+def output_format(configured='auto'):
+    """Return ``'WEBP'`` or ``'JPEG'`` for a configured format name."""
+    configured = configured.upper()
+    if configured == 'AUTO':
+        return 'WEBP' if features.check('webp') else 'JPEG'
+    return configured
+
+
+def _flatten(image, image_format):
+    # JPEG has no alpha channel, so transparent images go onto white there.
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        if image_format == 'WEBP':
+            return image
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def load(file, limit, image_format):
+    """
+    Return ``(image, icc_profile)`` for ``file``, oriented and ready to encode.
+
+    ``limit`` is the largest side the caller will need; JPEGs are decoded at
+    the smallest power-of-two scale that still covers it. The image carries
+    no EXIF or XMP, so encoding it never writes them.
+    """
+    with Image.open(file) as source:
+        icc_profile = source.info.get('icc_profile')
+        source.draft('RGB', (limit, limit))
+        image = _flatten(ImageOps.exif_transpose(source), image_format)
+    image.info = {}
+    return image, icc_profile
+
+
+def encode(image, image_format, quality, icc_profile=None):
+    """Return ``image`` encoded as ``image_format`` bytes."""
+    options = {'quality': quality}
+    if image_format == 'JPEG':
+        options.update(optimize=True, progressive=True)
+    if icc_profile:
+        options['icc_profile'] = icc_profile
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
@@ -0,0 +1,44 @@
+"""
+Management command to generate avatar derivatives for profile pictures.
+
+Pictures uploaded on the profile page get their avatars straight away; this
+backfills pictures uploaded before avatars existed or through the admin.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+
+from project import avatars
+from project.commands import filter_selected
+
+
+class Command(BaseCommand):
+    help = "Generate the small avatar sizes for users' profile pictures"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            dest="user_ids",
+            help="Only generate for this user id (may be repeated)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate avatars that already exist (e.g. after changing AVATAR_SIZES)",
+        )
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.exclude(profile_pic="").exclude(profile_pic__isnull=True).order_by("id")
+        users = filter_selected(users, options["user_ids"], "users with profile pictures")
+        if not options["force"]:
+            users = users.filter(avatars_generated=False)
+
+        total = generated = 0
+        for user in users.iterator():
+            total += 1
+            generated += avatars.generate(user)
+        if total - generated:
+            self.stdout.write(self.style.WARNING(f"{total - generated} picture(s) could not be read; see the log."))
+        self.stdout.write(self.style.SUCCESS(f"Generated avatars for {generated} of {total} user(s)."))
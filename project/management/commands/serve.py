@@ -2,18 +2,61 @@
 Management command to serve Django with Cheroot (CherryPy's production-grade WSGI server).
 
 Supports TLS and configurable threading. Suitable for production use.
+
+With ``--workers N`` (N > 1) a supervisor binds the socket once and forks N
+worker processes, each running its own Cheroot server on the shared socket
+(see ``project.prefork``). Send the supervisor SIGHUP for a rolling restart
+and SIGTERM (or CONTROL-C) to stop.
 """
 
 import logging
 import os
+import signal
 import sys
 
 from cheroot.wsgi import Server as WSGIServer
-from django.core.management.base import BaseCommand
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
 from django.core.wsgi import get_wsgi_application
 
+from project import prefork, server_stats
+
 logger = logging.getLogger(__name__)
 
+LOCMEM_BACKEND = "django.core.cache.backends.locmem.LocMemCache"
+
+
+class SharedSocketServer(WSGIServer):
+    """Cheroot server that serves a listening socket bound by the supervisor."""
+
+    def __init__(self, listener, *args, **kwargs):
+        self.listener = listener
+        super().__init__(*args, **kwargs)
+
+    def bind(self, family, type, proto=0):
+        self.socket = self.listener
+        self.bind_addr = self.resolve_real_bind_addr(self.socket)
+        return self.socket
+
+    def prepare(self):
+        super().prepare()
+        # Every worker is woken for each new connection; the ones that lose
+        # the race must get EAGAIN straight back instead of blocking in
+        # accept() for cheroot's one second socket timeout.
+        self.socket.setblocking(False)
+
+    def stop(self):
+        # Other workers keep accepting on the shared socket, so skip cheroot's
+        # self-connect wakeup and only close this process's copy.
+        listener, self.socket = self.socket, None
+        super().stop()
+        if listener is not None:
+            listener.close()
+
+
+def _graceful_exit(signum, frame):
+    raise SystemExit(0)
+
 
 class Command(BaseCommand):
     help = "Serve Django application using Cheroot (CherryPy WSGI server)"
@@ -37,6 +80,60 @@ class Command(BaseCommand):
             default=int(os.getenv("SERVER_NUMTHREADS", "10")),
             help="Number of threads for handling requests (default: SERVER_NUMTHREADS env var or 10)",
         )
+        parser.add_argument(
+            "--max-threads",
+            type=int,
+            default=int(os.getenv("SERVER_MAX_THREADS", "-1")),
+            help="Let the thread pool grow up to this many threads under load; -1 for no limit (default: SERVER_MAX_THREADS env var or -1)",
+        )
+        parser.add_argument(
+            "--request-queue-size",
+            type=int,
+            default=int(os.getenv("SERVER_REQUEST_QUEUE_SIZE", "5")),
+            help="Listen backlog of connections waiting to be accepted (default: SERVER_REQUEST_QUEUE_SIZE env var or 5)",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=float(os.getenv("SERVER_TIMEOUT", "10")),
+            help="Socket timeout in seconds; also how long an idle keep-alive connection is held (default: SERVER_TIMEOUT env var or 10)",
+        )
+        parser.add_argument(
+            "--shutdown-timeout",
+            type=float,
+            default=float(os.getenv("SERVER_SHUTDOWN_TIMEOUT", "5")),
+            help="Seconds to wait for request threads on shutdown (default: SERVER_SHUTDOWN_TIMEOUT env var or 5)",
+        )
+        parser.add_argument(
+            "--keep-alive-limit",
+            type=int,
+            default=int(os.getenv("SERVER_KEEP_ALIVE_LIMIT", "10")),
+            help="Maximum idle keep-alive connections held open; 0 disables keep-alive, -1 for no limit (default: SERVER_KEEP_ALIVE_LIMIT env var or 10)",
+        )
+        parser.add_argument(
+            "--stats",
+            action="store_true",
+            default=os.getenv("SERVER_STATS", "").lower() in ("1", "true", "yes"),
+            help="Collect connection statistics (served at /stats/server/ to staff; default: SERVER_STATS env var)",
+        )
+        parser.add_argument(
+            "--stats-interval",
+            type=float,
+            default=float(os.getenv("SERVER_STATS_INTERVAL", "60")),
+            help="With --stats, log a stats line every N seconds; 0 to only serve them (default: SERVER_STATS_INTERVAL env var or 60)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=int(os.getenv("SERVER_WORKERS", "1")),
+            help="Number of worker processes; more than 1 enables pre-fork mode (default: SERVER_WORKERS env var or 1)",
+        )
+        parser.add_argument(
+            "--graceful-timeout",
+            type=float,
+            default=float(os.getenv("SERVER_GRACEFUL_TIMEOUT", "30")),
+            help="Seconds a stopping worker may spend finishing requests before it is killed (default: SERVER_GRACEFUL_TIMEOUT env var or 30)",
+        )
         parser.add_argument(
             "--tls-cert",
             default=os.getenv("SERVER_TLS_CERT"),
@@ -56,11 +153,22 @@ class Command(BaseCommand):
         tls_cert = options["tls_cert"]
         tls_key = options["tls_key"]
 
-        # Get the WSGI application
-        application = get_wsgi_application()
+        workers = options["workers"]
+        if workers < 1:
+            raise CommandError("--workers must be at least 1.")
+        if workers > 1 and not hasattr(os, "fork"):
+            raise CommandError("--workers requires a platform with fork().")
+        if workers > 1:
+            self._check_shared_caches()
 
         # Build server kwargs
-        server_kwargs = {"numthreads": numthreads}
+        server_kwargs = {
+            "numthreads": numthreads,
+            "max": options["max_threads"],
+            "request_queue_size": options["request_queue_size"],
+            "timeout": options["timeout"],
+            "shutdown_timeout": options["shutdown_timeout"],
+        }
 
         # Enable TLS only if both cert and key are provided
         if tls_cert and tls_key:
@@ -79,8 +187,16 @@ class Command(BaseCommand):
                     )
                 )
 
+        if workers > 1:
+            self._serve_workers(host, port, protocol, server_kwargs, options)
+            return
+
+        # Get the WSGI application
+        application = get_wsgi_application()
+
         # Create and configure server
         server = WSGIServer((host, port), application, **server_kwargs)
+        stats_logger = self._configure(server, options)
 
         logger.info(f"Starting Cheroot WSGI server on {protocol}://{host}:{port}/")
         logger.info(f"Using {numthreads} threads")
@@ -94,10 +210,90 @@ class Command(BaseCommand):
         self.stdout.write("Quit the server with CONTROL-C.")
 
         try:
+            if stats_logger:
+                stats_logger.start()
             server.start()
         except KeyboardInterrupt:
             logger.info("Shutting down server...")
             self.stdout.write(self.style.SUCCESS("\nShutting down server..."))
             server.stop()
             sys.exit(0)
+        finally:
+            if stats_logger:
+                stats_logger.stop()
+
+    def _check_shared_caches(self):
+        """Refuse pre-fork mode when the cross-request caches live in each worker's memory."""
+        aliases = {
+            getattr(settings, "MEMBERSHIP_CACHE_ALIAS", "default"): "MEMBERSHIP_CACHE_URL",
+            getattr(settings, "DASHBOARD_CACHE_ALIAS", "default"): "DASHBOARD_CACHE_URL",
+        }
+        # Version bumps only reach the worker that handled the write, so the
+        # others would keep serving stale memberships and dashboard widgets.
+        local = [
+            f"'{alias}' ({env_var})"
+            for alias, env_var in aliases.items()
+            if settings.CACHES.get(alias, {}).get("BACKEND") == LOCMEM_BACKEND
+        ]
+        if local:
+            raise CommandError(
+                f"--workers needs caches shared between processes, but {', '.join(local)} "
+                "use the per-process LocMemCache. Point them at a shared backend such as "
+                "filecache:///var/tmp/familyman or dbcache://familyman_cache."
+            )
+
+    def _configure(self, server, options):
+        """Apply settings that are attributes rather than constructor arguments; return the stats logger, if any."""
+        keep_alive_limit = options["keep_alive_limit"]
+        server.keep_alive_conn_limit = None if keep_alive_limit < 0 else keep_alive_limit
+        if not options["stats"]:
+            return None
+        server_stats.enable(server)
+        if options["stats_interval"] > 0:
+            return server_stats.StatsLogger(server, options["stats_interval"])
+        return None
+
+    def _serve_workers(self, host, port, protocol, server_kwargs, options):
+        """Bind once and supervise ``--workers`` forked Cheroot servers."""
+        workers = options["workers"]
+        try:
+            listener = prefork.bind_socket(host, port, server_kwargs.get("request_queue_size", 5))
+        except OSError as exc:
+            raise CommandError(f"Could not bind {host}:{port}: {exc}")
 
+        def run_worker(listener, notify_ready):
+            # Each worker loads the application after the fork, so nothing
+            # the supervisor opened (e.g. database connections) is shared.
+            application = get_wsgi_application()
+            server = SharedSocketServer(listener, (host, port), application, **server_kwargs)
+            stats_logger = self._configure(server, options)
+            signal.signal(signal.SIGTERM, _graceful_exit)
+            try:
+                server.prepare()
+                if stats_logger:
+                    stats_logger.start()
+                notify_ready()
+                server.serve()
+            except SystemExit:
+                pass
+            finally:
+                if stats_logger:
+                    stats_logger.stop()
+                # Finish in-flight requests (up to shutdown_timeout) before exiting.
+                server.stop()
+            return 0
+
+        supervisor = prefork.Supervisor(listener, workers, run_worker, graceful_timeout=options["graceful_timeout"])
+        logger.info(f"Starting {workers} Cheroot workers on {protocol}://{host}:{port}/ (supervisor pid {os.getpid()})")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Starting {workers} Cheroot workers on {protocol}://{host}:{port}/"
+            )
+        )
+        self.stdout.write(f"Threads per worker: {server_kwargs['numthreads']}")
+        self.stdout.write(f"Supervisor pid {os.getpid()}: SIGHUP for a rolling restart, CONTROL-C to quit.")
+        try:
+            supervisor.run()
+        finally:
+            listener.close()
+        self.stdout.write(self.style.SUCCESS("All workers stopped."))
@@ -0,0 +1,182 @@
+"""
+Serving uploaded media.
+
+``media_response`` answers a GET/HEAD for a file under ``MEDIA_ROOT`` with:
+
+* strong validators: an ``ETag`` built from the file's mtime and size, plus
+  ``Last-Modified``, so revalidations answer ``304 Not Modified`` (or
+  ``412`` for failed ``If-Match``/``If-Unmodified-Since``);
+* single byte ranges (``Range: bytes=...``), honouring ``If-Range``, with
+  ``206``/``416`` responses;
+* ``Cache-Control``: uuid-named uploads never change, so they are cached
+  for a year as ``immutable`` (``public`` for avatars, ``private`` for
+  receipts, which shared caches must not keep); everything else must
+  revalidate, which is a cheap 304;
+* streaming in ``MEDIA_BLOCK_SIZE`` chunks through a ``FileResponse``. Servers
+  that offer ``wsgi.file_wrapper`` (gunicorn, uWSGI, mod_wsgi) receive the
+  open file and can ``sendfile`` it; full-file responses keep their
+  ``fileno`` for that, range responses are bounded in Python.
+"""
+
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+
+MEDIA_BLOCK_SIZE = 64 * 1024
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+# Uploads named with a random token: a new upload always gets a new URL.
+IMMUTABLE_PATHS = (
+    re.compile(r'^profile_pics/user_\d+_[0-9a-f]{8}\.\w+$'),
+    re.compile(r'^profile_pics/avatars/user_\d+_[0-9a-f]{8}_\d+\.(webp|jpg)$'),
+)
+# Immutable too, but parents-only financial documents: browser cache only.
+PRIVATE_IMMUTABLE_PATHS = (
+    re.compile(r'^receipts/[0-9a-f]{32}(_thumb)?\.(webp|jpg)$'),
+)
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class _BoundedFile:
+    """Read at most ``length`` bytes of ``file`` from its current position."""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def resolve(path):
+    """Return ``(absolute_path, stat_result)`` for a regular file under MEDIA_ROOT or raise Http404."""
+    try:
+        file_path = safe_join(settings.MEDIA_ROOT, path)
+        st = os.stat(file_path)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404("Media file not found")
+    if not stat.S_ISREG(st.st_mode):
+        raise Http404("Media file not found")
+    return file_path, st
+
+
+def etag_for(st):
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def cache_control_for(path):
+    if any(pattern.match(path) for pattern in IMMUTABLE_PATHS):
+        return f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    if any(pattern.match(path) for pattern in PRIVATE_IMMUTABLE_PATHS):
+        return f"private, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    return "no-cache"
+
+
+def parse_range(header, size):
+    """
+    Parse a single-range ``Range`` header against a file of ``size`` bytes.
+
+    Returns ``(start, end)`` inclusive, ``None`` when the header should be
+    ignored (absent, malformed or multi-range: the full file is sent), or
+    ``False`` when the range cannot be satisfied.
+    """
+    match = _RANGE_RE.match(header.replace(' ', '')) if header else None
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            return False
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    end = size - 1 if last == '' else int(last)
+    if start >= size:
+        return False
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+def _if_range_passes(request, etag, last_modified):
+    value = request.META.get('HTTP_IF_RANGE')
+    if not value:
+        return True
+    if value.startswith(('"', 'W/')):
+        return value == etag
+    return parse_http_date_safe(value) == last_modified
+
+
+def _with_headers(response, headers):
+    for header, value in headers.items():
+        response.headers[header] = value
+    return response
+
+
+def media_response(request, path):
+    """Build the response for ``path`` (relative to MEDIA_ROOT)."""
+    file_path, st = resolve(path)
+    size = st.st_size
+    etag = etag_for(st)
+    last_modified = int(st.st_mtime)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(last_modified),
+        'Cache-Control': cache_control_for(path),
+        'Accept-Ranges': 'bytes',
+        'X-Content-Type-Options': 'nosniff',
+    }
+
+    conditional = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if conditional is not None:
+        return _with_headers(conditional, headers)
+
+    byte_range = None
+    if _if_range_passes(request, etag, last_modified):
+        byte_range = parse_range(request.META.get('HTTP_RANGE', ''), size)
+    if byte_range is False:
+        response = _with_headers(HttpResponse(status=416), headers)
+        response.headers['Content-Range'] = f"bytes */{size}"
+        return response
+
+    content_type, encoding = mimetypes.guess_type(file_path)
+    if encoding:
+        # Serve e.g. .gz files as themselves, not as transparently compressed content.
+        content_type = 'application/octet-stream'
+    content_type = content_type or 'application/octet-stream'
+
+    if request.method == 'HEAD':
+        response = HttpResponse(content_type=content_type)
+    else:
+        file = open(file_path, 'rb')
+        if byte_range:
+            file.seek(byte_range[0])
+            file = _BoundedFile(file, byte_range[1] - byte_range[0] + 1)
+        response = FileResponse(file, content_type=content_type)
+        response.block_size = MEDIA_BLOCK_SIZE
+    _with_headers(response, headers)
+    if byte_range:
+        start, end = byte_range
+        response.status_code = 206
+        response.headers['Content-Range'] = f"bytes {start}-{end}/{size}"
+        response.headers['Content-Length'] = str(end - start + 1)
+    else:
+        response.headers['Content-Length'] = str(size)
+    return response
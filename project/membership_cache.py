@@ -0,0 +1,118 @@
+"""
+Shared cache for membership lookups.
+
+Memberships are cached per user (with their families selected) in the cache
+alias named by ``MEMBERSHIP_CACHE_ALIAS``. The backend is configured through
+Django's ``CACHES`` setting, so a single process can use local memory while
+multi-process deployments point it at a file or database backed cache.
+Entries are invalidated by model signals whenever a membership or family
+changes.
+"""
+
+import os
+import threading
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import CustomUser, Family, Membership
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+
+def _cache():
+    return caches[getattr(settings, 'MEMBERSHIP_CACHE_ALIAS', 'default')]
+
+
+def _key(user_id):
+    return f"membership:user:{user_id}"
+
+
+def _count(name, amount=1):
+    with _stats_lock:
+        _stats[name] += amount
+
+
+def get_user_memberships(user_id):
+    """Return the user's memberships with ``family`` already loaded."""
+    cache = _cache()
+    memberships = cache.get(_key(user_id))
+    if memberships is not None:
+        _count('hits')
+        return memberships
+    _count('misses')
+    memberships = list(
+        Membership.objects.filter(user_id=user_id).select_related('family').order_by('id')
+    )
+    cache.set(_key(user_id), memberships, getattr(settings, 'MEMBERSHIP_CACHE_TIMEOUT', 300))
+    return memberships
+
+
+def get_membership(user_id, family_id):
+    """Return the user's membership in a family, or None."""
+    for membership in get_user_memberships(user_id):
+        if str(membership.family_id) == str(family_id):
+            return membership
+    return None
+
+
+def invalidate_users(user_ids):
+    """Drop cached memberships for the given users."""
+    keys = [_key(user_id) for user_id in set(user_ids)]
+    if keys:
+        _cache().delete_many(keys)
+        _count('invalidations', len(keys))
+
+
+def get_stats():
+    """Return hit/miss counters for this process."""
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else 0.0
+    stats['backend'] = type(_cache()).__name__
+    stats['pid'] = os.getpid()
+    return stats
+
+
+def reset_stats():
+    with _stats_lock:
+        for name in _stats:
+            _stats[name] = 0
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+def _membership_changed(sender, instance, **kwargs):
+    invalidate_users([instance.user_id])
+
+
+@receiver(m2m_changed, sender=Membership)
+def _memberships_bulk_changed(sender, instance, action, pk_set, **kwargs):
+    # ``family.members.add()`` and friends bypass post_save on the through model.
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if isinstance(instance, Family):
+        if pk_set is None:
+            pk_set = Membership.objects.filter(family=instance).values_list('user_id', flat=True)
+        invalidate_users(pk_set)
+    else:
+        invalidate_users([instance.pk])
+
+
+@receiver(post_save, sender=Family)
+def _family_changed(sender, instance, **kwargs):
+    # Deleting a family cascades to its memberships, whose own signals
+    # invalidate the affected users.
+    invalidate_users(Membership.objects.filter(family=instance).values_list('user_id', flat=True))
+
+
+@receiver(post_save, sender=CustomUser)
+def _user_created(sender, instance, created, **kwargs):
+    # Primary keys can be reused after a rollback, so never trust an entry
+    # that predates the user row.
+    if created:
+        invalidate_users([instance.id])
@@ -1,33 +1,36 @@
-from .models import Family
-from .models import Membership
+from . import membership_cache
 
 class FamilyContextMiddleware:
+    """
+    Resolve the current family and the user's membership in it once per request.
+
+    Memberships come from the shared membership cache (falling back to a single
+    joined query on a miss) and the selected one is exposed as
+    ``request.current_membership`` so views can check roles without querying
+    ``Membership`` again.
+    """
     def __init__(self, get_response):
         self.get_response = get_response
 
     def __call__(self, request):
+        request.current_family = None
         request.current_family_role = None
+        request.current_membership = None
         if request.user.is_authenticated:
             family_id = request.session.get('current_family_id')
-            if not family_id:
-                families = request.user.families.all()
-                if families.count() == 1:
-                    family_id = families.first().id
-                    request.session['current_family_id'] = family_id
-
             if family_id:
-                request.current_family = request.user.families.filter(id=family_id).first()
-                if not request.current_family:
+                membership = membership_cache.get_membership(request.user.id, family_id)
+                if not membership:
                     request.session.pop('current_family_id', None)
-                else:
-                    membership = Membership.objects.filter(
-                        user=request.user,
-                        family=request.current_family,
-                    ).first()
-                    if membership:
-                        request.current_family_role = membership.role
             else:
-                request.current_family = None
-        else:
-            request.current_family = None
-        return self.get_response(request)
\ No newline at end of file
+                # Only auto-select when the user belongs to exactly one family.
+                memberships = membership_cache.get_user_memberships(request.user.id)
+                membership = memberships[0] if len(memberships) == 1 else None
+                if membership:
+                    request.session['current_family_id'] = membership.family_id
+
+            if membership:
+                request.current_membership = membership
+                request.current_family = membership.family
+                request.current_family_role = membership.role
+        return self.get_response(request)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0005_alter_customuser_profile_pic'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='avatars_generated',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+    ]
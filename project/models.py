@@ -18,6 +18,8 @@ class CustomUser(AbstractUser):
     child = models.BooleanField(default=True)
     bio = models.TextField(blank=True, null=True, help_text="Tell us about yourself")
     profile_pic = models.ImageField(upload_to=user_profile_pic_path, blank=True, null=True)
+    # Set by project.avatars once the small avatar sizes exist for profile_pic.
+    avatars_generated = models.BooleanField(default=False, editable=False)
 
 CustomUser.add_to_class('families', models.ManyToManyField('Family', through='Membership', related_name='members'))
 
@@ -0,0 +1,173 @@
+"""
+Keyset (cursor) pagination.
+
+``Paginator`` pages with ``OFFSET``, so the database reads and discards every
+row before the requested page and page N costs N times page 1. A keyset page
+instead continues from the last row shown: ordered on ``(timestamp, id)``,
+the next page is ``WHERE ts <= last_ts AND (ts < last_ts OR (ts = last_ts AND
+id < last_id)) ORDER BY ts, id LIMIT n``. The leading ``ts <= last_ts`` bound
+lets an index on the ordering seek straight to the boundary row, so a deep
+page reads about as many rows as the first instead of scanning every newer
+row.
+
+Cursors are opaque URL-safe strings encoding the direction and the boundary
+row's key. A malformed cursor falls back to the first page.
+
+Compound (``union()``) querysets cannot be filtered, so their boundary
+condition is added to each combined query instead.
+"""
+
+import base64
+import binascii
+import json
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+
+
+class KeysetPage:
+    """One page of rows plus the cursors for its neighbours."""
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginate ``queryset`` on ``ordering``, e.g. ``('-sent_at', '-id')``.
+
+    Every ordering field must sort the same way, must not be null, and the
+    last one must be unique (normally ``id``) so that each row has a distinct
+    key. Fields may be annotations, ``values()`` querysets page as dicts, and
+    ``union()`` querysets are bounded in each of their parts.
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        directions = {name.startswith('-') for name in ordering}
+        if len(directions) != 1:
+            raise ValueError("Keyset ordering fields must all sort in the same direction.")
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        self.descending = directions.pop()
+        self.fields = [name.lstrip('-') for name in self.ordering]
+        self._model_fields = [self._resolve(name) for name in self.fields]
+
+    def _resolve(self, path):
+        annotation = self.queryset.query.annotations.get(path)
+        if annotation is not None:
+            return annotation.output_field
+        model = self.queryset.model
+        parts = path.split('__')
+        for part in parts[:-1]:
+            model = model._meta.get_field(part).related_model
+        try:
+            return model._meta.get_field(parts[-1])
+        except FieldDoesNotExist:
+            raise ValueError(f"Unknown keyset ordering field {path!r}.")
+
+    def _key(self, obj):
+        if isinstance(obj, dict):
+            return [obj[name] for name in self.fields]
+        values = []
+        for name in self.fields:
+            value = obj
+            for part in name.split('__'):
+                value = getattr(value, part)
+            values.append(value)
+        return values
+
+    def encode_cursor(self, backwards, key):
+        """Return an opaque cursor for the rows after (or before) ``key``."""
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value for value in key]
+        payload = [int(backwards), values]
+        return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Return ``(backwards, key)`` for ``cursor``, or None if it is malformed."""
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            backwards, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            if len(values) != len(self._model_fields):
+                return None
+            key = [field.to_python(value) for field, value in zip(self._model_fields, values)]
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            return None
+        return bool(backwards), key
+
+    def _after(self, key, forwards):
+        # Rows strictly past ``key`` in the requested direction, built as
+        # a <= x AND ((a < x) OR (a = x AND b < y) OR ...). The OR alone is
+        # not sargable; the leading bound is what the index seeks on.
+        lookup = 'lt' if self.descending == forwards else 'gt'
+        condition = Q()
+        for index, name in enumerate(self.fields):
+            clause = Q(**{f"{name}__{lookup}": key[index]})
+            for previous, value in zip(self.fields[:index], key[:index]):
+                clause &= Q(**{previous: value})
+            condition |= clause
+        if len(self.fields) > 1:
+            condition = Q(**{f"{self.fields[0]}__{lookup}e": key[0]}) & condition
+        return condition
+
+    def _filter(self, queryset, condition):
+        if not queryset.query.combinator:
+            return queryset.filter(condition)
+        queryset = queryset.all()
+        parts = []
+        for part in queryset.query.combined_queries:
+            part = part.chain()
+            part.add_q(condition)
+            parts.append(part)
+        queryset.query.combined_queries = tuple(parts)
+        return queryset
+
+    def get_page(self, cursor=None):
+        """Return the page after (or, for a backwards cursor, before) ``cursor``."""
+        decoded = self.decode_cursor(cursor) if cursor else None
+        backwards, key = decoded if decoded else (False, None)
+        queryset = self.queryset
+        ordering = self.ordering
+        if backwards:
+            ordering = tuple(name[1:] if name.startswith('-') else f"-{name}" for name in ordering)
+        if key is not None:
+            queryset = self._filter(queryset, self._after(key, forwards=not backwards))
+        rows = list(queryset.order_by(*ordering)[:self.per_page + 1])
+        more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            if not more:
+                # Paged back to the start: show a full first page instead.
+                return self.get_page()
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if more or backwards:
+                next_cursor = self.encode_cursor(False, self._key(rows[-1]))
+            if key is not None:
+                previous_cursor = self.encode_cursor(True, self._key(rows[0]))
+        return KeysetPage(rows, next_cursor, previous_cursor)
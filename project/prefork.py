@@ -0,0 +1,255 @@
+"""
+Pre-fork process supervisor for the ``serve`` command.
+
+The supervisor binds the listening socket once, then forks ``workers`` child
+processes that each run their own server on the inherited socket, so Python
+view work spreads across cores instead of sharing one GIL. The kernel hands
+each new connection to whichever worker accepts it first.
+
+Signals handled by the supervisor:
+
+* ``SIGTERM``/``SIGINT``: stop every worker gracefully (``SIGTERM``, then
+  ``SIGKILL`` after ``graceful_timeout``) and exit.
+* ``SIGHUP``: rolling restart. Each worker is replaced in turn: a new worker
+  is started and must report ready before the old one is stopped, so the
+  socket is never left without an accepting process.
+* A worker that exits unexpectedly is restarted; one that dies within
+  ``MIN_WORKER_LIFETIME`` seconds of starting is restarted after a backoff,
+  so a broken deploy does not fork in a tight loop.
+
+Workers receive ``SIGTERM`` to stop and ignore ``SIGINT``/``SIGHUP``, which
+belong to the supervisor.
+"""
+
+import logging
+import os
+import select
+import signal
+import socket
+import time
+
+logger = logging.getLogger(__name__)
+
+MIN_WORKER_LIFETIME = 1.0
+MAX_RESTART_BACKOFF = 30.0
+READY_TIMEOUT = 30.0
+
+
+def bind_socket(host, port, backlog):
+    """Create the shared listening socket for ``host``/``port``."""
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    listener = socket.socket(family, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind((host, port))
+    listener.listen(backlog)
+    listener.set_inheritable(True)
+    return listener
+
+
+class Worker:
+    """Bookkeeping for one forked worker process."""
+
+    def __init__(self, slot, pid, ready_fd):
+        self.slot = slot
+        self.pid = pid
+        self.ready_fd = ready_fd
+        self.started = time.monotonic()
+        self.ready = False
+        self.retiring = False
+
+
+class Supervisor:
+    """
+    Fork and supervise ``workers`` processes serving ``listener``.
+
+    ``run_worker(listener, notify_ready)`` runs in each child; it must call
+    ``notify_ready()`` once it is accepting connections, stop gracefully on
+    ``SIGTERM`` and return the process exit code.
+    """
+
+    def __init__(self, listener, workers, run_worker, graceful_timeout=30.0):
+        self.listener = listener
+        self.workers = workers
+        self.run_worker = run_worker
+        self.graceful_timeout = graceful_timeout
+        self.children = {}
+        self.crashes = {}
+        self.respawn_at = {}
+        self.stopping = False
+        self.reload_requested = False
+        self._wakeup_r = self._wakeup_w = None
+
+    # Supervisor side ------------------------------------------------------
+
+    def run(self):
+        """Supervise until asked to stop; returns once every worker has exited."""
+        self._wakeup_r, self._wakeup_w = os.pipe()
+        os.set_blocking(self._wakeup_r, False)
+        os.set_blocking(self._wakeup_w, False)
+        previous = {
+            signum: signal.signal(signum, self._on_signal)
+            for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGCHLD)
+        }
+        try:
+            for slot in range(self.workers):
+                self.spawn(slot)
+            while not self.stopping:
+                self._wait(1.0)
+                self.reap()
+                if self.reload_requested:
+                    self.reload_requested = False
+                    self.rolling_restart()
+                self._respawn_due()
+            self.stop_all()
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+            os.close(self._wakeup_r)
+            os.close(self._wakeup_w)
+
+    def _on_signal(self, signum, frame):
+        if signum in (signal.SIGTERM, signal.SIGINT):
+            self.stopping = True
+        elif signum == signal.SIGHUP:
+            self.reload_requested = True
+        try:
+            os.write(self._wakeup_w, b'.')
+        except OSError:
+            pass
+
+    def _wait(self, timeout):
+        try:
+            readable, _, _ = select.select([self._wakeup_r], [], [], timeout)
+        except InterruptedError:
+            return
+        if readable:
+            try:
+                while os.read(self._wakeup_r, 512):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def spawn(self, slot):
+        """Fork a worker for ``slot`` and return its bookkeeping record."""
+        ready_r, ready_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(ready_r)
+            os._exit(self._child(slot, ready_w))
+        os.close(ready_w)
+        worker = Worker(slot, pid, ready_r)
+        self.children[pid] = worker
+        self.respawn_at.pop(slot, None)
+        logger.info(f"Started worker {slot} (pid {pid})")
+        return worker
+
+    def reap(self):
+        """Collect exited workers and schedule restarts for unexpected exits."""
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            worker = self.children.pop(pid, None)
+            if worker is None:
+                continue
+            os.close(worker.ready_fd)
+            code = os.waitstatus_to_exitcode(status)
+            if self.stopping or worker.retiring:
+                logger.info(f"Worker {worker.slot} (pid {pid}) exited with {code}")
+                continue
+            lifetime = time.monotonic() - worker.started
+            if lifetime < MIN_WORKER_LIFETIME:
+                self.crashes[worker.slot] = self.crashes.get(worker.slot, 0) + 1
+            else:
+                self.crashes[worker.slot] = 0
+            delay = min(MAX_RESTART_BACKOFF, 2 ** self.crashes[worker.slot] - 1)
+            logger.warning(
+                f"Worker {worker.slot} (pid {pid}) exited unexpectedly with {code}; restarting in {delay:.0f}s"
+            )
+            self.respawn_at[worker.slot] = time.monotonic() + delay
+
+    def _respawn_due(self):
+        now = time.monotonic()
+        for slot, due in list(self.respawn_at.items()):
+            if due <= now and not self.stopping:
+                self.spawn(slot)
+
+    def _wait_ready(self, worker, timeout):
+        deadline = time.monotonic() + timeout
+        while not worker.ready and time.monotonic() < deadline and worker.pid in self.children:
+            readable, _, _ = select.select([worker.ready_fd], [], [], 0.1)
+            if readable:
+                worker.ready = os.read(worker.ready_fd, 1) == b'1'
+            self.reap()
+        return worker.ready
+
+    def _terminate(self, workers, timeout):
+        for worker in workers:
+            worker.retiring = True
+            try:
+                os.kill(worker.pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + timeout
+        pids = {worker.pid for worker in workers}
+        while pids & set(self.children) and time.monotonic() < deadline:
+            time.sleep(0.05)
+            self.reap()
+        for pid in pids & set(self.children):
+            logger.warning(f"Worker pid {pid} did not stop within {timeout:.0f}s; killing it")
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        while pids & set(self.children):
+            time.sleep(0.05)
+            self.reap()
+
+    def rolling_restart(self):
+        """Replace every worker, one at a time, without closing the socket."""
+        logger.info("Rolling restart requested")
+        for old in sorted(self.children.values(), key=lambda worker: worker.slot):
+            if self.stopping:
+                return
+            new = self.spawn(old.slot)
+            if not self._wait_ready(new, READY_TIMEOUT):
+                logger.error(f"Replacement for worker {old.slot} did not become ready; keeping pid {old.pid}")
+                self._terminate([new], self.graceful_timeout)
+                return
+            self._terminate([old], self.graceful_timeout)
+        logger.info("Rolling restart complete")
+
+    def stop_all(self):
+        """Stop every worker gracefully."""
+        logger.info("Stopping workers")
+        self.respawn_at.clear()
+        self._terminate(list(self.children.values()), self.graceful_timeout)
+
+    # Worker side ----------------------------------------------------------
+
+    def _child(self, slot, ready_w):
+        for signum in (signal.SIGINT, signal.SIGHUP):
+            signal.signal(signum, signal.SIG_IGN)
+        for signum in (signal.SIGTERM, signal.SIGCHLD):
+            signal.signal(signum, signal.SIG_DFL)
+        for fd in (self._wakeup_r, self._wakeup_w):
+            if fd is not None:
+                os.close(fd)
+        for worker in self.children.values():
+            os.close(worker.ready_fd)
+
+        def notify_ready():
+            if ready_w in pending:
+                pending.remove(ready_w)
+                os.write(ready_w, b'1')
+                os.close(ready_w)
+
+        pending = [ready_w]
+        try:
+            return self.run_worker(self.listener, notify_ready) or 0
+        except BaseException:
+            logger.exception(f"Worker {slot} failed")
+            return 1
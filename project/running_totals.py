@@ -0,0 +1,45 @@
+"""
+Helpers for denormalized running totals.
+
+Cash balances and rollups, merit snapshots and unread counters keep one row
+per key that signals adjust with ``UPDATE ... SET total = total + delta``.
+When that UPDATE finds no row, the row is created from a full aggregate,
+which already includes the change being applied.
+
+Two transactions can both miss the row and both try to create it. Under
+READ COMMITTED neither aggregate sees the other's uncommitted change, so
+the one that loses the unique-constraint race must add its own delta to the
+winner's row; dropping it would leave the total permanently short.
+``create_or_apply`` does exactly that.
+
+Delete receivers never create rows (they pass ``create=False``): the family
+or user being summarised may itself be in the middle of a cascade delete.
+"""
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+
+def local_day(value):
+    """Return the local calendar day of a timestamp, treating naive values as local time."""
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return timezone.localdate(value)
+
+
+def create_or_apply(model, lookup, values, delta=None):
+    """
+    Create the ``model`` row for ``lookup`` with ``values`` (from an aggregate).
+
+    If a concurrent transaction created the row first, add ``delta`` (a
+    mapping of field to increment, for the change that triggered the create)
+    to it instead. Returns the row.
+    """
+    try:
+        with transaction.atomic():
+            return model.objects.create(**lookup, **values)
+    except IntegrityError:
+        if delta:
+            model.objects.filter(**lookup).update(**{field: F(field) + value for field, value in delta.items()})
+        return model.objects.get(**lookup)
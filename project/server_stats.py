@@ -0,0 +1,145 @@
+"""
+Connection-level metrics from Cheroot's ``server.stats``.
+
+``serve --stats`` turns on Cheroot's own counters. ``snapshot`` flattens
+them for one server: accepted connections, queue depth (accepted
+connections waiting for a thread), busy/idle/total threads, requests and
+bytes read/written. ``StatsLogger`` logs one such line per interval, with
+per-second rates since the previous line, and the staff-only
+``/stats/server/`` view returns the snapshots of every Cheroot server in the
+answering process. In ``--workers`` mode each worker reports its own.
+
+Cheroot's own request and byte totals add each connection's running counts
+after every pass, and a keep-alive connection makes one pass per request, so
+its earlier requests are counted again each time; the pass that merely
+reads the client's close counts as a request too. ``enable`` therefore
+installs ``PassCountingConnection``, which books what each pass added to a
+per-server ``ConnectionTotals`` before handing the connection back, and
+reports those totals instead.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from cheroot.server import HTTPConnection
+
+logger = logging.getLogger(__name__)
+
+_STATISTICS_PREFIX = 'Cheroot HTTPServer'
+
+
+class ConnectionTotals:
+    """Thread-safe request and byte counts for one server."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def add(self, requests, bytes_read, bytes_written):
+        with self._lock:
+            self.requests += requests
+            self.bytes_read += bytes_read
+            self.bytes_written += bytes_written
+
+
+class PassCountingConnection(HTTPConnection):
+    """Connection that books each pass's requests and bytes with its server's ``ConnectionTotals``."""
+
+    def communicate(self):
+        before = (self.requests_seen, self.rfile.bytes_read, self.wfile.bytes_written)
+        try:
+            return super().communicate()
+        finally:
+            bytes_read = self.rfile.bytes_read - before[1]
+            # Cheroot also counts the pass that only finds the client has closed.
+            requests = self.requests_seen - before[0] if bytes_read else 0
+            self.server.connection_totals.add(requests, bytes_read, self.wfile.bytes_written - before[2])
+
+
+def enable(server):
+    """Turn on statistics for a Cheroot ``server`` that has not started yet."""
+    totals = server.connection_totals = ConnectionTotals()
+    server.ConnectionClass = PassCountingConnection
+    server.stats['Enabled'] = True
+    server.stats['Requests'] = lambda stats: totals.requests
+    server.stats['Bytes Read'] = lambda stats: totals.bytes_read
+    server.stats['Bytes Written'] = lambda stats: totals.bytes_written
+
+
+def _value(stats, key):
+    value = stats.get(key)
+    return value(stats) if callable(value) else value
+
+
+def snapshot(stats):
+    """Return a flat dict of the interesting counters in a Cheroot ``stats`` mapping."""
+    enabled = bool(stats.get('Enabled'))
+    threads = _value(stats, 'Threads') or 0
+    idle = _value(stats, 'Threads Idle') or 0
+    return {
+        'enabled': enabled,
+        'bind_address': _value(stats, 'Bind Address'),
+        'run_time': round(_value(stats, 'Run time') or 0, 3) if enabled else None,
+        'accepts': stats.get('Accepts', 0),
+        'queue': _value(stats, 'Queue') or 0,
+        'threads': threads,
+        'busy_threads': max(threads - idle, 0),
+        'idle_threads': idle,
+        'socket_errors': stats.get('Socket Errors', 0),
+        'requests': _value(stats, 'Requests') if enabled else None,
+        'bytes_read': _value(stats, 'Bytes Read') if enabled else None,
+        'bytes_written': _value(stats, 'Bytes Written') if enabled else None,
+    }
+
+
+def current():
+    """Return snapshots of every Cheroot server running in this process."""
+    statistics = getattr(logging, 'statistics', {})
+    return [
+        snapshot(stats)
+        for name, stats in list(statistics.items())
+        if name.startswith(_STATISTICS_PREFIX) and stats.get('Enabled')
+    ]
+
+
+class StatsLogger(threading.Thread):
+    """Log one line of ``server.stats`` every ``interval`` seconds until stopped."""
+
+    def __init__(self, server, interval):
+        super().__init__(name='serve-stats', daemon=True)
+        self.server = server
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._previous = None
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                self.log_once()
+            except Exception:
+                logger.exception("Could not sample server stats")
+
+    def log_once(self):
+        sample = snapshot(self.server.stats)
+        now = time.monotonic()
+        rates = {'accepts': 0.0, 'requests': 0.0, 'bytes_written': 0.0}
+        if self._previous is not None:
+            elapsed = (now - self._previous[0]) or 1e-6
+            for key in rates:
+                rates[key] = ((sample[key] or 0) - (self._previous[1][key] or 0)) / elapsed
+        self._previous = (now, sample)
+        logger.info(
+            f"Server stats pid={os.getpid()} accepts={sample['accepts']} ({rates['accepts']:.1f}/s) "
+            f"queue={sample['queue']} busy_threads={sample['busy_threads']}/{sample['threads']} "
+            f"requests={sample['requests']} ({rates['requests']:.1f}/s) "
+            f"bytes_read={sample['bytes_read']} bytes_written={sample['bytes_written']} "
+            f"({rates['bytes_written']:.0f} B/s) socket_errors={sample['socket_errors']}"
+        )
+        return sample
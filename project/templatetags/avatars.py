@@ -0,0 +1,11 @@
+from django import template
+
+from project import avatars
+
+register = template.Library()
+
+
+@register.simple_tag
+def avatar_url(user, size):
+    """Return the URL of the smallest avatar of ``user`` that covers ``size`` pixels."""
+    return avatars.url(user, int(size))
@@ -0,0 +1,108 @@
+"""Tests for profile picture avatars."""
+
+import io
+import shutil
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from project import avatars
+
+
+def _picture(size=(300, 200)):
+    """Return PNG bytes for a landscape profile picture."""
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color=(10, 120, 200)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@override_settings(AVATAR_SIZES=[32, 64, 128], AVATAR_IMAGE_FORMAT="auto")
+class AvatarTests(TestCase):
+    """Avatar derivatives are generated on upload and picked by size."""
+
+    def setUp(self):
+        """Log in a user against a temporary MEDIA_ROOT."""
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = get_user_model().objects.create_user("avataruser", password="Password123!")
+        self.client.force_login(self.user)
+
+    def _upload(self):
+        """Upload a profile picture through the profile view."""
+        response = self.client.post(
+            reverse("profile"),
+            {
+                "form_type": "profile",
+                "first_name": "",
+                "last_name": "",
+                "email": "",
+                "bio": "",
+                "profile_pic": SimpleUploadedFile("me.png", _picture(), content_type="image/png"),
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.user.refresh_from_db()
+
+    def test_upload_generates_square_derivatives(self):
+        """Each configured size is written as a square image beside the upload."""
+        self._upload()
+        self.assertTrue(self.user.avatars_generated)
+        storage = self.user.profile_pic.storage
+        for size in (32, 64, 128):
+            name = avatars.derivative_name(self.user.profile_pic.name, size)
+            self.assertRegex(name, rf"^profile_pics/avatars/user_{self.user.id}_[0-9a-f]{{8}}_{size}\.webp$")
+            with storage.open(name) as file, Image.open(file) as image:
+                self.assertEqual(image.size, (size, size))
+
+    def test_url_picks_smallest_covering_size(self):
+        """The tag serves the smallest derivative at least as large as requested."""
+        self._upload()
+        name = self.user.profile_pic.name
+        self.assertEqual(avatars.url(self.user, 24), self.user.profile_pic.storage.url(avatars.derivative_name(name, 32)))
+        self.assertTrue(avatars.url(self.user, 48).endswith("_64.webp"))
+        self.assertTrue(avatars.url(self.user, 500).endswith("_128.webp"))
+        rendered = Template("{% load avatars %}{% avatar_url user 40 %}").render(Context({"user": self.user}))
+        self.assertTrue(rendered.endswith("_64.webp"))
+
+    def test_url_falls_back_to_original(self):
+        """Pictures without derivatives (or no picture) fall back gracefully."""
+        self.assertEqual(avatars.url(self.user, 24), "")
+        self.user.profile_pic.save("legacy.png", ContentFile(_picture()), save=True)
+        self.assertEqual(avatars.url(self.user, 24), self.user.profile_pic.url)
+
+    def test_new_picture_resets_derivatives(self):
+        """Replacing the picture outside the profile view stops serving stale derivatives."""
+        self._upload()
+        self.user.profile_pic.save("replacement.png", ContentFile(_picture()), save=True)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.avatars_generated)
+        self.assertEqual(avatars.url(self.user, 24), self.user.profile_pic.url)
+
+    def test_unreadable_picture_keeps_original(self):
+        """A picture Pillow cannot read is served as uploaded."""
+        self.user.profile_pic.save("broken.png", ContentFile(b"not a picture"), save=True)
+        self.assertFalse(avatars.generate(self.user))
+        self.assertEqual(avatars.url(self.user, 24), self.user.profile_pic.url)
+
+    def test_command_backfills_missing_avatars(self):
+        """generate_avatars processes pictures that have no derivatives yet."""
+        self.user.profile_pic.save("legacy.png", ContentFile(_picture()), save=True)
+        out = StringIO()
+        call_command("generate_avatars", stdout=out)
+        self.assertIn("Generated avatars for 1 of 1", out.getvalue())
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.avatars_generated)
+        out = StringIO()
+        call_command("generate_avatars", stdout=out)
+        self.assertIn("for 0 of 0", out.getvalue())
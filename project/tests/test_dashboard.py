@@ -0,0 +1,167 @@
+"""Tests for the cached landing page dashboard widgets."""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from cash.models import Fund
+from mail.models import Message, Recipient
+from merits.models import Merit
+from project import dashboard
+from project.dashboard import DashboardService
+from project.models import Family, Membership
+
+
+class DashboardServiceTests(TestCase):
+    """Tests for DashboardService caching and version bumps."""
+
+    def setUp(self):
+        """Create a family with a parent and a child."""
+        caches['dashboard'].clear()
+        User = get_user_model()
+        self.parent = User.objects.create_user("dashparent", password="Password123!")
+        self.child = User.objects.create_user("dashchild", password="Password123!")
+        self.family = Family.objects.create(name="Dashboard")
+        Membership.objects.create(user=self.parent, family=self.family, role="parent")
+        Membership.objects.create(user=self.child, family=self.family, role="child")
+
+    def test_second_build_is_served_from_cache(self):
+        """A warm dashboard needs no database queries."""
+        DashboardService(self.family, self.parent).build()
+        with self.assertNumQueries(0):
+            widgets = DashboardService(self.family, self.parent).build()
+        self.assertEqual(set(widgets), set(dashboard.WIDGETS))
+
+    def test_cash_change_bumps_only_cash_widget(self):
+        """Saving a fund recomputes the cash summary and keeps other widgets cached."""
+        service = DashboardService(self.family, self.parent)
+        service.build()
+        with self.captureOnCommitCallbacks(execute=True):
+            Fund.objects.create(user=self.parent, family=self.family, amount=Decimal("12.50"))
+        self.assertEqual(service.get('cash_summary')['available'], Decimal("12.50"))
+        with self.assertNumQueries(0):
+            service.get('shopping_needs')
+
+    def test_bump_waits_for_the_commit(self):
+        """Versions move only once the write commits, so no request caches uncommitted data under them."""
+        version = dashboard.get_version(self.family.id, 'cash_summary')
+        with self.captureOnCommitCallbacks() as callbacks:
+            Fund.objects.create(user=self.parent, family=self.family, amount=Decimal("5"))
+            self.assertEqual(dashboard.get_version(self.family.id, 'cash_summary'), version)
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(dashboard.get_version(self.family.id, 'cash_summary'), version)
+
+    def test_login_keeps_user_widgets_cached(self):
+        """A last_login save does not invalidate widgets; a username change does."""
+        version = dashboard.get_version(self.family.id, 'merits_summary')
+        self.client.login(username="dashchild", password="Password123!")
+        self.assertEqual(dashboard.get_version(self.family.id, 'merits_summary'), version)
+        self.child.username = "dashkid"
+        with self.captureOnCommitCallbacks(execute=True):
+            self.child.save(update_fields=["username"])
+        self.assertNotEqual(dashboard.get_version(self.family.id, 'merits_summary'), version)
+
+    def test_merits_summary_is_grouped_and_invalidated(self):
+        """Points come from grouped queries and refresh when a merit is added."""
+        service = DashboardService(self.family, self.parent)
+        self.assertEqual(service.get('merits_summary')[0]['total'], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            Merit.objects.create(family=self.family, child=self.child, creator=self.parent, description="Helped", weight=3)
+        summary = service.get('merits_summary')
+        self.assertEqual(summary[0]['merit_points'], 3)
+        self.assertEqual(summary[0]['wallet_balance'], 0)
+
+    def test_unread_mail_is_per_user(self):
+        """Unread counts are cached per user and bumped when mail is read."""
+        message = Message.objects.create(family=self.family, subject="Hi", body="Hello", sender=self.parent)
+        recipient = Recipient.objects.create(message=message, recipient=self.child)
+        self.assertEqual(DashboardService(self.family, self.child).get('unread_mail'), 1)
+        self.assertEqual(DashboardService(self.family, self.parent).get('unread_mail'), 0)
+        recipient.read_at = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            recipient.save()
+        self.assertEqual(DashboardService(self.family, self.child).get('unread_mail'), 0)
+
+    def test_landing_page_uses_cached_widgets(self):
+        """Repeat landing page visits issue fewer queries than the first."""
+        self.client.login(username="dashparent", password="Password123!")
+        url = reverse("landing_page")
+        self.client.get(url)
+        caches['dashboard'].clear()
+        with CaptureQueriesContext(connection) as cold:
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as warm:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertLess(len(warm), len(cold) - 5)
+
+
+class ParallelDashboardTests(TestCase):
+    """Tests for concurrent widget evaluation."""
+
+    def setUp(self):
+        """Create a family and swap in widgets that do not touch the database."""
+        caches['dashboard'].clear()
+        self.user = get_user_model().objects.create_user("paralleluser", password="Password123!")
+        self.family = Family.objects.create(name="Parallel")
+        self.release = threading.Event()
+        fast = dashboard.Widget('fast', lambda family, user: 'ready', lambda: 'empty')
+        slow = dashboard.Widget('slow', lambda family, user: self.release.wait(5) and 'late', lambda: 'empty')
+        patcher = mock.patch.dict(dashboard.WIDGETS, {'fast': fast, 'slow': slow}, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.release.set)
+
+    @override_settings(DASHBOARD_PARALLEL=True, DASHBOARD_WIDGET_TIMEOUT=0.2)
+    def test_slow_widget_times_out_with_placeholder(self):
+        """A slow widget is replaced by its placeholder and reported."""
+        service = DashboardService(self.family, self.user)
+        widgets = service.build()
+        self.assertEqual(widgets, {'fast': 'ready', 'slow': 'empty'})
+        self.assertEqual(service.timed_out, ['slow'])
+        self.assertIn('fast;dur=', service.server_timing())
+        self.assertIn('slow;desc="timeout"', service.server_timing())
+
+    @override_settings(DASHBOARD_PARALLEL=True, DASHBOARD_WIDGET_TIMEOUT=0.2)
+    def test_queued_widget_is_cancelled_on_timeout(self):
+        """A widget still waiting for a pool thread at the deadline never runs."""
+        ran = []
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        queued = dashboard.Widget('queued', lambda family, user: ran.append('queued') or 'late', lambda: 'empty')
+        del dashboard.WIDGETS['fast']
+        dashboard.WIDGETS['queued'] = queued
+        with mock.patch.object(dashboard, '_get_executor', return_value=executor):
+            service = DashboardService(self.family, self.user)
+            self.assertEqual(service.build(), {'slow': 'empty', 'queued': 'empty'})
+        self.assertEqual(service.timed_out, ['slow', 'queued'])
+        self.release.set()
+        executor.shutdown(wait=True)
+        self.assertEqual(ran, [])
+
+    @override_settings(DASHBOARD_PARALLEL=True, DASHBOARD_WIDGET_TIMEOUT=5)
+    def test_widgets_run_concurrently(self):
+        """Widgets are evaluated on pool threads, not the request thread."""
+        threads = {}
+
+        def record(family, user):
+            threads['widget'] = threading.current_thread().name
+            return 'ok'
+
+        dashboard.WIDGETS['fast'] = dashboard.Widget('fast', record, lambda: 'empty')
+        self.release.set()
+        service = DashboardService(self.family, self.user)
+        self.assertEqual(service.build(), {'fast': 'ok', 'slow': 'late'})
+        self.assertTrue(threads['widget'].startswith('dashboard'))
+        self.assertEqual(service.timed_out, [])
+        self.assertEqual(set(service.timings), {'fast', 'slow'})
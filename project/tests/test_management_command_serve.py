@@ -2,8 +2,14 @@
 
 from unittest.mock import patch
 
-from django.core.management import call_command
-from django.test import TestCase
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+# Caches every pre-fork worker sees alike; membership/dashboard default to LocMemCache.
+SHARED_CACHES = {
+    alias: {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    for alias in ("default", "membership", "dashboard")
+}
 
 
 class ServeCommandTests(TestCase):
@@ -42,3 +48,62 @@ class ServeCommandTests(TestCase):
         self.assertEqual(kwargs.get("ssl_certificate"), "/tmp/cert.pem")
         self.assertEqual(kwargs.get("ssl_private_key"), "/tmp/key.pem")
         server_instance.start.assert_called_once()
+
+    @override_settings(CACHES=SHARED_CACHES)
+    @patch("project.management.commands.serve.prefork.Supervisor")
+    @patch("project.management.commands.serve.prefork.bind_socket")
+    @patch("project.management.commands.serve.WSGIServer")
+    def test_workers_use_the_prefork_supervisor(self, mock_server, mock_bind, mock_supervisor):
+        """--workers above 1 binds once and hands the socket to the supervisor."""
+        call_command("serve", host="127.0.0.1", port=9001, numthreads=4, workers=3, graceful_timeout=7)
+        mock_bind.assert_called_once_with("127.0.0.1", 9001, 5)
+        args, kwargs = mock_supervisor.call_args
+        self.assertEqual(args[0], mock_bind.return_value)
+        self.assertEqual(args[1], 3)
+        self.assertEqual(kwargs["graceful_timeout"], 7)
+        mock_supervisor.return_value.run.assert_called_once()
+        mock_bind.return_value.close.assert_called_once()
+        mock_server.assert_not_called()
+
+    @patch("project.management.commands.serve.prefork.bind_socket")
+    def test_workers_refuse_per_process_caches(self, mock_bind):
+        """--workers above 1 is rejected while membership/dashboard use LocMemCache."""
+        caches = dict(SHARED_CACHES, dashboard={"BACKEND": "django.core.cache.backends.locmem.LocMemCache"})
+        with override_settings(CACHES=caches):
+            with self.assertRaisesMessage(CommandError, "DASHBOARD_CACHE_URL"):
+                call_command("serve", workers=2)
+        mock_bind.assert_not_called()
+
+    def test_workers_must_be_positive(self):
+        """--workers below 1 is rejected."""
+        with self.assertRaises(CommandError):
+            call_command("serve", workers=0)
+
+    @patch("project.management.commands.serve.server_stats.StatsLogger")
+    @patch("project.management.commands.serve.WSGIServer")
+    @patch("project.management.commands.serve.get_wsgi_application")
+    def test_tuning_options_and_stats(self, mock_get_app, mock_server, mock_stats_logger):
+        """Tuning flags reach Cheroot and --stats enables collection and logging."""
+        server_instance = mock_server.return_value
+        server_instance.stats = {"Enabled": False}
+        call_command(
+            "serve",
+            port=9002,
+            max_threads=40,
+            request_queue_size=128,
+            timeout=3,
+            shutdown_timeout=8,
+            keep_alive_limit=0,
+            stats=True,
+            stats_interval=15,
+        )
+        _, kwargs = mock_server.call_args
+        self.assertEqual(
+            (kwargs["max"], kwargs["request_queue_size"], kwargs["timeout"], kwargs["shutdown_timeout"]),
+            (40, 128, 3, 8),
+        )
+        self.assertEqual(server_instance.keep_alive_conn_limit, 0)
+        self.assertTrue(server_instance.stats["Enabled"])
+        mock_stats_logger.assert_called_once_with(server_instance, 15)
+        mock_stats_logger.return_value.start.assert_called_once()
+        mock_stats_logger.return_value.stop.assert_called_once()
@@ -0,0 +1,117 @@
+"""Tests for media serving."""
+
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+
+from project import media
+
+
+class ServeMediaTests(TestCase):
+    """Validators, conditional requests, ranges and caching for uploads."""
+
+    def setUp(self):
+        """Write a receipt and a profile picture into a temporary MEDIA_ROOT."""
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        os.makedirs(os.path.join(self.media_root, "receipts"))
+        os.makedirs(os.path.join(self.media_root, "profile_pics"))
+        self.body = bytes(range(256)) * 40
+        with open(os.path.join(self.media_root, "receipts", "groceries.jpg"), "wb") as handle:
+            handle.write(self.body)
+        with open(os.path.join(self.media_root, "profile_pics", "user_1_0a1b2c3d.png"), "wb") as handle:
+            handle.write(b"png")
+        self.url = reverse("serve_media", args=["receipts/groceries.jpg"])
+
+    def _content(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_full_response_has_validators(self):
+        """A plain GET streams the file with ETag, Last-Modified and no-cache."""
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self._content(response), self.body)
+        self.assertEqual(response["Content-Type"], "image/jpeg")
+        self.assertEqual(response["Content-Length"], str(len(self.body)))
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertIn("Last-Modified", response)
+
+    def test_uuid_named_uploads_are_immutable(self):
+        """Profile pictures with a random suffix are cached for a year."""
+        response = self.client.get(reverse("serve_media", args=["profile_pics/user_1_0a1b2c3d.png"]))
+        self.assertEqual(response["Cache-Control"], f"public, max-age={media.IMMUTABLE_MAX_AGE}, immutable")
+
+    def test_processed_receipts_are_private(self):
+        """Receipts are immutable too, but only the browser may cache them."""
+        for path in ("receipts/" + "a" * 32 + ".webp", "receipts/" + "a" * 32 + "_thumb.webp"):
+            self.assertEqual(media.cache_control_for(path), f"private, max-age={media.IMMUTABLE_MAX_AGE}, immutable")
+        self.assertTrue(media.cache_control_for("profile_pics/avatars/user_1_0a1b2c3d_64.webp").startswith("public,"))
+
+    def test_revalidation_returns_304(self):
+        """Matching If-None-Match or If-Modified-Since answers 304 without a body."""
+        first = self.client.get(self.url)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], first["ETag"])
+        self.assertEqual(response.content, b"")
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_failed_if_match_returns_412(self):
+        """A failed If-Match precondition is rejected."""
+        response = self.client.get(self.url, HTTP_IF_MATCH='"stale"')
+        self.assertEqual(response.status_code, 412)
+
+    def test_byte_ranges(self):
+        """Single ranges, open-ended ranges and suffixes return 206 slices."""
+        size = len(self.body)
+        for header, start, end in (("bytes=0-99", 0, 99), ("bytes=10000-", 10000, size - 1), ("bytes=-10", size - 10, size - 1), ("bytes=100-999999", 100, size - 1)):
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response["Content-Range"], f"bytes {start}-{end}/{size}")
+                self.assertEqual(response["Content-Length"], str(end - start + 1))
+                self.assertEqual(self._content(response), self.body[start:end + 1])
+
+    def test_unsatisfiable_and_ignored_ranges(self):
+        """Out-of-bounds ranges get 416; malformed or multi-ranges get the whole file."""
+        response = self.client.get(self.url, HTTP_RANGE=f"bytes={len(self.body)}-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.body)}")
+        for header in ("bytes=0-1,5-9", "items=0-1", "bytes=9-2"):
+            with self.subTest(header=header):
+                self.assertEqual(self.client.get(self.url, HTTP_RANGE=header).status_code, 200)
+
+    def test_if_range_falls_back_to_full_file_when_changed(self):
+        """A stale If-Range validator turns the range request into a full response."""
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=etag).status_code, 206)
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(self.url, HTTP_RANGE="bytes=0-9", HTTP_IF_RANGE=http_date(0))
+        self.assertEqual(response.status_code, 200)
+
+    def test_head_has_headers_without_body(self):
+        """HEAD reports the length without opening the file."""
+        response = self.client.head(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Length"], str(len(self.body)))
+        self.assertEqual(response.content, b"")
+
+    def test_missing_directories_and_traversal_are_404(self):
+        """Only regular files inside MEDIA_ROOT are served."""
+        for path in ("receipts/missing.jpg", "receipts", "../settings.py", "receipts/../../etc/passwd"):
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(f"/media/{path}").status_code, 404)
+        self.assertEqual(self.client.post(self.url).status_code, 405)
@@ -0,0 +1,67 @@
+"""Tests for the shared membership cache."""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from project import membership_cache
+from project.models import Family, Membership
+
+
+class MembershipCacheTests(TestCase):
+    """Tests for membership caching and signal-driven invalidation."""
+
+    def setUp(self):
+        """Create a parent with one family and reset counters."""
+        self.user = get_user_model().objects.create_user(username="cached", password="Password123!")
+        self.family = Family.objects.create(name="CachedFamily")
+        self.membership = Membership.objects.create(user=self.user, family=self.family, role="parent")
+        membership_cache.reset_stats()
+
+    def test_second_lookup_is_a_hit(self):
+        """Repeated lookups are served from the cache."""
+        membership_cache.get_membership(self.user.id, self.family.id)
+        with self.assertNumQueries(0):
+            membership = membership_cache.get_membership(self.user.id, self.family.id)
+        self.assertEqual(membership.role, "parent")
+        stats = membership_cache.get_stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_role_change_invalidates(self):
+        """Saving a membership drops the cached entry."""
+        membership_cache.get_membership(self.user.id, self.family.id)
+        self.membership.role = "child"
+        self.membership.save()
+        membership = membership_cache.get_membership(self.user.id, self.family.id)
+        self.assertEqual(membership.role, "child")
+
+    def test_membership_delete_and_m2m_add_invalidate(self):
+        """Deleting a membership or adding one via the M2M manager invalidates."""
+        other = Family.objects.create(name="OtherCached")
+        membership_cache.get_user_memberships(self.user.id)
+        other.members.add(self.user, through_defaults={"role": "child"})
+        self.assertEqual(len(membership_cache.get_user_memberships(self.user.id)), 2)
+        self.membership.delete()
+        self.assertIsNone(membership_cache.get_membership(self.user.id, self.family.id))
+
+    def test_family_rename_invalidates(self):
+        """Renaming a family refreshes the cached family name."""
+        membership_cache.get_membership(self.user.id, self.family.id)
+        self.family.name = "RenamedFamily"
+        self.family.save()
+        membership = membership_cache.get_membership(self.user.id, self.family.id)
+        self.assertEqual(membership.family.name, "RenamedFamily")
+
+    def test_stats_endpoint_requires_staff(self):
+        """Only staff can scrape the counters."""
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("membership_cache_stats"))
+        self.assertEqual(response.status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(reverse("membership_cache_stats"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("hits", response.json())
+        self.assertIn("misses", response.json())
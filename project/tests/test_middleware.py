@@ -4,6 +4,7 @@ from django.contrib.auth import get_user_model
 from django.test import TestCase
 from django.urls import reverse
 
+from project import membership_cache
 from project.models import Family, Membership
 
 
@@ -37,3 +38,38 @@ class FamilyContextMiddlewareTests(TestCase):
 
         self.assertEqual(response.status_code, 200)
         self.assertIsNone(self.client.session.get("current_family_id"))
+
+    def test_exposes_current_membership(self):
+        """Middleware attaches the resolved membership and role to the request."""
+        response = self.client.get(reverse("landing_page"))
+
+        request = response.wsgi_request
+        self.assertEqual(request.current_membership.family_id, self.family.id)
+        self.assertEqual(request.current_family, self.family)
+        self.assertEqual(request.current_family_role, "parent")
+
+    def test_resolves_membership_with_single_query(self):
+        """Family, membership, and role come from one joined query, then the cache."""
+        from django.db import connection
+        from django.test.client import RequestFactory
+        from django.test.utils import CaptureQueriesContext
+
+        from project.middleware import FamilyContextMiddleware
+
+        middleware = FamilyContextMiddleware(lambda req: req)
+
+        def resolve():
+            request = RequestFactory().get("/")
+            request.user = self.user
+            request.session = {"current_family_id": self.family.id}
+            middleware(request)
+            self.assertEqual(request.current_family.name, "SoloFamily")
+
+        membership_cache.invalidate_users([self.user.id])
+        with CaptureQueriesContext(connection) as queries:
+            resolve()
+        self.assertEqual(len(queries), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            resolve()
+        self.assertEqual(len(queries), 0)
@@ -0,0 +1,133 @@
+"""Tests for keyset pagination."""
+
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from dinner.models import DinnerDay
+from mail import services
+from mail.models import Message
+from project.models import Family, Membership
+from project.pagination import KeysetPaginator
+from shoppinglist.models import Item
+
+
+class KeysetPaginatorTests(TestCase):
+    """KeysetPaginator walks (timestamp, id) orderings with opaque cursors."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create 23 consecutive dinner days."""
+        cls.family = Family.objects.create(name="Keyset")
+        start = date(2024, 1, 1)
+        cls.days = [DinnerDay.objects.create(family=cls.family, date=start + timedelta(days=offset)) for offset in range(23)]
+
+    def _paginator(self, per_page=5):
+        return KeysetPaginator(DinnerDay.objects.filter(family=self.family), ('-date', '-id'), per_page)
+
+    def _walk(self, paginator):
+        pages = [paginator.get_page()]
+        while pages[-1].has_next:
+            pages.append(paginator.get_page(pages[-1].next_cursor))
+        return pages
+
+    def test_forward_walk_covers_every_row_once(self):
+        """Following next cursors visits each row once, newest first."""
+        pages = self._walk(self._paginator())
+        self.assertEqual([len(page) for page in pages], [5, 5, 5, 5, 3])
+        seen = [day.id for page in pages for day in page]
+        self.assertEqual(seen, [day.id for day in reversed(self.days)])
+        self.assertFalse(pages[0].has_previous)
+
+    def test_previous_cursor_returns_previous_page(self):
+        """A previous cursor returns the page before, and paging back to the start refills page one."""
+        paginator = self._paginator()
+        pages = self._walk(paginator)
+        back = paginator.get_page(pages[2].previous_cursor)
+        self.assertEqual(list(back), list(pages[1]))
+        self.assertTrue(back.has_previous)
+        self.assertEqual(back.next_cursor, pages[1].next_cursor)
+        first = paginator.get_page(pages[1].previous_cursor)
+        self.assertEqual(list(first), list(pages[0]))
+        self.assertFalse(first.has_previous)
+
+    def test_ties_are_broken_by_id(self):
+        """Rows sharing a timestamp are split across pages without loss."""
+        Item.objects.bulk_create([Item(family=self.family, text=f"Item {n}", kind="need", obtained=True) for n in range(7)])
+        Item.objects.filter(family=self.family).update(modified=Item.objects.first().modified)
+        paginator = KeysetPaginator(Item.objects.filter(family=self.family), ('-modified', '-id'), 3)
+        ids = [item.id for page in self._walk(paginator) for item in page]
+        self.assertEqual(ids, sorted(Item.objects.values_list('id', flat=True), reverse=True))
+
+    def test_deep_page_is_a_single_query(self):
+        """Any page costs one LIMITed query, with no COUNT or OFFSET."""
+        paginator = self._paginator()
+        cursor = self._walk(paginator)[3].next_cursor
+        with self.assertNumQueries(1) as context:
+            paginator.get_page(cursor)
+        sql = context.captured_queries[0]['sql'].upper()
+        self.assertNotIn('OFFSET', sql)
+        self.assertNotIn('COUNT(', sql)
+
+    def test_cursor_bound_is_an_index_seek(self):
+        """The cursor's leading timestamp bound is part of the index search, not a filter after it."""
+        if connection.vendor != 'sqlite':
+            self.skipTest("Query plan wording is SQLite's.")
+        Item.objects.bulk_create([Item(family=self.family, text=f"Got {n}", kind="need", obtained=True) for n in range(8)])
+        queryset = Item.objects.filter(family=self.family, obtained=True)
+        paginator = KeysetPaginator(queryset, ('-modified', '-id'), 3)
+        _, key = paginator.decode_cursor(paginator.get_page().next_cursor)
+        plan = queryset.filter(paginator._after(key, forwards=True)).order_by('-modified', '-id')[:4].explain()
+        self.assertIn('shop_item_obtained_idx', plan)
+        self.assertIn('modified<?', plan.replace(' ', ''))
+
+    def test_malformed_cursor_falls_back_to_first_page(self):
+        """Garbage cursors are ignored rather than raising."""
+        paginator = self._paginator()
+        for cursor in ("not-a-cursor", "W10", "WzAsWyJub3BlIiwxXV0"):
+            self.assertEqual(list(paginator.get_page(cursor)), list(paginator.get_page()))
+
+    def test_mixed_directions_are_rejected(self):
+        """Ordering fields must share one direction."""
+        with self.assertRaises(ValueError):
+            KeysetPaginator(DinnerDay.objects.all(), ('-date', 'id'), 5)
+
+
+class KeysetViewTests(TestCase):
+    """The inbox and past-items views page with cursors."""
+
+    def setUp(self):
+        """Create a family with twelve messages for one reader."""
+        User = get_user_model()
+        self.family = Family.objects.create(name="KeysetViews")
+        self.sender = User.objects.create_user("keysetsender", password="Password123!")
+        self.reader = User.objects.create_user("keysetreader", password="Password123!")
+        Membership.objects.create(user=self.sender, family=self.family, role="parent")
+        Membership.objects.create(user=self.reader, family=self.family, role="parent")
+        for index in range(12):
+            services.send_message(Message(subject=f"Note {index}", body="Body"), self.family, self.sender, [self.reader])
+        self.client.force_login(self.reader)
+        session = self.client.session
+        session["current_family_id"] = self.family.id
+        session.save()
+
+    def test_inbox_pages_with_cursor(self):
+        """The second inbox page continues where the first stopped."""
+        first = self.client.get(reverse("inbox")).context["page_obj"]
+        self.assertEqual(len(first), 10)
+        second = self.client.get(reverse("inbox"), {"cursor": first.next_cursor}).context["page_obj"]
+        subjects = [recipient.message.subject for recipient in list(first) + list(second)]
+        self.assertEqual(subjects, [f"Note {index}" for index in range(11, -1, -1)])
+        self.assertFalse(second.has_next)
+
+    def test_past_items_pages(self):
+        """Past items are paged most recently obtained first."""
+        Item.objects.bulk_create([Item(family=self.family, text=f"Got {n}", kind="need", obtained=True) for n in range(30)])
+        response = self.client.get(reverse("past_items"))
+        page = response.context["page_obj"]
+        self.assertEqual(len(page), 25)
+        self.assertTrue(page.has_next)
+        self.assertContains(response, "cursor=")
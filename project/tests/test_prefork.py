@@ -0,0 +1,91 @@
+"""Tests for the pre-fork worker supervisor."""
+
+import os
+import signal
+import socket
+import time
+import unittest
+
+from django.test import SimpleTestCase
+
+from project import prefork
+
+
+def _answer_with_pid(listener, notify_ready):
+    """Minimal worker: reply to each connection with this process id."""
+    listener.settimeout(None)
+    notify_ready()
+    while True:
+        conn, _ = listener.accept()
+        with conn:
+            conn.sendall(str(os.getpid()).encode())
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "pre-fork mode needs fork()")
+class SupervisorTests(SimpleTestCase):
+    """Workers share one socket, are replaced on crash and rolled on reload."""
+
+    def setUp(self):
+        """Bind an ephemeral port and make sure every worker is stopped afterwards."""
+        self.listener = prefork.bind_socket("127.0.0.1", 0, 16)
+        self.addCleanup(self.listener.close)
+        self.supervisor = prefork.Supervisor(self.listener, 2, _answer_with_pid, graceful_timeout=5)
+        self.addCleanup(self.supervisor.stop_all)
+
+    def _ask(self):
+        """Connect to the shared socket and return the answering worker's pid."""
+        with socket.create_connection(self.listener.getsockname(), timeout=5) as conn:
+            return int(conn.recv(32))
+
+    def _start(self):
+        """Start both workers and wait until they accept connections."""
+        workers = [self.supervisor.spawn(slot) for slot in range(2)]
+        for worker in workers:
+            self.assertTrue(self.supervisor._wait_ready(worker, 5))
+        return {worker.pid for worker in workers}
+
+    def test_workers_share_the_socket(self):
+        """Connections are answered by the forked workers, not the supervisor."""
+        pids = self._start()
+        answered = {self._ask() for _ in range(10)}
+        self.assertTrue(answered)
+        self.assertTrue(answered <= pids)
+        self.assertNotIn(os.getpid(), answered)
+
+    def test_crashed_worker_is_restarted(self):
+        """A worker killed unexpectedly is replaced in the same slot."""
+        pids = self._start()
+        crashed = min(pids)
+        slot = self.supervisor.children[crashed].slot
+        os.kill(crashed, signal.SIGKILL)
+        deadline = time.monotonic() + 5
+        while crashed in self.supervisor.children and time.monotonic() < deadline:
+            time.sleep(0.05)
+            self.supervisor.reap()
+        self.assertNotIn(crashed, self.supervisor.children)
+        self.supervisor.respawn_at[slot] = time.monotonic()
+        self.supervisor._respawn_due()
+        slots = sorted(worker.slot for worker in self.supervisor.children.values())
+        self.assertEqual(slots, [0, 1])
+
+    def test_rolling_restart_replaces_every_worker(self):
+        """SIGHUP-style reload swaps all workers while the socket keeps answering."""
+        old = self._start()
+        self.supervisor.rolling_restart()
+        new = set(self.supervisor.children)
+        self.assertEqual(len(new), 2)
+        self.assertFalse(old & new)
+        self.assertIn(self._ask(), new)
+
+    def test_quick_crashes_back_off(self):
+        """Workers that die right after starting are restarted with growing delays."""
+        supervisor = prefork.Supervisor(self.listener, 1, lambda listener, notify_ready: 3, graceful_timeout=1)
+        self.addCleanup(supervisor.stop_all)
+        delays = []
+        for _ in range(3):
+            worker = supervisor.spawn(0)
+            os.waitid(os.P_PID, worker.pid, os.WEXITED | os.WNOWAIT)
+            supervisor.reap()
+            delays.append(supervisor.respawn_at[0] - time.monotonic())
+        self.assertLess(delays[0], delays[1])
+        self.assertLess(delays[1], delays[2])
@@ -0,0 +1,93 @@
+"""Query-plan regression tests for the family-scoped composite indexes."""
+
+import unittest
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from _calendar.models import Event
+from cash.models import Expense, Fund, WalletTransaction
+from mail.models import Recipient
+from project.models import Family
+from shoppinglist.models import Item
+from tasks.models import Task
+
+
+@unittest.skipUnless(connection.vendor in ('sqlite', 'postgresql'), "Plans are only checked on SQLite and PostgreSQL")
+class HotQueryPlanTests(TestCase):
+    """The hot family-scoped queries are planned onto their composite indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        """Create a family and user to scope the queries."""
+        cls.user = get_user_model().objects.create_user("planner", password="Password123!")
+        cls.family = Family.objects.create(name="Planner")
+
+    def setUp(self):
+        """Keep PostgreSQL from preferring sequential scans on tiny test tables."""
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SET LOCAL enable_seqscan = off")
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan, f"{index_name} not used:\n{plan}")
+
+    def test_cash_ledgers(self):
+        """Fund/Expense ranges and wallet history use their date indexes."""
+        since = timezone.now() - timedelta(days=30)
+        self.assertUsesIndex(
+            Fund.objects.filter(family=self.family, date__gte=since).order_by('-date'),
+            'cash_fund_family_date_idx',
+        )
+        self.assertUsesIndex(
+            Expense.objects.filter(family=self.family, date__gte=since).order_by('-date'),
+            'cash_expense_family_date_idx',
+        )
+        self.assertUsesIndex(
+            WalletTransaction.objects.filter(user=self.user, family=self.family).order_by('-date'),
+            'cash_wallet_user_fam_date_idx',
+        )
+
+    def test_shopping_items(self):
+        """Open and obtained items use their partial indexes."""
+        self.assertUsesIndex(
+            Item.objects.filter(family=self.family, kind='need', obtained=False),
+            'shop_item_open_kind_idx',
+        )
+        self.assertUsesIndex(
+            Item.objects.filter(family=self.family, obtained=True),
+            'shop_item_obtained_idx',
+        )
+
+    def test_tasks(self):
+        """Open tasks use the partial index; recent completions the composite one."""
+        self.assertUsesIndex(
+            Task.objects.filter(family=self.family, completed=False).order_by('due_date', '-created_at'),
+            'tasks_task_open_due_idx',
+        )
+        self.assertUsesIndex(
+            Task.objects.filter(
+                family=self.family,
+                completed=True,
+                completed_at__gte=timezone.now() - timedelta(days=7),
+            ).order_by('-completed_at'),
+            'tasks_task_done_at_idx',
+        )
+
+    def test_unread_mail(self):
+        """Unread counts use the (recipient, read_at) index."""
+        self.assertUsesIndex(
+            Recipient.objects.filter(recipient=self.user, read_at__isnull=True),
+            'mail_rcpt_user_read_idx',
+        )
+
+    def test_calendar_range(self):
+        """Event range candidates use the (family, when) index."""
+        self.assertUsesIndex(
+            Event.objects.filter(family=self.family, when__lte=timezone.now()),
+            'cal_event_family_when_idx',
+        )
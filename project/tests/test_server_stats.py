@@ -0,0 +1,88 @@
+"""Tests for Cheroot connection statistics."""
+
+import http.client
+import logging
+import threading
+import time
+
+from cheroot.wsgi import Server as WSGIServer
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from project import server_stats
+
+
+def _hello(environ, start_response):
+    """Tiny WSGI app with a known body size."""
+    start_response("200 OK", [("Content-Type", "text/plain"), ("Content-Length", "5")])
+    return [b"hello"]
+
+
+class ServerStatsTests(TestCase):
+    """Stats are sampled from a running Cheroot server."""
+
+    def setUp(self):
+        """Run a stats-enabled Cheroot server on an ephemeral port."""
+        self.server = WSGIServer(("127.0.0.1", 0), _hello, numthreads=3)
+        server_stats.enable(self.server)
+        self.server.prepare()
+        thread = threading.Thread(target=self.server.serve, daemon=True)
+        thread.start()
+        self.addCleanup(thread.join, 5)
+        self.addCleanup(self.server.stop)
+        self.addCleanup(logging.statistics.pop, f"Cheroot HTTPServer {id(self.server)}", None)
+
+    def _get(self, count):
+        """Make ``count`` keep-alive requests on one connection."""
+        conn = http.client.HTTPConnection(*self.server.bind_addr[:2], timeout=5)
+        for _ in range(count):
+            conn.request("GET", "/")
+            self.assertEqual(conn.getresponse().read(), b"hello")
+        conn.close()
+        self._settle()
+
+    def _settle(self):
+        """Wait until every worker thread has finished its pass and booked its counters."""
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            sample = server_stats.snapshot(self.server.stats)
+            if sample["busy_threads"] == 0 and sample["queue"] == 0:
+                return
+            time.sleep(0.01)
+        self.fail("Cheroot worker threads did not go idle")
+
+    def test_snapshot_counts_connections_requests_and_bytes(self):
+        """Accepted connections, requests, threads and bytes are reported."""
+        self._get(3)
+        sample = server_stats.snapshot(self.server.stats)
+        self.assertTrue(sample["enabled"])
+        self.assertEqual(sample["accepts"], 1)
+        self.assertEqual(sample["requests"], 3)
+        self.assertEqual(sample["threads"], 3)
+        self.assertEqual(sample["busy_threads"] + sample["idle_threads"], 3)
+        self.assertGreater(sample["bytes_written"], 15)
+        self.assertEqual(sample["queue"], 0)
+        self.assertIn(sample, server_stats.current())
+
+    def test_logger_reports_rates_between_samples(self):
+        """Each log line carries totals and per-second rates since the previous one."""
+        stats_logger = server_stats.StatsLogger(self.server, 60)
+        stats_logger.log_once()
+        self._get(2)
+        with self.assertLogs("project.server_stats", level="INFO") as logs:
+            sample = stats_logger.log_once()
+        self.assertEqual(sample["requests"], 2)
+        self.assertIn("requests=2", logs.output[0])
+        self.assertIn("busy_threads=", logs.output[0])
+
+    def test_endpoint_is_staff_only(self):
+        """The stats endpoint returns this process's servers to staff only."""
+        User = get_user_model()
+        self.client.force_login(User.objects.create_user("statsuser", password="Password123!"))
+        self.assertEqual(self.client.get(reverse("server_stats")).status_code, 403)
+        self.client.force_login(User.objects.create_user("statsstaff", password="Password123!", is_staff=True))
+        self._get(1)
+        payload = self.client.get(reverse("server_stats")).json()
+        addresses = [server["bind_address"] for server in payload["servers"]]
+        self.assertIn(repr(self.server.bind_addr), addresses)
@@ -11,4 +11,6 @@ urlpatterns = [
     path('family-dashboard/', views.family_dashboard, name='family_dashboard'),
     path('update-role/', views.update_role, name='update_role'),
     path('profile/', views.profile, name='profile'),
+    path('stats/membership-cache/', views.membership_cache_stats, name='membership_cache_stats'),
+    path('stats/server/', views.cheroot_stats, name='server_stats'),
 ]
@@ -1,20 +1,19 @@
 import logging
 import os
-import mimetypes
 
 from django.shortcuts import render, redirect
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth import update_session_auth_hash
-from django.http import JsonResponse, FileResponse, Http404
+from django.http import JsonResponse, Http404, HttpResponseForbidden
 from django.contrib import messages
 from django import forms
-from django.db import models
-from django.conf import settings
+from django.views.decorators.http import require_safe
 
 from .models import Membership, Family
 from .models import CustomUser
+from . import avatars, dashboard, media, membership_cache, server_stats
 from .forms import ProfileForm, CustomPasswordChangeForm
 
 def landing_page(request):
@@ -25,103 +24,33 @@ def landing_page(request):
     log = logging.getLogger(__name__)
     try:
         context = {}
+        dashboard_service = None
         if request.user.is_authenticated:
             families = request.user.families.all()
             current_family_role = None
-            children = []
-            unread_mail_count = 0
-            upcoming_events = []
-            cash_summary = {'funds': 0, 'expenses': 0, 'available': 0}
-            shopping_needs = []
-            merits_summary = []
-            open_tasks = []
-            recent_completed_tasks = []
+            widgets = dashboard.placeholders()
             current_family = getattr(request, 'current_family', None)
             if current_family:
-                from mail.models import Recipient
-                unread_mail_count = Recipient.objects.filter(
-                    recipient=request.user,
-                    read_at__isnull=True,
-                    message__family=current_family
-                ).count()
-                from _calendar.models import Event
-                from django.utils.timezone import now
-                from datetime import timedelta
-                start = now()
-                end = start + timedelta(days=7)
-                upcoming_events = Event.get_occurrences_in_range(start, end, family=current_family)
-                from cash.models import Fund, Expense
-                today = now()
-                month_start = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-                cash_summary['funds'] = Fund.objects.filter(
-                    family=current_family,
-                    date__gte=month_start,
-                    date__lte=today
-                ).aggregate(total=models.Sum('amount'))['total'] or 0
-                cash_summary['expenses'] = Expense.objects.filter(
-                    family=current_family,
-                    date__gte=month_start,
-                    date__lte=today
-                ).aggregate(total=models.Sum('amount'))['total'] or 0
-                # Available cash total (all time)
-                total_funds = Fund.objects.filter(family=current_family).aggregate(total=models.Sum('amount'))['total'] or 0
-                total_expenses = Expense.objects.filter(family=current_family).aggregate(total=models.Sum('amount'))['total'] or 0
-                cash_summary['available'] = total_funds - total_expenses
-                from shoppinglist.models import Item
-                shopping_needs = Item.objects.filter(family=current_family, kind='need', obtained=False)
-                from merits.models import Merit, Demerit
-                children = Membership.objects.filter(family=current_family, role='child').select_related('user')
-                merits_summary = []
-                for child in children:
-                    merit_points = Merit.objects.filter(child=child.user).aggregate(total=models.Sum('weight'))['total'] or 0
-                    demerit_points = Demerit.objects.filter(child=child.user).aggregate(total=models.Sum('weight'))['total'] or 0
-                    merits_summary.append({
-                        'child': child.user,
-                        'merit_points': merit_points,
-                        'demerit_points': demerit_points,
-                        'total': merit_points - demerit_points
-                    })
-                from tasks.models import Task
-                from datetime import timedelta
-                open_tasks = Task.objects.filter(
-                    family=current_family,
-                    completed=False,
-                ).select_related('created_by').order_by('due_date', '-created_at')[:3]
-                recent_completed_tasks = Task.objects.filter(
-                    family=current_family,
-                    completed=True,
-                    completed_at__gte=now() - timedelta(days=7),
-                ).prefetch_related('completed_by').order_by('-completed_at')[:3]
-                membership = Membership.objects.filter(user=request.user, family=current_family).first()
-                if membership:
-                    current_family_role = membership.role
+                dashboard_service = dashboard.DashboardService(current_family, request.user)
+                widgets = dashboard_service.build()
+                current_family_role = request.current_family_role
             else:
                 log.warning("Landing page without current family user_id=%s", request.user.id)
-            from cash.models import WalletTransaction
-            wallet_txns = WalletTransaction.objects.filter(user=request.user, family=current_family) if current_family else WalletTransaction.objects.none()
-            wallet_in = wallet_txns.filter(direction='in').aggregate(total=models.Sum('amount'))['total'] or 0
-            wallet_out = wallet_txns.filter(direction='out').aggregate(total=models.Sum('amount'))['total'] or 0
-            my_wallet_balance = wallet_in - wallet_out
-
-            for entry in merits_summary:
-                child_wallet_txns = WalletTransaction.objects.filter(user=entry['child'], family=current_family)
-                child_in = child_wallet_txns.filter(direction='in').aggregate(total=models.Sum('amount'))['total'] or 0
-                child_out = child_wallet_txns.filter(direction='out').aggregate(total=models.Sum('amount'))['total'] or 0
-                entry['wallet_balance'] = child_in - child_out
+            unread_mail_count = widgets['unread_mail']
 
             context.update({
                 'families': families,
                 'current_family_role': current_family_role,
-                'children': children,
                 'unread_mail_count': unread_mail_count,
-                'upcoming_events': upcoming_events,
-                'cash_summary': cash_summary,
-                'shopping_needs': shopping_needs,
-                'merits_summary': merits_summary,
-                'open_tasks': open_tasks,
-                'recent_completed_tasks': recent_completed_tasks,
+                'upcoming_events': widgets['upcoming_events'],
+                'cash_summary': widgets['cash_summary'],
+                'shopping_needs': widgets['shopping_needs'],
+                'merits_summary': widgets['merits_summary'],
+                'open_tasks': widgets['tasks']['open'],
+                'recent_completed_tasks': widgets['tasks']['recent_completed'],
                 'current_family': current_family,
-                'my_wallet_balance': my_wallet_balance,
+                'my_wallet_balance': widgets['my_wallet'],
+                'dashboard_timed_out': dashboard_service.timed_out if dashboard_service else [],
             })
             log.debug(
                 "Landing page data user_id=%s families=%s unread=%s",
@@ -129,9 +58,20 @@ def landing_page(request):
                 families.count(),
                 unread_mail_count,
             )
+            if dashboard_service:
+                log.debug(
+                    "Landing page widget timings user_id=%s family_id=%s timings=%s timed_out=%s",
+                    request.user.id,
+                    current_family.id,
+                    dashboard_service.timings,
+                    dashboard_service.timed_out,
+                )
         else:
             log.info("Landing page anonymous visit")
-        return render(request, 'project/landing_page.html', context)
+        response = render(request, 'project/landing_page.html', context)
+        if dashboard_service:
+            response['Server-Timing'] = dashboard_service.server_timing()
+        return response
     except Exception:
         log.exception("Unhandled error in landing_page user_id=%s", getattr(request.user, 'id', None))
         raise
@@ -177,8 +117,7 @@ def add_child(request):
             return redirect('switch_family')  # Ensure a family is selected
 
         # Check if the user is a parent in the current family
-        membership = Membership.objects.filter(user=request.user, family=request.current_family, role='parent').first()
-        if not membership:
+        if request.current_family_role != 'parent':
             log.warning(
                 "Add child blocked: not a parent user_id=%s family_id=%s",
                 request.user.id,
@@ -239,9 +178,7 @@ def family_dashboard(request):
         current_family_role = None
         children = []
         if request.current_family:
-            membership = Membership.objects.filter(user=request.user, family=request.current_family).first()
-            if membership:
-                current_family_role = membership.role
+            current_family_role = request.current_family_role
             children = Membership.objects.filter(family=request.current_family, role='child').select_related('user')
         else:
             log.warning("Family dashboard without current family user_id=%s", request.user.id)
@@ -317,7 +254,9 @@ def profile(request):
             if form_type == 'profile':
                 profile_form = ProfileForm(request.POST, request.FILES, instance=request.user)
                 if profile_form.is_valid():
-                    profile_form.save()
+                    user = profile_form.save()
+                    if 'profile_pic' in profile_form.changed_data:
+                        avatars.generate(user)
                     messages.success(request, 'Your profile has been updated successfully.')
                     log.info("Profile updated user_id=%s", request.user.id)
                     return redirect('profile')
@@ -345,12 +284,38 @@ def profile(request):
         raise
 
 
+@login_required
+def membership_cache_stats(request):
+    """Expose membership cache hit/miss counters for this process (staff only)."""
+    if not request.user.is_staff:
+        return HttpResponseForbidden("Staff access required.")
+    return JsonResponse(membership_cache.get_stats())
+
+
+@login_required
+def cheroot_stats(request):
+    """Expose Cheroot connection statistics for this process (staff only; needs ``serve --stats``)."""
+    if not request.user.is_staff:
+        return HttpResponseForbidden("Staff access required.")
+    return JsonResponse({'pid': os.getpid(), 'servers': server_stats.current()})
+
+
+@require_safe
 def serve_media(request, path):
-    """Serve media files for production WSGI servers like cheroot."""
-    file_path = os.path.join(settings.MEDIA_ROOT, path)
-    
-    if not os.path.exists(file_path):
-        raise Http404("Media file not found")
-    
-    content_type, _ = mimetypes.guess_type(file_path)
-    return FileResponse(open(file_path, 'rb'), content_type=content_type)
+    """
+    Serve media files for production WSGI servers like cheroot.
+
+    Supports conditional GETs, byte ranges and long-lived caching; see
+    ``project.media``.
+    """
+    log = logging.getLogger(__name__)
+    try:
+        response = media.media_response(request, path)
+        log.debug("Media served path=%s status=%s", path, response.status_code)
+        return response
+    except Http404:
+        log.info("Media not found path=%s", path)
+        raise
+    except Exception:
+        log.exception("Unhandled error in serve_media path=%s", path)
+        raise
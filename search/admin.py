@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import SearchDocument
+
+
+@admin.register(SearchDocument)
+class SearchDocumentAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'object_id', 'title', 'family', 'updated_at')
+    list_filter = ('kind', 'family')
+    search_fields = ('title',)
+    readonly_fields = ('family', 'kind', 'object_id', 'title', 'body', 'updated_at')
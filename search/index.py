@@ -0,0 +1,274 @@
+"""
+Family-wide full-text search.
+
+Each searchable row (message, task, event, shopping item, expense or fund
+note) is copied into a ``SearchDocument`` by post_save/post_delete
+receivers. Two backends index the documents:
+
+* ``fts5``: on SQLite builds with FTS5, the ``search_fts`` virtual table
+  (created by the initial migration) mirrors the documents through
+  triggers, and queries are ranked with ``bm25``.
+* ``trigram``: everywhere else, each document's distinct trigrams are
+  stored in ``SearchTrigram`` and hits are ranked by the share of the
+  query's trigrams they contain.
+
+``search`` is family-scoped and only returns what the user may open:
+messages they sent or received, and cash entries for parents only.
+"""
+
+import logging
+import re
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, Q
+from django.db.models.signals import post_delete, post_save
+from django.urls import reverse
+from django.utils import timezone
+
+from _calendar.models import Event
+from cash.models import Expense, Fund
+from mail.models import Message, Recipient
+from shoppinglist.models import Item
+from tasks.models import Task
+
+from .models import SearchDocument, SearchTrigram
+
+log = logging.getLogger(__name__)
+
+FTS_TABLE = 'search_fts'
+MAX_QUERY_TERMS = 8
+SNIPPET_LENGTH = 160
+# A trigram hit must contain at least this share of the query's trigrams.
+TRIGRAM_THRESHOLD = 0.5
+
+
+class Source:
+    """How one model is indexed and linked to from search results."""
+
+    def __init__(self, kind, model, label, title, body, url_name, parents_only=False):
+        self.kind = kind
+        self.model = model
+        self.label = label
+        self.title = title
+        self.body = body
+        self.url_name = url_name
+        self.parents_only = parents_only
+
+    def text(self, instance):
+        """Return the ``(title, body)`` to index for ``instance``."""
+        title = getattr(instance, self.title) if self.title else ''
+        body = getattr(instance, self.body) if self.body else ''
+        return (title or '')[:255], body or ''
+
+    def url(self, object_id):
+        return reverse(self.url_name, args=[object_id])
+
+
+SOURCES = {
+    source.kind: source
+    for source in (
+        Source('message', Message, 'Message', 'subject', 'body', 'message_detail'),
+        Source('task', Task, 'Task', 'title', 'description', 'task_edit'),
+        Source('event', Event, 'Event', 'title', 'text', 'event_update'),
+        Source('item', Item, 'Shopping item', 'text', None, 'item_update'),
+        Source('expense', Expense, 'Expense', 'note', None, 'edit_expense', parents_only=True),
+        Source('fund', Fund, 'Fund', 'note', None, 'edit_fund', parents_only=True),
+    )
+}
+_KINDS_BY_MODEL = {source.model: kind for kind, source in SOURCES.items()}
+
+_fts_available = None
+
+
+def get_backend():
+    """Return ``'fts5'`` or ``'trigram'`` per the ``SEARCH_BACKEND`` setting (default ``'auto'``)."""
+    global _fts_available
+    configured = getattr(settings, 'SEARCH_BACKEND', 'auto')
+    if configured != 'auto':
+        return configured
+    if _fts_available is None:
+        _fts_available = connection.vendor == 'sqlite' and FTS_TABLE in connection.introspection.table_names()
+    return 'fts5' if _fts_available else 'trigram'
+
+
+def _words(text):
+    return re.findall(r'\w+', text.casefold())
+
+
+def trigrams(text):
+    """Return the distinct trigrams of each word in ``text``, padded like pg_trgm."""
+    grams = set()
+    for word in _words(text):
+        padded = f"  {word} "
+        grams.update(padded[index:index + 3] for index in range(len(padded) - 2))
+    return grams
+
+
+def _write_trigrams(documents):
+    SearchTrigram.objects.filter(document__in=[document.pk for document in documents]).delete()
+    SearchTrigram.objects.bulk_create(
+        [
+            SearchTrigram(document=document, trigram=gram)
+            for document in documents
+            for gram in sorted(trigrams(f"{document.title} {document.body}"))
+        ],
+        batch_size=1000,
+    )
+
+
+def index_instance(instance):
+    """Create, update or (for rows with no text) remove the document for ``instance``."""
+    kind = _KINDS_BY_MODEL[type(instance)]
+    title, body = SOURCES[kind].text(instance)
+    if not (title.strip() or body.strip()):
+        remove_instance(kind, instance.pk)
+        return
+    values = {'family_id': instance.family_id, 'title': title, 'body': body, 'updated_at': timezone.now()}
+    documents = SearchDocument.objects.filter(kind=kind, object_id=instance.pk)
+    # Edits are a single UPDATE; only new rows pay for the INSERT.
+    if not documents.update(**values):
+        try:
+            with transaction.atomic():
+                SearchDocument.objects.create(kind=kind, object_id=instance.pk, **values)
+        except IntegrityError:
+            documents.update(**values)
+    if get_backend() == 'trigram':
+        _write_trigrams(list(documents))
+
+
+def remove_instance(kind, object_id):
+    SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def rebuild(families=None):
+    """Reindex every source row (optionally only for ``families``); returns the document count."""
+    documents = SearchDocument.objects.all()
+    family_filter = {}
+    if families is not None:
+        family_ids = [family.id for family in families]
+        documents = documents.filter(family_id__in=family_ids)
+        family_filter = {'family_id__in': family_ids}
+
+    rows = []
+    for kind, source in SOURCES.items():
+        for instance in source.model.objects.filter(**family_filter).iterator():
+            title, body = source.text(instance)
+            if title.strip() or body.strip():
+                rows.append(SearchDocument(family_id=instance.family_id, kind=kind, object_id=instance.pk, title=title, body=body))
+
+    with transaction.atomic():
+        documents.delete()
+        created = SearchDocument.objects.bulk_create(rows, batch_size=500)
+        if get_backend() == 'trigram':
+            if not all(document.pk for document in created):
+                created = list(SearchDocument.objects.filter(**family_filter))
+            _write_trigrams(created)
+    return len(rows)
+
+
+def _allowed_kinds(role, kinds=None):
+    allowed = [kind for kind, source in SOURCES.items() if role == 'parent' or not source.parents_only]
+    return [kind for kind in allowed if kinds is None or kind in kinds]
+
+
+def _visible_messages(user):
+    received = Recipient.objects.filter(recipient=user).values('message_id')
+    sent = Message.objects.filter(sender=user).values('id')
+    return ~Q(kind='message') | Q(object_id__in=received) | Q(object_id__in=sent)
+
+
+def _fts_query(text):
+    # Quote every term so user input is never parsed as FTS5 syntax, and
+    # match prefixes so partially typed words still hit.
+    terms = _words(text)[:MAX_QUERY_TERMS]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _fts_hits(documents, text, limit):
+    match = _fts_query(text)
+    if not match:
+        return []
+    ids_sql, ids_params = documents.values('id').query.sql_with_params()
+    sql = (
+        f"SELECT {FTS_TABLE}.rowid, bm25({FTS_TABLE}, 5.0, 1.0), "
+        f"snippet({FTS_TABLE}, 1, '', '', '…', 24) "
+        f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND {FTS_TABLE}.rowid IN ({ids_sql}) "
+        f"ORDER BY 2, 1 DESC LIMIT %s"
+    )
+    with connection.cursor() as cursor:
+        # SQLite treats a negative LIMIT as no limit.
+        cursor.execute(sql, [match, *ids_params, -1 if limit is None else limit])
+        ranked = cursor.fetchall()
+    by_id = documents.in_bulk([row[0] for row in ranked])
+    # bm25 is lower-is-better; flip it so higher scores rank first everywhere.
+    return [(by_id[row_id], -score, snippet) for row_id, score, snippet in ranked if row_id in by_id]
+
+
+def _trigram_hits(documents, text, limit):
+    grams = trigrams(' '.join(_words(text)[:MAX_QUERY_TERMS]))
+    if not grams:
+        return []
+    needed = max(1, int(len(grams) * TRIGRAM_THRESHOLD + 0.5))
+    ranked = list(
+        SearchTrigram.objects.filter(trigram__in=grams, document__in=documents)
+        .values('document_id')
+        .annotate(hits=Count('id'))
+        .filter(hits__gte=needed)
+        .order_by('-hits', '-document_id')[:limit]
+    )
+    by_id = documents.in_bulk([row['document_id'] for row in ranked])
+    return [
+        (by_id[row['document_id']], row['hits'] / len(grams), None)
+        for row in ranked
+        if row['document_id'] in by_id
+    ]
+
+
+def _finder():
+    return _fts_hits if get_backend() == 'fts5' else _trigram_hits
+
+
+def _snippet(document):
+    text = document.body or document.title
+    return text if len(text) <= SNIPPET_LENGTH else text[:SNIPPET_LENGTH].rsplit(' ', 1)[0] + '…'
+
+
+def search(family, user, role, text, kinds=None, limit=20):
+    """
+    Return up to ``limit`` ranked hits for ``text`` in ``family``.
+
+    Each hit is a dict with ``kind``, ``label``, ``object_id``, ``title``,
+    ``snippet``, ``url`` and ``score`` (higher is better).
+    """
+    allowed = _allowed_kinds(role, kinds)
+    if not allowed or not text.strip():
+        return []
+    documents = SearchDocument.objects.filter(family=family, kind__in=allowed).filter(_visible_messages(user))
+    hits = []
+    for document, score, snippet in _finder()(documents, text, limit):
+        source = SOURCES[document.kind]
+        hits.append({
+            'kind': document.kind,
+            'label': source.label,
+            'object_id': document.object_id,
+            'title': document.title,
+            'snippet': snippet or _snippet(document),
+            'url': source.url(document.object_id),
+            'score': round(score, 4),
+        })
+    return hits
+
+
+def _instance_saved(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_instance(instance)
+
+
+def _instance_deleted(sender, instance, **kwargs):
+    remove_instance(_KINDS_BY_MODEL[sender], instance.pk)
+
+
+for _model, _kind in _KINDS_BY_MODEL.items():
+    post_save.connect(_instance_saved, sender=_model, dispatch_uid=f'search-index-{_kind}')
+    post_delete.connect(_instance_deleted, sender=_model, dispatch_uid=f'search-unindex-{_kind}')
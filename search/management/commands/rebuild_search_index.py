@@ -0,0 +1,21 @@
+"""
+Management command to rebuild the family search index.
+
+Documents are normally maintained by signals; run this after bulk imports,
+raw SQL changes that bypass them, or after switching SEARCH_BACKEND.
+"""
+
+from project.commands import FamilyCommand
+from search import index
+
+
+class Command(FamilyCommand):
+    help = "Rebuild search documents for messages, tasks, events, shopping items and cash notes"
+
+    family_help = "Only rebuild this family id (may be repeated)"
+
+    def handle(self, *args, **options):
+        families = self.selected_families(options)
+
+        written = index.rebuild(families)
+        self.stdout.write(self.style.SUCCESS(f"Indexed {written} document(s) with the {index.get_backend()} backend."))
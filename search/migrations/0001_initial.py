@@ -0,0 +1,139 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:26
+
+import re
+
+import django.db.models.deletion
+
+from django.db import migrations, models
+from django.db.utils import OperationalError
+
+FTS_SQL = [
+    "CREATE VIRTUAL TABLE search_fts USING fts5("
+    "title, body, content='search_searchdocument', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+    "CREATE TRIGGER search_fts_ai AFTER INSERT ON search_searchdocument BEGIN "
+    "INSERT INTO search_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER search_fts_ad AFTER DELETE ON search_searchdocument BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER search_fts_au AFTER UPDATE ON search_searchdocument BEGIN "
+    "INSERT INTO search_fts(search_fts, rowid, title, body) VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO search_fts(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+]
+
+
+def create_fts(apps, schema_editor):
+    # Only SQLite builds with FTS5 get the virtual table; everything else
+    # uses the SearchTrigram fallback.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        try:
+            cursor.execute("CREATE VIRTUAL TABLE search_fts_probe USING fts5(x)")
+        except OperationalError:
+            return
+        cursor.execute("DROP TABLE search_fts_probe")
+        for statement in FTS_SQL:
+            cursor.execute(statement)
+
+
+# (app label, model, kind, title field, body field) as in search.index.SOURCES.
+SOURCES = [
+    ('mail', 'Message', 'message', 'subject', 'body'),
+    ('tasks', 'Task', 'task', 'title', 'description'),
+    ('_calendar', 'Event', 'event', 'title', 'text'),
+    ('shoppinglist', 'Item', 'item', 'text', None),
+    ('cash', 'Expense', 'expense', 'note', None),
+    ('cash', 'Fund', 'fund', 'note', None),
+]
+
+
+def _trigrams(text):
+    grams = set()
+    for word in re.findall(r'\w+', text.casefold()):
+        padded = f"  {word} "
+        grams.update(padded[index:index + 3] for index in range(len(padded) - 2))
+    return grams
+
+
+def index_existing(apps, schema_editor):
+    SearchDocument = apps.get_model('search', 'SearchDocument')
+    SearchTrigram = apps.get_model('search', 'SearchTrigram')
+    rows = []
+    for app_label, model_name, kind, title_field, body_field in SOURCES:
+        model = apps.get_model(app_label, model_name)
+        for instance in model.objects.iterator():
+            title = (getattr(instance, title_field) or '')[:255]
+            body = (getattr(instance, body_field) or '') if body_field else ''
+            if title.strip() or body.strip():
+                rows.append(SearchDocument(family_id=instance.family_id, kind=kind, object_id=instance.pk, title=title, body=body))
+    SearchDocument.objects.bulk_create(rows, batch_size=500)
+    if 'search_fts' in schema_editor.connection.introspection.table_names():
+        return
+    SearchTrigram.objects.bulk_create(
+        [
+            SearchTrigram(document=document, trigram=gram)
+            for document in SearchDocument.objects.all()
+            for gram in sorted(_trigrams(f"{document.title} {document.body}"))
+        ],
+        batch_size=1000,
+    )
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for trigger in ('search_fts_ai', 'search_fts_ad', 'search_fts_au'):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        cursor.execute("DROP TABLE IF EXISTS search_fts")
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('project', '0005_alter_customuser_profile_pic'),
+        ('_calendar', '0005_event_cal_event_family_when_idx'),
+        ('cash', '0007_expense_cash_expense_family_date_idx_and_more'),
+        ('mail', '0006_message_thread'),
+        ('shoppinglist', '0005_item_shop_item_open_kind_idx_and_more'),
+        ('tasks', '0002_task_tasks_task_open_due_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('title', models.CharField(blank=True, max_length=255)),
+                ('body', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('family', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to='project.family')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SearchTrigram',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('trigram', models.CharField(max_length=3)),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='trigrams', to='search.searchdocument')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='searchdocument',
+            index=models.Index(fields=['family', 'kind'], name='search_doc_family_kind_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='searchdocument',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='uniq_search_document_per_object'),
+        ),
+        migrations.AddIndex(
+            model_name='searchtrigram',
+            index=models.Index(fields=['trigram', 'document'], name='search_trigram_lookup_idx'),
+        ),
+        migrations.RunPython(create_fts, drop_fts),
+        migrations.RunPython(index_existing, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+from django.db import models
+
+
+class SearchDocument(models.Model):
+    """
+    The searchable text of one indexed row (a message, task, event, ...).
+
+    Kept current by ``search.index`` signal receivers. On SQLite with FTS5
+    the ``search_fts`` virtual table mirrors these rows through triggers;
+    otherwise ``SearchTrigram`` rows index them.
+    """
+    family = models.ForeignKey('project.Family', on_delete=models.CASCADE, related_name='search_documents')
+    kind = models.CharField(max_length=20)
+    object_id = models.BigIntegerField()
+    title = models.CharField(max_length=255, blank=True)
+    body = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='uniq_search_document_per_object'),
+        ]
+        indexes = [
+            models.Index(fields=['family', 'kind'], name='search_doc_family_kind_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}: {self.title}"
+
+
+class SearchTrigram(models.Model):
+    """One distinct trigram of a document, used when FTS5 is unavailable."""
+    document = models.ForeignKey(SearchDocument, on_delete=models.CASCADE, related_name='trigrams')
+    trigram = models.CharField(max_length=3)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['trigram', 'document'], name='search_trigram_lookup_idx'),
+        ]
+
+    def __str__(self):
+        return self.trigram
@@ -0,0 +1,166 @@
+"""Tests for the family search index."""
+
+import unittest
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from _calendar.models import Event
+from cash.models import Expense, Fund
+from mail import services
+from mail.models import Message
+from project.models import Family, Membership
+from search import index
+from search.models import SearchDocument, SearchTrigram
+from shoppinglist.models import Item
+from tasks.models import Task
+
+
+class SearchBehaviourMixin:
+    """Behaviour every backend must provide."""
+
+    def setUp(self):
+        """Create two families with a parent and child and a little of everything."""
+        User = get_user_model()
+        self.parent = User.objects.create_user("searchparent", password="Password123!")
+        self.child = User.objects.create_user("searchchild", password="Password123!")
+        self.family = Family.objects.create(name="SearchFamily")
+        self.other_family = Family.objects.create(name="OtherSearchFamily")
+        Membership.objects.create(user=self.parent, family=self.family, role="parent")
+        Membership.objects.create(user=self.child, family=self.family, role="child")
+        Membership.objects.create(user=self.parent, family=self.other_family, role="parent")
+
+        self.task = Task.objects.create(family=self.family, created_by=self.parent, title="Clean garage", description="Sweep and sort the tools")
+        self.event = Event.objects.create(
+            family=self.family,
+            host=self.parent,
+            title="Piano recital",
+            text="Bring flowers for the teacher",
+            when=timezone.now() + timedelta(days=2),
+            duration=timedelta(hours=1),
+        )
+        self.item = Item.objects.create(family=self.family, text="Garden gloves", kind="need")
+        self.expense = Expense.objects.create(user=self.parent, family=self.family, amount="12.00", note="Garden centre mulch")
+        self.fund = Fund.objects.create(user=self.parent, family=self.family, amount="50.00", note="Garage sale proceeds")
+        self.message = Message(subject="Garage weekend", body="Can everyone help on Saturday?")
+        services.send_message(self.message, self.family, self.parent, [self.child])
+        Task.objects.create(family=self.other_family, created_by=self.parent, title="Garage door repair")
+
+    def _kinds(self, text, user=None, role="parent", **kwargs):
+        hits = index.search(self.family, user or self.parent, role, text, **kwargs)
+        return [(hit["kind"], hit["object_id"]) for hit in hits]
+
+    def test_every_source_is_indexed_and_family_scoped(self):
+        """Titles and bodies of each source are searchable within the family only."""
+        self.assertEqual(
+            set(self._kinds("garage")),
+            {("task", self.task.id), ("fund", self.fund.id), ("message", self.message.id)},
+        )
+        self.assertEqual(self._kinds("flowers"), [("event", self.event.id)])
+        self.assertEqual(set(self._kinds("garden")), {("item", self.item.id), ("expense", self.expense.id)})
+
+    def test_partial_words_match(self):
+        """A partially typed word still finds its document."""
+        self.assertIn(("event", self.event.id), self._kinds("recit"))
+
+    def test_children_do_not_see_cash(self):
+        """Cash notes are only searchable by parents."""
+        kinds = {kind for kind, _ in self._kinds("garage", user=self.child, role="child")}
+        self.assertEqual(kinds, {"task", "message"})
+
+    def test_mail_is_limited_to_sender_and_recipients(self):
+        """Messages appear only for the people who sent or received them."""
+        bystander = get_user_model().objects.create_user("searchbystander", password="Password123!")
+        Membership.objects.create(user=bystander, family=self.family, role="parent")
+        self.assertNotIn("message", {kind for kind, _ in self._kinds("saturday", user=bystander)})
+        self.assertIn(("message", self.message.id), self._kinds("saturday", user=self.child, role="child"))
+
+    def test_updates_and_deletes_follow_signals(self):
+        """Edits replace the indexed text and deletes remove it."""
+        self.task.title = "Wash car"
+        self.task.save()
+        self.assertNotIn(("task", self.task.id), self._kinds("garage"))
+        self.assertIn(("task", self.task.id), self._kinds("wash"))
+        self.task.delete()
+        self.assertEqual(self._kinds("wash"), [])
+        self.assertFalse(SearchDocument.objects.filter(kind="task", object_id=self.task.id).exists())
+
+    def test_query_syntax_is_not_interpreted(self):
+        """Operators and quotes in the query are treated as plain words."""
+        self.assertEqual(self._kinds('garage"*'), self._kinds("garage"))
+        self.assertEqual(self._kinds('NEAR("garage" OR (NOT'), [])
+        self.assertEqual(self._kinds("!!!"), [])
+
+    def test_rebuild_matches_signal_maintained_index(self):
+        """The rebuild command reproduces what the signals maintain."""
+        before = set(self._kinds("garage"))
+        SearchDocument.objects.all().delete()
+        self.assertEqual(self._kinds("garage"), [])
+        out = StringIO()
+        call_command("rebuild_search_index", stdout=out)
+        self.assertIn(index.get_backend(), out.getvalue())
+        self.assertEqual(set(self._kinds("garage")), before)
+
+    def test_rebuild_for_one_family(self):
+        """--family limits the rebuild and rejects unknown ids."""
+        out = StringIO()
+        call_command("rebuild_search_index", family_ids=[self.family.id], stdout=out)
+        self.assertIn("Indexed", out.getvalue())
+        with self.assertRaisesMessage(CommandError, "No matching families found."):
+            call_command("rebuild_search_index", family_ids=[0])
+
+    def test_endpoint_returns_ranked_json(self):
+        """The search endpoint returns ranked hits with links."""
+        self.client.force_login(self.parent)
+        session = self.client.session
+        session["current_family_id"] = self.family.id
+        session.save()
+        response = self.client.get(reverse("family_search"), {"q": "garage", "format": "json"})
+        results = response.json()["results"]
+        self.assertEqual(len(results), 3)
+        scores = [hit["score"] for hit in results]
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertIn(reverse("task_edit", args=[self.task.id]), [hit["url"] for hit in results])
+        html = self.client.get(reverse("family_search"), {"q": "flowers"})
+        self.assertContains(html, "Piano recital")
+
+
+@unittest.skipUnless(connection.vendor == "sqlite", "FTS5 is only used on SQLite")
+@override_settings(SEARCH_BACKEND="fts5")
+class Fts5SearchTests(SearchBehaviourMixin, TestCase):
+    """Search through the SQLite FTS5 virtual table."""
+
+    def setUp(self):
+        """Skip when this SQLite build lacks FTS5."""
+        if index.FTS_TABLE not in connection.introspection.table_names():
+            self.skipTest("SQLite was built without FTS5")
+        super().setUp()
+
+    def test_title_hits_outrank_body_hits(self):
+        """bm25 weights titles above bodies."""
+        Task.objects.create(family=self.family, created_by=self.parent, title="Errands", description="Pick up the violin")
+        titled = Task.objects.create(family=self.family, created_by=self.parent, title="Violin lesson")
+        self.assertEqual(self._kinds("violin")[0], ("task", titled.id))
+
+    def test_no_trigrams_are_written(self):
+        """The FTS5 backend does not maintain trigram rows."""
+        self.assertFalse(SearchTrigram.objects.exists())
+
+
+@override_settings(SEARCH_BACKEND="trigram")
+class TrigramSearchTests(SearchBehaviourMixin, TestCase):
+    """Search through the portable trigram index."""
+
+    def test_trigrams_are_padded_words(self):
+        """Words are split into padded, case-folded trigrams."""
+        self.assertEqual(index.trigrams("Ab"), {"  a", " ab", "ab "})
+
+    def test_misspellings_still_match(self):
+        """Trigram similarity tolerates a typo."""
+        self.assertIn(("event", self.event.id), self._kinds("recitl"))
@@ -0,0 +1,45 @@
+import logging
+
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import redirect, render
+
+from . import index
+
+RESULT_LIMIT = 30
+
+
+@login_required
+def family_search(request):
+    """
+    Ranked search across the current family's mail, tasks, events, shopping
+    items and cash notes.
+
+    Renders HTML by default; ``?format=json`` returns the hits as JSON.
+    ``kind`` may be repeated to restrict the result types.
+    """
+    log = logging.getLogger(__name__)
+    try:
+        wants_json = request.GET.get('format') == 'json'
+        family = request.current_family
+        if not family:
+            log.warning("Search blocked: no current family user_id=%s", request.user.id)
+            if wants_json:
+                return JsonResponse({'error': 'No family selected.'}, status=400)
+            return redirect('switch_family')
+        query = request.GET.get('q', '').strip()
+        kinds = request.GET.getlist('kind') or None
+        hits = index.search(family, request.user, request.current_family_role, query, kinds=kinds, limit=RESULT_LIMIT)
+        log.debug(
+            "Search user_id=%s family_id=%s backend=%s hits=%s",
+            request.user.id,
+            family.id,
+            index.get_backend(),
+            len(hits),
+        )
+        if wants_json:
+            return JsonResponse({'family_id': family.id, 'query': query, 'results': hits})
+        return render(request, 'search/results.html', {'query': query, 'hits': hits})
+    except Exception:
+        log.exception("Unhandled error in family_search user_id=%s", request.user.id)
+        raise
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('project', '0005_alter_customuser_profile_pic'),
+        ('shoppinglist', '0004_item_family'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('obtained', False)), fields=['family', 'kind'], name='shop_item_open_kind_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('obtained', True)), fields=['family', 'modified'], name='shop_item_obtained_idx'),
+        ),
+    ]
@@ -22,6 +22,22 @@ class Item(models.Model):
     created = models.DateTimeField(auto_now_add=True, help_text="The date and time when the item was created.")
     modified = models.DateTimeField(auto_now=True, help_text="The date and time when the item was last modified.")
 
+    class Meta:
+        # Boolean filters compile to ``NOT obtained`` / ``obtained``, which
+        # only partial indexes can serve.
+        indexes = [
+            models.Index(
+                fields=['family', 'kind'],
+                condition=models.Q(obtained=False),
+                name='shop_item_open_kind_idx',
+            ),
+            models.Index(
+                fields=['family', 'modified'],
+                condition=models.Q(obtained=True),
+                name='shop_item_obtained_idx',
+            ),
+        ]
+
     def __str__(self):
         """
         Returns a string representation of the item.
@@ -23,7 +23,7 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.contrib.auth.decorators import login_required
 from rest_framework.permissions import IsAuthenticated
 from django.core.exceptions import PermissionDenied
-from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
+from project.pagination import KeysetPaginator
 from django.http import HttpResponseBadRequest
 
 
@@ -31,6 +31,9 @@ from django.http import HttpResponse
 from datetime import datetime
 
 
+PAST_ITEMS_PAGE_SIZE = 25
+
+
 def _require_family_or_redirect(request, log, action):
     family = getattr(request, 'current_family', None)
     if not family:
@@ -262,13 +265,15 @@ def past_items(request):
         if redirect_response:
             return redirect_response
         obtained_items = Item.objects.filter(obtained=True, family=family)
+        paginator = KeysetPaginator(obtained_items, ('-modified', '-id'), PAST_ITEMS_PAGE_SIZE)
+        page_obj = paginator.get_page(request.GET.get('cursor'))
         log.debug(
             "Past items data user_id=%s family_id=%s items=%s",
             request.user.id,
             family.id if family else None,
-            len(obtained_items),
+            len(page_obj),
         )
-        return render(request, 'shoppinglist/past_items.html', {'obtained_items': obtained_items})
+        return render(request, 'shoppinglist/past_items.html', {'page_obj': page_obj})
     except Exception:
         log.exception("Unhandled error in past_items user_id=%s", request.user.id)
         raise
@@ -25,6 +25,19 @@ class Task(models.Model):
 
 	class Meta:
 		ordering = ['completed', 'due_date', '-created_at']
+		indexes = [
+			# Open tasks are listed by due date; completed ones by completion time.
+			models.Index(
+				fields=['family', 'due_date', '-created_at'],
+				condition=models.Q(completed=False),
+				name='tasks_task_open_due_idx',
+			),
+			models.Index(
+				fields=['family', 'completed_at'],
+				condition=models.Q(completed=True),
+				name='tasks_task_done_at_idx',
+			),
+		]
 
 	def __str__(self):
 		return self.title
@@ -6,14 +6,12 @@ from django.http import HttpResponseForbidden
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
 
-from project.models import Membership
-
 from .forms import CompleteTaskForm, TaskForm
 from .models import Task
 
 
-def _get_membership(user, family):
-	return Membership.objects.filter(user=user, family=family).first()
+def _get_membership(request):
+	return getattr(request, 'current_membership', None)
 
 
 def _is_parent(membership):
@@ -51,7 +49,7 @@ def task_list(request):
 			.prefetch_related('completed_by')
 			.order_by('-completed_at')
 		)
-		membership = _get_membership(request.user, family)
+		membership = _get_membership(request)
 
 		return render(
 			request,
@@ -103,7 +101,7 @@ def task_edit(request, task_id):
 			log.warning("Task edit blocked: no current family user_id=%s", request.user.id)
 			return redirect('switch_family')
 
-		membership = _get_membership(request.user, family)
+		membership = _get_membership(request)
 		task = get_object_or_404(Task, id=task_id, family=family)
 		if not _can_edit_task(request.user, membership, task):
 			log.warning(
@@ -147,7 +145,7 @@ def task_delete(request, task_id):
 			log.warning("Task delete blocked: no current family user_id=%s", request.user.id)
 			return redirect('switch_family')
 
-		membership = _get_membership(request.user, family)
+		membership = _get_membership(request)
 		if not _is_parent(membership):
 			log.warning("Task delete forbidden user_id=%s family_id=%s", request.user.id, family.id)
 			return HttpResponseForbidden("Only parents can delete tasks.")
@@ -173,7 +171,7 @@ def task_complete(request, task_id):
 			log.warning("Task complete blocked: no current family user_id=%s", request.user.id)
 			return redirect('switch_family')
 
-		membership = _get_membership(request.user, family)
+		membership = _get_membership(request)
 		if not _is_parent(membership):
 			log.warning("Task complete forbidden user_id=%s family_id=%s", request.user.id, family.id)
 			return HttpResponseForbidden("Only parents can complete tasks.")
@@ -207,7 +205,7 @@ def task_reopen(request, task_id):
 			log.warning("Task reopen blocked: no current family user_id=%s", request.user.id)
 			return redirect('switch_family')
 
-		membership = _get_membership(request.user, family)
+		membership = _get_membership(request)
 		if not _is_parent(membership):
 			log.warning("Task reopen forbidden user_id=%s family_id=%s", request.user.id, family.id)
 			return HttpResponseForbidden("Only parents can reopen tasks.")